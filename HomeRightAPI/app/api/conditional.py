@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from fastapi import Header, HTTPException, Request, Response
+
+from app.db.storage import Storage
+
+
+async def owner_etag(storage: Storage, owner_id: str) -> str:
+    """Weak ETag covering everything an owner's task, progress and summary reads depend on."""
+    return f'W/"{await storage.owner_version(owner_id)}"'
+
+
+def if_match_version(if_match: str | None = Header(default=None)) -> int | None:
+    """
+    The record `version` a write is conditioned on, from `If-Match: "<version>"` (quotes optional).
+    None when the header is absent or `*`.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    try:
+        return int(if_match.strip().strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must be a record version")
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """A 304 response if the request's If-None-Match matches `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
@@ -0,0 +1,107 @@
+"""
+MessagePack content negotiation.
+
+Clients that send `Accept: application/msgpack` get MessagePack instead of JSON from every route that
+returns a document: FastJSONResponse encodes the same document in the negotiated format. Error bodies,
+the NDJSON export and /metrics stay as they are. Request bodies sent with `Content-Type: application/msgpack` are
+decoded and handed to the route as JSON, so every model validates them exactly as it validates JSON.
+JSON stays the default.
+"""
+
+from __future__ import annotations
+
+import msgpack
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.responses import MSGPACK_MEDIA_TYPE, response_media_type
+
+
+MSGPACK_TYPES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+
+
+def _media_type(value: str) -> str:
+    return value.split(";", 1)[0].strip().lower()
+
+
+def prefers_msgpack(accept: str | None) -> bool:
+    """True if `accept` ranks MessagePack at least as high as JSON (an explicit msgpack range wins ties)."""
+    if not accept:
+        return False
+    msgpack_q = json_q = wildcard_q = 0.0
+    json_named = False
+    for item in accept.split(","):
+        media_type, *params = item.split(";")
+        media_type = media_type.strip().lower()
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type in MSGPACK_TYPES:
+            msgpack_q = max(msgpack_q, q)
+        elif media_type == "application/json":
+            json_q, json_named = max(json_q, q), True
+        elif media_type in ("*/*", "application/*"):
+            wildcard_q = max(wildcard_q, q)
+    return msgpack_q > 0 and msgpack_q >= (json_q if json_named else wildcard_q)
+
+
+class ContentNegotiationMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if _media_type(headers.get("content-type", "")) in MSGPACK_TYPES:
+            body = b""
+            more = True
+            while more:
+                message = await receive()
+                body += message.get("body", b"")
+                more = message.get("more_body", False)
+            try:
+                body = orjson.dumps(msgpack.unpackb(body, timestamp=3))
+            except (ValueError, TypeError, msgpack.UnpackException, orjson.JSONEncodeError):
+                await JSONResponse({"detail": "Request body is not valid MessagePack"}, status_code=400)(scope, receive, send)
+                return
+            scope = dict(scope)
+            scope["headers"] = [(k, v) for k, v in scope["headers"] if k not in (b"content-type", b"content-length")] + [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ]
+            receive = _replay(body, receive)
+
+        async def send_with_vary(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Vary", "Accept")
+            await send(message)
+
+        token = response_media_type.set(MSGPACK_MEDIA_TYPE if prefers_msgpack(headers.get("accept")) else "application/json")
+        try:
+            await self.app(scope, receive, send_with_vary)
+        finally:
+            response_media_type.reset(token)
+
+
+def _replay(body: bytes, receive: Receive) -> Receive:
+    """`receive` with the (already consumed) request body replaced by `body`."""
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
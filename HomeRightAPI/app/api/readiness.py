@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import STORAGE_PING, STORAGE_PING_FAILURES
+from app.db.storage import Storage, storage
+
+
+class Readiness:
+    """
+    Storage ping for /ready, cached for `ttl` seconds. Concurrent probes wait for one ping
+    instead of each sending their own, so a probe storm costs the database one command per `ttl`.
+    """
+
+    def __init__(self, store: Storage, ttl: float, timeout: float) -> None:
+        self.store = store
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = asyncio.Lock()
+        self._result: dict[str, Any] | None = None
+        self._checked_at = 0.0
+
+    async def check(self) -> dict[str, Any]:
+        async with self._lock:
+            if self._result is None or time.monotonic() - self._checked_at >= self.ttl:
+                self._result = await self._ping()
+                self._checked_at = time.monotonic()
+            return self._result
+
+    async def _ping(self) -> dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.store.ping(), self.timeout)
+        except Exception as e:
+            STORAGE_PING_FAILURES.inc()
+            return {"status": "unavailable", "backend": settings.storage_backend, "error": repr(e)}
+        elapsed = time.perf_counter() - start
+        STORAGE_PING.set(elapsed)
+        return {"status": "ready", "backend": settings.storage_backend, "ping_ms": round(elapsed * 1000, 2)}
+
+
+readiness = Readiness(storage, settings.ready_cache_seconds, settings.ready_ping_timeout_seconds)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.routes import progress, settings, summary, tasks
+from app.api.routes import analytics, bootstrap, export, progress, settings, summary, sync, tasks
 
 
 api_router = APIRouter()
@@ -8,4 +8,7 @@ api_router.include_router(tasks.router, tags=["tasks"])
 api_router.include_router(progress.router, tags=["progress"])
 api_router.include_router(settings.router, tags=["settings"])
 api_router.include_router(summary.router, tags=["summary"])
-
+api_router.include_router(export.router, tags=["export"])
+api_router.include_router(sync.router, tags=["sync"])
+api_router.include_router(bootstrap.router, tags=["bootstrap"])
+api_router.include_router(analytics.router, tags=["analytics"])
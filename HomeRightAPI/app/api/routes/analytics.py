@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query, Request
+
+from app.api.conditional import not_modified, owner_etag
+from app.core.config import settings
+from app.core.metrics import ANALYTICS_CACHE_REQUESTS, InstrumentedRoute
+from app.db.storage import CostTotals, Storage, storage
+from app.db.write_behind import progress_buffer
+from app.models.analytics import CostAnalyticsOut
+from app.utils.responses import FastJSONResponse
+
+
+router = APIRouter(prefix="/analytics", route_class=InstrumentedRoute)
+
+
+def get_storage() -> Storage:
+    return storage
+
+
+class _ResponseCache:
+    """LRU of response bodies, each valid only while the owner's ETag is the one it was built under."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[str, dict]] = OrderedDict()
+
+    def get(self, key: tuple, etag: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != etag:
+            ANALYTICS_CACHE_REQUESTS.labels("miss").inc()
+            return None
+        self._entries.move_to_end(key)
+        ANALYTICS_CACHE_REQUESTS.labels("hit").inc()
+        return entry[1]
+
+    def put(self, key: tuple, etag: str, content: dict) -> None:
+        self._entries[key] = (etag, content)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_costs_cache = _ResponseCache(settings.analytics_cache_max_entries)
+
+
+def _group(totals: CostTotals, **fields: Any) -> dict:
+    return {**fields, "total": totals.total, "count": totals.count}
+
+
+async def _cost_content(store: Storage, owner_id: str, year: int | None, top: int) -> dict:
+    groups, tasks = await asyncio.gather(store.summaries.cost_totals(owner_id, year), store.tasks.for_owner(owner_id))
+    tasks_by_id = {t["task_id"]: t for t in tasks}
+
+    by_schedule: dict[str | None, CostTotals] = {}
+    for task_id, totals in groups["task"].items():
+        schedule = tasks_by_id.get(task_id, {}).get("schedule")
+        prev = by_schedule.get(schedule, CostTotals(Decimal(0), 0))
+        by_schedule[schedule] = CostTotals(prev.total + totals.total, prev.count + totals.count)
+
+    ranked = sorted(groups["task"].items(), key=lambda item: (-item[1].total, item[0]))[:top]
+    return {
+        "owner_id": owner_id,
+        "year": year,
+        "total": sum((t.total for t in groups["year"].values()), Decimal(0)),
+        "completed_count": sum(t.count for t in groups["year"].values()),
+        "by_year": [_group(t, year=y) for y, t in sorted(groups["year"].items())],
+        "by_month": [_group(t, year=y, month=m) for (y, m), t in sorted(groups["month"].items())],
+        "by_task": [
+            _group(t, task_id=task_id, title=tasks_by_id.get(task_id, {}).get("title"), schedule=tasks_by_id.get(task_id, {}).get("schedule"))
+            for task_id, t in ranked
+        ],
+        "by_schedule": [_group(t, schedule=s) for s, t in sorted(by_schedule.items(), key=lambda item: (-item[1].total, item[0] or ""))],
+    }
+
+
+@router.get("/costs/{owner_id}", response_model=CostAnalyticsOut)
+async def cost_analytics(
+    request: Request,
+    owner_id: str,
+    year: int | None = Query(default=None, ge=1970, le=3000),
+    top: int = Query(default=10, ge=1, le=100),
+    store: Storage = Depends(get_storage),
+):
+    """
+    Exact cost totals and counts of completed progress by year, month, task (the `top` most expensive)
+    and schedule, over all years or only `year`. Cached per owner until the owner's next write.
+    """
+    owner_id = owner_id.strip()
+    await progress_buffer.flush_owner(owner_id)
+    etag = await owner_etag(store, owner_id)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+
+    key = (owner_id, year, top)
+    content = _costs_cache.get(key, etag)
+    if content is None:
+        content = await _cost_content(store, owner_id, year, top)
+        _costs_cache.put(key, etag, content)
+    return FastJSONResponse(content, headers={"ETag": etag})
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+
+from fastapi import APIRouter, Depends, Query, Request
+
+from app.api.conditional import not_modified
+from app.api.serializers import progress_dict, settings_dict, settings_or_default, task_dict
+from app.api.routes.summary import month_content
+from app.core.metrics import InstrumentedRoute
+from app.db.rollups import task_due_mask
+from app.db.storage import Storage, storage
+from app.db.write_behind import progress_buffer
+from app.models.bootstrap import BootstrapOut
+from app.utils.bson import utcnow
+from app.utils.responses import FastJSONResponse
+from app.utils.schedule import month_bit
+
+
+router = APIRouter(prefix="/bootstrap", route_class=InstrumentedRoute)
+
+
+def get_storage() -> Storage:
+    return storage
+
+
+@router.get("/{owner_id}", response_model=BootstrapOut)
+async def bootstrap(
+    request: Request,
+    owner_id: str,
+    year: int | None = Query(default=None, ge=1970, le=3000),
+    month: int | None = Query(default=None, ge=1, le=12),
+    store: Storage = Depends(get_storage),
+):
+    """
+    Everything the app shows on launch in one response: settings, all tasks, the progress for `year`
+    (default: the selected year) and the `/summary/month` body for `month` (default: the current month).
+    Supports `If-None-Match` like the list routes.
+    """
+    owner_id = owner_id.strip()
+    await progress_buffer.flush_owner(owner_id)
+    version, settings_doc = await asyncio.gather(store.owner_version(owner_id), store.settings.get(owner_id))
+    settings_doc = settings_or_default(owner_id, settings_doc)
+    year = year or settings_doc["selected_year"]
+    month = month or utcnow().month
+    # The defaults move with the calendar and the settings, so they are part of the tag.
+    etag = f'W/"{version}-{year}-{month}"'
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+
+    tasks, progress = await asyncio.gather(store.tasks.for_owner(owner_id), store.progress.for_year(owner_id, year))
+
+    # The month summary is derived from the two reads above rather than queried again.
+    bit = month_bit(month)
+    summary = month_content(
+        owner_id,
+        year,
+        month,
+        [t for t in tasks if task_due_mask(t) & bit],
+        [p for p in progress if p["month"] == month],
+    )
+    content = {
+        "owner_id": owner_id,
+        "year": year,
+        "month": month,
+        "settings": settings_dict(settings_doc),
+        "tasks": [task_dict(t) for t in tasks],
+        "progress": [progress_dict(p) for p in progress],
+        "summary": summary,
+    }
+    return FastJSONResponse(content, headers={"ETag": etag})
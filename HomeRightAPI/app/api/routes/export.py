@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+import zlib
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator
+
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.core.metrics import InstrumentedRoute
+from app.db.catalog import load_overlays, merge_catalog, visible_entries
+from app.db.mongo import mongo
+from app.db.write_behind import progress_buffer
+
+
+router = APIRouter(prefix="/export", route_class=InstrumentedRoute)
+
+TASK_FIELDS = ("task_id", "title", "detail", "schedule", "month", "is_builtin", "created_at", "updated_at", "version")
+
+# (record type, collection, projection) in export order.
+EXPORT_SOURCES = [
+    ("settings", "settings", {"_id": 0, "owner_id": 1, "selected_year": 1, "created_at": 1, "updated_at": 1, "version": 1}),
+    ("task", "tasks", {"_id": 0, **{field: 1 for field in TASK_FIELDS}}),
+    ("task_overlay", "task_overlays", {"_id": 0, "task_id": 1, "hidden": 1, "overrides": 1, "created_at": 1, "updated_at": 1, "version": 1}),
+    (
+        "progress",
+        "progress",
+        {"task_id": 1, "year": 1, "month": 1, "status": 1, "cost": 1, "note": 1, "date": 1, "created_at": 1, "updated_at": 1, "version": 1},
+    ),
+]
+
+
+def get_db() -> AsyncIOMotorDatabase:
+    if settings.storage_backend != "mongo":
+        raise HTTPException(status_code=501, detail="Export needs the mongo storage backend")
+    return mongo.db
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, (ObjectId, Decimal)):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _line(kind: str, doc: dict) -> str:
+    return json.dumps({"type": kind, "data": doc}, default=_json_default, separators=(",", ":"))
+
+
+async def _catalog_tasks(db: AsyncIOMotorDatabase, owner_id: str, since: datetime | None) -> list[dict]:
+    """The built-in catalog tasks the owner sees in GET /tasks, except those it has its own document for."""
+    entries = await visible_entries(db, owner_id)
+    own = await db["tasks"].find({"owner_id": owner_id, "task_id": {"$in": list(entries)}}, {"_id": 0, "task_id": 1}).to_list(length=None)
+    own_ids = {d["task_id"] for d in own}
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return [
+        {field: doc.get(field) for field in TASK_FIELDS}
+        for doc in merge_catalog(entries, await load_overlays(db, owner_id), owner_id, own)
+        if doc["task_id"] not in own_ids and (since is None or doc["updated_at"].replace(tzinfo=None) > since)
+    ]
+
+
+async def _ndjson_chunks(db: AsyncIOMotorDatabase, owner_id: str, since: datetime | None) -> AsyncIterator[bytes]:
+    batch_size = settings.export_batch_size
+    query: dict = {"owner_id": owner_id}
+    if since is not None:
+        query["updated_at"] = {"$gt": since}
+
+    for kind, collection, projection in EXPORT_SOURCES:
+        cursor = db[collection].find(query, projection, batch_size=batch_size)
+        lines: list[str] = []
+        async for doc in cursor:
+            if "_id" in doc:
+                doc["id"] = doc.pop("_id")
+            lines.append(_line(kind, doc))
+            if len(lines) >= batch_size:
+                yield ("\n".join(lines) + "\n").encode()
+                lines = []
+        if kind == "task":
+            # Built-ins live in the shared catalog; export them as the owner sees them, like GET /tasks.
+            lines += [_line(kind, doc) for doc in await _catalog_tasks(db, owner_id, since)]
+        if lines:
+            yield ("\n".join(lines) + "\n").encode()
+
+
+async def _gzipped(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@router.get("/{owner_id}")
+async def export_owner(
+    owner_id: str,
+    since: datetime | None = None,
+    gzip: bool = False,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
+    """
+    Stream an owner's settings, tasks, task overlays and progress as NDJSON, one
+    `{"type": ..., "data": {...}}` record per line. Tasks are the ones GET /tasks lists, built-ins included. `since` limits the export to records updated after it;
+    `gzip=true` compresses the stream (Content-Encoding: gzip).
+    """
+    owner_id = owner_id.strip()
+    await progress_buffer.flush_owner(owner_id)
+    chunks = _ndjson_chunks(db, owner_id, since)
+    headers = {"Content-Disposition": f'attachment; filename="{owner_id}.ndjson"'}
+    if gzip:
+        chunks = _gzipped(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type="application/x-ndjson", headers=headers)
@@ -1,66 +1,64 @@
 from __future__ import annotations
 
-from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo import ReturnDocument
+from datetime import datetime
 
-from app.db.mongo import mongo
+from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import ValidationError
+
+from app.api.conditional import if_match_version, not_modified, owner_etag
+from app.api.serializers import progress_dict, progress_out
+from app.core.config import settings
+from app.core.metrics import InstrumentedRoute
+from app.db.storage import Conflict, PreconditionFailed, Storage, storage
+from app.db.write_behind import BufferFull, progress_buffer
 from app.models.enums import TaskStatus
-from app.models.progress import ProgressCreate, ProgressOut, ProgressUpdate
-from app.utils.bson import decimal_from_bson, decimal_to_bson, to_object_id_str, utcnow
+from app.models.progress import (
+    ProgressBatch,
+    ProgressBatchItemResult,
+    ProgressBatchOut,
+    ProgressCreate,
+    ProgressOut,
+    ProgressUpdate,
+)
+from app.utils.bson import utcnow
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.responses import FastJSONResponse
 
 
-router = APIRouter(prefix="/progress")
+router = APIRouter(prefix="/progress", route_class=InstrumentedRoute)
 
 
-def get_db() -> AsyncIOMotorDatabase:
-    return mongo.db
+def get_storage() -> Storage:
+    return storage
 
 
-def _doc_to_out(doc: dict) -> ProgressOut:
-    doc = to_object_id_str(doc)
-    return ProgressOut(
-        id=doc["_id"],
-        owner_id=doc["owner_id"],
-        task_id=doc["task_id"],
-        year=doc["year"],
-        month=doc["month"],
-        status=TaskStatus(doc["status"]),
-        cost=decimal_from_bson(doc.get("cost")),
-        note=doc.get("note", ""),
-        date=doc.get("date"),
-        created_at=doc["created_at"],
-        updated_at=doc["updated_at"],
-    )
+def _key_and_fields(payload: ProgressCreate) -> tuple[dict, dict]:
+    key = {"owner_id": payload.owner_id, "task_id": payload.task_id, "year": payload.year, "month": payload.month}
+    fields = {"status": payload.status.value, "cost": payload.cost, "note": payload.note, "date": payload.date}
+    return key, fields
+
+
+def _check_id(progress_id: str) -> None:
+    if not ObjectId.is_valid(progress_id):
+        raise HTTPException(status_code=400, detail="Invalid progress id")
 
 
 @router.post("", response_model=ProgressOut, status_code=status.HTTP_201_CREATED)
-async def create_progress(payload: ProgressCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
+async def create_progress(payload: ProgressCreate, store: Storage = Depends(get_storage)):
     now = utcnow()
-    doc = {
-        "owner_id": payload.owner_id,
-        "task_id": payload.task_id,
-        "year": payload.year,
-        "month": payload.month,
-        "status": payload.status.value,
-        "cost": decimal_to_bson(payload.cost),
-        "note": payload.note,
-        "date": payload.date,
-        "created_at": now,
-        "updated_at": now,
-    }
+    key, fields = _key_and_fields(payload)
+    await progress_buffer.flush_owner(key["owner_id"])
     try:
-        result = await db["progress"].insert_one(doc)
-    except Exception as e:
-        raise HTTPException(status_code=409, detail=f"Progress already exists or invalid: {e}")
-
-    doc["_id"] = result.inserted_id
-    return _doc_to_out(doc)
+        doc = await store.progress.create({**key, **fields, "created_at": now, "updated_at": now})
+    except Conflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return progress_out(doc)
 
 
 @router.get("", response_model=list[ProgressOut])
 async def list_progress(
+    request: Request,
     owner_id: str = Query(min_length=1),
     year: int | None = Query(default=None, ge=1970, le=3000),
     month: int | None = Query(default=None, ge=1, le=12),
@@ -68,67 +66,117 @@ async def list_progress(
     status_value: TaskStatus | None = Query(default=None, alias="status"),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=500, ge=1, le=2000),
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    cursor: str | None = None,
+    store: Storage = Depends(get_storage),
 ):
-    query: dict = {"owner_id": owner_id.strip()}
-    if year is not None:
-        query["year"] = year
-    if month is not None:
-        query["month"] = month
-    if task_id is not None:
-        query["task_id"] = task_id.strip()
-    if status_value is not None:
-        query["status"] = status_value.value
-
-    cursor = db["progress"].find(query).sort([("updated_at", -1)]).skip(skip).limit(limit)
-    return [_doc_to_out(d) async for d in cursor]
+    """
+    Newest first. Pass the `X-Next-Cursor` response header back as `cursor` to fetch the next page
+    without re-scanning earlier ones; the header is omitted on the last page.
+    Send the `ETag` back as `If-None-Match` to get `304 Not Modified` when nothing changed.
+    """
+    owner_id = owner_id.strip()
+    await progress_buffer.flush_owner(owner_id)
+    etag = await owner_etag(store, owner_id)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+
+    after = None
+    if cursor is not None:
+        try:
+            after = tuple(decode_cursor(cursor, (datetime, (ObjectId, str))))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    docs = await store.progress.list(
+        owner_id,
+        year=year,
+        month=month,
+        task_id=task_id.strip() if task_id is not None else None,
+        status=status_value.value if status_value is not None else None,
+        after=after,
+        skip=skip,
+        limit=limit,
+    )
+    headers = {"ETag": etag}
+    if len(docs) == limit:
+        headers["X-Next-Cursor"] = encode_cursor([docs[-1]["updated_at"], docs[-1]["_id"]])
+    return FastJSONResponse([progress_dict(d) for d in docs], headers=headers)
 
 
 @router.get("/{progress_id}", response_model=ProgressOut)
-async def get_progress(progress_id: str, owner_id: str = Query(min_length=1), db: AsyncIOMotorDatabase = Depends(get_db)):
-    if not ObjectId.is_valid(progress_id):
-        raise HTTPException(status_code=400, detail="Invalid progress id")
-    doc = await db["progress"].find_one({"_id": ObjectId(progress_id), "owner_id": owner_id.strip()})
+async def get_progress(progress_id: str, owner_id: str = Query(min_length=1), store: Storage = Depends(get_storage)):
+    _check_id(progress_id)
+    await progress_buffer.flush_owner(owner_id.strip())
+    doc = await store.progress.get(owner_id.strip(), progress_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Progress not found")
-    return _doc_to_out(doc)
+    return progress_out(doc)
 
 
 @router.put("/by-key", response_model=ProgressOut)
-async def upsert_progress_by_key(payload: ProgressCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
+async def upsert_progress_by_key(payload: ProgressCreate, store: Storage = Depends(get_storage)):
     """
     Upsert by (owner_id, task_id, year, month).
     This matches the iOS app behavior: edits overwrite the current record for that task-month-year.
+    With PROGRESS_WRITE_BEHIND on, the write is buffered briefly and coalesced with later ones for the same key;
+    503 when the buffer is full and cannot be flushed.
     """
-    now = utcnow()
-    query = {
-        "owner_id": payload.owner_id,
-        "task_id": payload.task_id,
-        "year": payload.year,
-        "month": payload.month,
-    }
-    update = {
-        "$set": {
-            "status": payload.status.value,
-            "cost": decimal_to_bson(payload.cost),
-            "note": payload.note,
-            "date": payload.date,
-            "updated_at": now,
-        },
-        "$setOnInsert": {"created_at": now},
-    }
-    result = await db["progress"].find_one_and_update(
-        query,
-        update,
-        upsert=True,
-        return_document=ReturnDocument.AFTER,
-    )
-    if result is None:
-        # Motor returns None if return_document isn't set as expected; fallback read.
-        result = await db["progress"].find_one(query)
-    if not result:
-        raise HTTPException(status_code=500, detail="Failed to upsert progress")
-    return _doc_to_out(result)
+    key, fields = _key_and_fields(payload)
+    if progress_buffer.enabled:
+        try:
+            return progress_out(await progress_buffer.put(key, fields, utcnow()))
+        except BufferFull as e:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+    return progress_out(await store.progress.upsert_by_key(key, fields, utcnow()))
+
+
+@router.put("/batch", response_model=ProgressBatchOut)
+async def upsert_progress_batch(payload: ProgressBatch, owner_id: str = Query(min_length=1), store: Storage = Depends(get_storage)):
+    """
+    Apply many /progress/by-key upserts for one owner as one batched write.
+    Results are reported per item; a later item for the same key supersedes an earlier one, and items
+    for any other owner are errors. The `owner_id` query parameter is what admission control limits.
+    """
+    owner_id = owner_id.strip()
+    if len(payload.items) > settings.progress_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {settings.progress_batch_max_items} items",
+        )
+
+    results: list[ProgressBatchItemResult | None] = [None] * len(payload.items)
+    latest_by_key: dict[tuple, int] = {}
+    valid: dict[int, ProgressCreate] = {}
+    for index, raw in enumerate(payload.items):
+        try:
+            item = ProgressCreate.model_validate(raw)
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            results[index] = ProgressBatchItemResult(index=index, status="error", error=error)
+            continue
+        if item.owner_id != owner_id:
+            results[index] = ProgressBatchItemResult(index=index, status="error", error=f"owner_id: not {owner_id!r}")
+            continue
+        key = (item.owner_id, item.task_id, item.year, item.month)
+        previous = latest_by_key.get(key)
+        if previous is not None:
+            results[previous] = ProgressBatchItemResult(index=previous, status="superseded")
+            del valid[previous]
+        latest_by_key[key] = index
+        valid[index] = item
+
+    # Buffered by-key writes must not land after (and overwrite) this batch.
+    await progress_buffer.flush()
+    op_items = list(valid)
+    written = await store.progress.upsert_many([_key_and_fields(valid[index]) for index in op_items], utcnow())
+    for index, result in zip(op_items, written):
+        results[index] = ProgressBatchItemResult(index=index, status=result.status, id=result.id, error=result.error)
+
+    counts = {"created": 0, "updated": 0, "error": 0}
+    for r in results:
+        if r.status in counts:
+            counts[r.status] += 1
+    return ProgressBatchOut(created=counts["created"], updated=counts["updated"], failed=counts["error"], results=results)
 
 
 @router.patch("/{progress_id}", response_model=ProgressOut)
@@ -136,28 +184,29 @@ async def update_progress(
     progress_id: str,
     payload: ProgressUpdate,
     owner_id: str = Query(min_length=1),
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    expected_version: int | None = Depends(if_match_version),
+    store: Storage = Depends(get_storage),
 ):
-    if not ObjectId.is_valid(progress_id):
-        raise HTTPException(status_code=400, detail="Invalid progress id")
-
-    doc = await db["progress"].find_one({"_id": ObjectId(progress_id), "owner_id": owner_id.strip()})
-    if not doc:
-        raise HTTPException(status_code=404, detail="Progress not found")
-
-    update: dict = {"updated_at": utcnow()}
+    """Partial update; `If-Match: <version>` makes it fail with 412 if the record changed since that version."""
+    _check_id(progress_id)
+    changes: dict = {}
     if payload.status is not None:
-        update["status"] = payload.status.value
+        changes["status"] = payload.status.value
     if payload.cost is not None:
-        update["cost"] = decimal_to_bson(payload.cost)
+        changes["cost"] = payload.cost
     if payload.note is not None:
-        update["note"] = payload.note
+        changes["note"] = payload.note
     if payload.date is not None:
-        update["date"] = payload.date
+        changes["date"] = payload.date
 
-    await db["progress"].update_one({"_id": doc["_id"]}, {"$set": update})
-    merged = {**doc, **update}
-    return _doc_to_out(merged)
+    await progress_buffer.flush_owner(owner_id.strip())
+    try:
+        doc = await store.progress.update(owner_id.strip(), progress_id, changes, utcnow(), expected_version=expected_version)
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
+    if not doc:
+        raise HTTPException(status_code=404, detail="Progress not found")
+    return progress_out(doc)
 
 
 @router.put("/{progress_id}", response_model=ProgressOut)
@@ -165,43 +214,41 @@ async def replace_progress(
     progress_id: str,
     payload: ProgressCreate,
     owner_id: str = Query(min_length=1),
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    expected_version: int | None = Depends(if_match_version),
+    store: Storage = Depends(get_storage),
 ):
     """
-    Replace an existing progress record by Mongo _id.
+    Replace an existing progress record by id; `If-Match: <version>` guards it like PATCH.
     Use /progress/by-key for the iOS-style (owner_id, task_id, year, month) upsert.
     """
-    if not ObjectId.is_valid(progress_id):
-        raise HTTPException(status_code=400, detail="Invalid progress id")
-    owner_id = owner_id.strip()
-
-    existing = await db["progress"].find_one({"_id": ObjectId(progress_id), "owner_id": owner_id})
-    if not existing:
+    _check_id(progress_id)
+    key, fields = _key_and_fields(payload)
+    fields.update(task_id=key["task_id"].strip(), year=key["year"], month=key["month"])
+    await progress_buffer.flush_owner(owner_id.strip())
+    try:
+        doc = await store.progress.replace(owner_id.strip(), progress_id, fields, utcnow(), expected_version=expected_version)
+    except Conflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
+    if not doc:
         raise HTTPException(status_code=404, detail="Progress not found")
-
-    now = utcnow()
-    replacement = {
-        "owner_id": owner_id,
-        "task_id": payload.task_id.strip(),
-        "year": payload.year,
-        "month": payload.month,
-        "status": payload.status.value,
-        "cost": decimal_to_bson(payload.cost),
-        "note": payload.note,
-        "date": payload.date,
-        "created_at": existing["created_at"],
-        "updated_at": now,
-    }
-
-    await db["progress"].replace_one({"_id": existing["_id"]}, {**replacement, "_id": existing["_id"]})
-    return _doc_to_out({**replacement, "_id": existing["_id"]})
+    return progress_out(doc)
 
 
 @router.delete("/{progress_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_progress(progress_id: str, owner_id: str = Query(min_length=1), db: AsyncIOMotorDatabase = Depends(get_db)):
-    if not ObjectId.is_valid(progress_id):
-        raise HTTPException(status_code=400, detail="Invalid progress id")
-    result = await db["progress"].delete_one({"_id": ObjectId(progress_id), "owner_id": owner_id.strip()})
-    if result.deleted_count == 0:
+async def delete_progress(
+    progress_id: str,
+    owner_id: str = Query(min_length=1),
+    expected_version: int | None = Depends(if_match_version),
+    store: Storage = Depends(get_storage),
+):
+    _check_id(progress_id)
+    await progress_buffer.flush_owner(owner_id.strip())
+    try:
+        deleted = await store.progress.delete(owner_id.strip(), progress_id, expected_version=expected_version)
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
+    if not deleted:
         raise HTTPException(status_code=404, detail="Progress not found")
     return None
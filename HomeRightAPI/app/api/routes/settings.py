@@ -1,61 +1,53 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.db.mongo import mongo
+from app.api.conditional import if_match_version
+from app.api.serializers import settings_or_default, settings_out
+from app.core.metrics import InstrumentedRoute
+from app.db.storage import PreconditionFailed, Storage, storage
 from app.models.settings import SettingsOut, SettingsUpsert
 from app.utils.bson import utcnow
 
 
-router = APIRouter(prefix="/settings")
+router = APIRouter(prefix="/settings", route_class=InstrumentedRoute)
 
 
-def get_db() -> AsyncIOMotorDatabase:
-    return mongo.db
+def get_storage() -> Storage:
+    return storage
 
 
 @router.get("/{owner_id}", response_model=SettingsOut)
-async def get_settings(owner_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+async def get_settings(owner_id: str, store: Storage = Depends(get_storage)):
     owner_id = owner_id.strip()
-    doc = await db["settings"].find_one({"owner_id": owner_id})
-    if not doc:
-        now = utcnow()
-        doc = {"owner_id": owner_id, "selected_year": 2024, "created_at": now, "updated_at": now}
-        await db["settings"].insert_one(doc)
-    return SettingsOut(
-        owner_id=doc["owner_id"],
-        selected_year=doc["selected_year"],
-        created_at=doc["created_at"],
-        updated_at=doc["updated_at"],
-    )
+    return settings_out(settings_or_default(owner_id, await store.settings.get(owner_id)))
 
 
 @router.put("/{owner_id}", response_model=SettingsOut)
-async def upsert_settings(owner_id: str, payload: SettingsUpsert, db: AsyncIOMotorDatabase = Depends(get_db)):
-    owner_id = owner_id.strip()
-    now = utcnow()
-    await db["settings"].update_one(
-        {"owner_id": owner_id},
-        {"$set": {"selected_year": payload.selected_year, "updated_at": now}, "$setOnInsert": {"created_at": now}},
-        upsert=True,
-    )
-    doc = await db["settings"].find_one({"owner_id": owner_id})
-    if not doc:
-        raise HTTPException(status_code=500, detail="Failed to upsert settings")
-    return SettingsOut(
-        owner_id=doc["owner_id"],
-        selected_year=doc["selected_year"],
-        created_at=doc["created_at"],
-        updated_at=doc["updated_at"],
-    )
+async def upsert_settings(
+    owner_id: str,
+    payload: SettingsUpsert,
+    expected_version: int | None = Depends(if_match_version),
+    store: Storage = Depends(get_storage),
+):
+    """Create or update settings. With `If-Match: <version>` only settings at that version are updated (else 412)."""
+    try:
+        doc = await store.settings.upsert(owner_id.strip(), payload.selected_year, utcnow(), expected_version=expected_version)
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
+    return settings_out(doc)
 
 
 @router.delete("/{owner_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_settings(owner_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
-    owner_id = owner_id.strip()
-    result = await db["settings"].delete_one({"owner_id": owner_id})
-    if result.deleted_count == 0:
+async def delete_settings(
+    owner_id: str,
+    expected_version: int | None = Depends(if_match_version),
+    store: Storage = Depends(get_storage),
+):
+    try:
+        deleted = await store.settings.delete(owner_id.strip(), expected_version=expected_version)
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
+    if not deleted:
         raise HTTPException(status_code=404, detail="Settings not found")
     return None
-
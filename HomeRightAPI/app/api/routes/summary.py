@@ -1,70 +1,54 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
-from motor.motor_asyncio import AsyncIOMotorDatabase
+import asyncio
+from decimal import Decimal
 
-from app.db.mongo import mongo
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
+
+from app.api.conditional import not_modified, owner_etag
+from app.core.metrics import SUMMARY_COALESCED, InstrumentedRoute
+from app.db.storage import Storage, storage
+from app.db.write_behind import progress_buffer
 from app.models.enums import TaskStatus
+from app.models.summary import MonthTotals, YearSummaryOut
 from app.utils.bson import decimal_from_bson
+from app.utils.responses import FastJSONResponse
+from app.utils.singleflight import SingleFlight
 
 
-router = APIRouter(prefix="/summary")
+router = APIRouter(prefix="/summary", route_class=InstrumentedRoute)
 
+# Devices sharing an owner_id tend to ask for the same summary at once; the ETag in the key keeps
+# requests that arrive after a write from joining a computation that started before it.
+_month_flights = SingleFlight(SUMMARY_COALESCED, "month")
+_year_flights = SingleFlight(SUMMARY_COALESCED, "year")
 
-def get_db() -> AsyncIOMotorDatabase:
-    return mongo.db
 
+def get_storage() -> Storage:
+    return storage
 
-@router.get("/month/{owner_id}/{year}/{month}")
-async def month_summary(owner_id: str, year: int, month: int, db: AsyncIOMotorDatabase = Depends(get_db)):
-    owner_id = owner_id.strip()
 
-    tasks = await db["tasks"].find({"owner_id": owner_id}).to_list(length=5000)
-    progress = await db["progress"].find({"owner_id": owner_id, "year": year, "month": month}).to_list(length=5000)
+def month_content(owner_id: str, year: int, month: int, tasks: list[dict], progress: list[dict]) -> dict:
+    """The /summary/month body from the tasks due that month and the month's progress records."""
     progress_by_task = {p["task_id"]: p for p in progress}
 
     tasks_in_month = []
     for t in tasks:
-        schedule = t.get("schedule")
-        task_month = t.get("month")
-
-        include = False
-        if schedule == "custom":
-            include = task_month == month
-        elif schedule == "monthly":
-            include = True
-        elif schedule == "quarterly":
-            include = month in [1, 4, 7, 10]
-        elif schedule == "annual":
-            include = month == 1
-        elif schedule == "spring":
-            include = month == 3
-        elif schedule == "summer":
-            include = month == 6
-        elif schedule == "fall":
-            include = month == 9
-        elif schedule == "winter":
-            include = month == 12
-        elif schedule == "seasonal":
-            include = month == 3
-
-        if not include:
-            continue
-
         p = progress_by_task.get(t["task_id"])
         tasks_in_month.append(
             {
                 "task_id": t["task_id"],
                 "title": t.get("title", ""),
                 "detail": t.get("detail", ""),
-                "schedule": schedule,
+                "schedule": t.get("schedule"),
                 "month": t.get("month"),
                 "is_builtin": bool(t.get("is_builtin", False)),
                 "progress": None
                 if not p
                 else {
                     "status": p.get("status"),
-                    "cost": decimal_from_bson(p.get("cost")),
+                    # A JSON number, as this endpoint has always returned it.
+                    "cost": None if p.get("cost") is None else float(decimal_from_bson(p["cost"])),
                     "note": p.get("note", ""),
                     "date": p.get("date"),
                     "updated_at": p.get("updated_at"),
@@ -82,7 +66,7 @@ async def month_summary(owner_id: str, year: int, month: int, db: AsyncIOMotorDa
         if p["status"] == TaskStatus.complete.value:
             completed += 1
             if p["cost"] is not None:
-                total_cost += float(p["cost"])
+                total_cost += p["cost"]
 
     return {
         "owner_id": owner_id,
@@ -96,28 +80,85 @@ async def month_summary(owner_id: str, year: int, month: int, db: AsyncIOMotorDa
     }
 
 
-@router.get("/year/{owner_id}/{year}")
+@router.get("/month/{owner_id}/{year}/{month}")
+async def month_summary(
+    request: Request,
+    owner_id: str,
+    year: int,
+    month: int = Path(ge=1, le=12),
+    include_tasks: bool = True,
+    store: Storage = Depends(get_storage),
+):
+    """
+    Month totals plus the tasks due that month with their progress.
+    With include_tasks=false only the totals are returned, from a single rollup lookup.
+    """
+    owner_id = owner_id.strip()
+    await progress_buffer.flush_owner(owner_id)
+    etag = await owner_etag(store, owner_id)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+
+    content = await _month_flights.do(
+        (owner_id, year, month, include_tasks, etag), lambda: _month_summary(store, owner_id, year, month, include_tasks)
+    )
+    return FastJSONResponse(content, headers={"ETag": etag})
+
+
+async def _month_summary(store: Storage, owner_id: str, year: int, month: int, include_tasks: bool) -> dict:
+    if not include_tasks:
+        rollup = (await store.summaries.month_totals(owner_id, year, [month]))[month]
+        return {
+            "owner_id": owner_id,
+            "year": year,
+            "month": month,
+            "total_tasks": rollup.due_tasks,
+            "completed_tasks": rollup.completed_tasks,
+            "is_month_complete": rollup.due_tasks > 0 and rollup.completed_tasks == rollup.due_tasks,
+            "completed_cost_total": float(rollup.completed_cost_total),
+        }
+
+    tasks, progress = await asyncio.gather(store.tasks.due_in_month(owner_id, month), store.progress.for_month(owner_id, year, month))
+    return month_content(owner_id, year, month, tasks, progress)
+
+
+@router.get("/year/{owner_id}/{year}", response_model=YearSummaryOut)
 async def year_summary(
+    request: Request,
+    response: Response,
     owner_id: str,
     year: int,
     months: int = Query(default=12, ge=1, le=12),
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    store: Storage = Depends(get_storage),
 ):
+    """Year totals with a per-month breakdown for months 1..`months` (from the rollups collection on Mongo)."""
     owner_id = owner_id.strip()
-    progress = await db["progress"].find({"owner_id": owner_id, "year": year, "status": TaskStatus.complete.value}).to_list(length=20000)
-
-    completed_count = len(progress)
-    completed_cost = 0
-    for p in progress:
-        cost = decimal_from_bson(p.get("cost"))
-        if cost is not None:
-            completed_cost += float(cost)
-
-    return {
-        "owner_id": owner_id,
-        "year": year,
-        "completed_count": completed_count,
-        "completed_cost_total": completed_cost,
-        "notes": "This endpoint mirrors the iOS app's year totals; month-level 'yearProgress' is computed in-app and can also be derived from /summary/month.",
-    }
-
+    await progress_buffer.flush_owner(owner_id)
+    etag = await owner_etag(store, owner_id)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    response.headers["ETag"] = etag
+    return await _year_flights.do((owner_id, year, months, etag), lambda: _year_summary(store, owner_id, year, months))
+
+
+async def _year_summary(store: Storage, owner_id: str, year: int, months: int) -> YearSummaryOut:
+    rollups = await store.summaries.month_totals(owner_id, year, range(1, months + 1))
+    by_month = [
+        MonthTotals(
+            month=m,
+            due_tasks=r.due_tasks,
+            completed_tasks=r.completed_tasks,
+            completed_cost_total=float(r.completed_cost_total),
+        )
+        for m, r in rollups.items()
+    ]
+
+    # Summed as Decimal so the total is exact, then sent as a number like /summary/month.
+    return YearSummaryOut(
+        owner_id=owner_id,
+        year=year,
+        months=months,
+        completed_count=sum(m.completed_tasks for m in by_month),
+        completed_cost_total=float(sum((r.completed_cost_total for r in rollups.values()), Decimal(0))),
+        by_month=by_month,
+    )
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.api.serializers import progress_dict, settings_dict, task_dict
+from app.core.config import settings
+from app.core.metrics import InstrumentedRoute
+from app.db.catalog import catalog, catalog_owner, effective_task, load_overlays
+from app.db.mongo import mongo
+from app.db.write_behind import progress_buffer
+from app.models.sync import SyncOut
+from app.utils.bson import utcnow
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.responses import FastJSONResponse
+
+
+router = APIRouter(prefix="/sync", route_class=InstrumentedRoute)
+
+
+def get_db() -> AsyncIOMotorDatabase:
+    if settings.storage_backend != "mongo":
+        raise HTTPException(status_code=501, detail="Sync needs the mongo storage backend")
+    return mongo.db
+
+
+@router.get("/{owner_id}", response_model=SyncOut)
+async def sync(owner_id: str, since: str | None = None, db: AsyncIOMotorDatabase = Depends(get_db)):
+    """
+    Everything that changed for an owner after `since` (a `token` from a previous sync).
+    Without `since`, or when the built-in catalog changed, tasks are returned in full (`full: true`
+    for a complete snapshot). Deletes and hidden built-in tasks come back as `tombstones`.
+    An expired token returns 410; start again without `since`.
+    """
+    owner_id = owner_id.strip()
+    await progress_buffer.flush_owner(owner_id)
+    now = utcnow().replace(tzinfo=None)
+    since_seq, since_catalog = 0, None
+    if since is not None:
+        try:
+            since_seq, since_catalog, issued_at = decode_cursor(since, (int, str, datetime))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid sync token")
+        if now - issued_at.replace(tzinfo=None) > timedelta(days=settings.tombstone_ttl_days):
+            raise HTTPException(status_code=410, detail="Sync token expired; sync again without since")
+
+    # Read the sequence before the changes so nothing written meanwhile is skipped by the next token.
+    state = await db["owner_versions"].find_one({"_id": owner_id}) or {"version": 0}
+    catalog_version = await catalog.version(db)
+    changed: dict = {"owner_id": owner_id}
+    if since is not None:
+        changed["seq"] = {"$gt": since_seq}
+
+    reads = [
+        db["tasks"].find(changed).to_list(length=None),
+        load_overlays(db, owner_id),
+        catalog_owner(db, owner_id),
+        db["progress"].find(changed).to_list(length=None),
+        db["settings"].find_one(changed),
+    ]
+    if since is not None:
+        reads.append(db["tombstones"].find(changed, {"_id": 0, "kind": 1, "key": 1, "seq": 1}).to_list(length=None))
+    task_docs, overlays, enabled, progress_docs, settings_doc, *rest = await asyncio.gather(*reads)
+    tombstone_docs = rest[0] if rest else []
+
+    # Catalog entries are not per-owner, so a catalog change resends every built-in task, as does the
+    # owner seeding built-ins (which is when it starts seeing the catalog).
+    all_builtins = since is None or since_catalog != catalog_version or (enabled is not None and enabled["seq"] > since_seq)
+    own_ids = {d["task_id"] for d in task_docs}
+    if all_builtins and since is not None:
+        own_ids |= {d["task_id"] for d in await db["tasks"].find({"owner_id": owner_id}, {"task_id": 1}).to_list(length=None)}
+    tasks = [task_dict(d) for d in task_docs]
+    for task_id, entry in (await catalog.tasks(db) if enabled else {}).items():
+        overlay = overlays.get(task_id)
+        if task_id in own_ids or not (all_builtins or (overlay and overlay.get("seq", 0) > since_seq)):
+            continue
+        doc = effective_task(entry, overlay, owner_id)
+        if doc is not None:
+            tasks.append(task_dict(doc))
+        elif since is not None:
+            tombstone_docs.append({"kind": "task", "key": {"task_id": task_id}, "seq": overlay.get("seq", 0)})
+
+    # Writers allocate a seq before their write lands; hold the token back while any is pending. A count
+    # left behind by a worker that died mid-write is ignored once the last write is SYNC_SETTLE_SECONDS old.
+    settled = (
+        state.get("pending", 0) <= 0
+        or state.get("changed_at") is None
+        or now - state["changed_at"].replace(tzinfo=None) > timedelta(seconds=settings.sync_settle_seconds)
+    )
+    token_seq = state["version"] if settled else since_seq
+    return FastJSONResponse(
+        {
+            "owner_id": owner_id,
+            "token": encode_cursor([token_seq, catalog_version, now]),
+            "full": since is None,
+            "tasks": tasks,
+            "progress": [progress_dict(d) for d in progress_docs],
+            "settings": settings_dict(settings_doc) if settings_doc else None,
+            "tombstones": sorted(tombstone_docs, key=lambda t: t["seq"]),
+        }
+    )
@@ -1,99 +1,117 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
-from app.db.mongo import mongo
+from app.api.conditional import if_match_version, not_modified, owner_etag
+from app.api.serializers import task_dict, task_out
+from app.core.metrics import InstrumentedRoute
+from app.db.checklist import CHECKLIST_VERSION
+from app.db.storage import Conflict, PreconditionFailed, Storage, storage
 from app.models.enums import Schedule
-from app.models.task import TaskCreate, TaskOut, TaskUpdate
-from app.utils.bson import to_object_id_str, utcnow
+from app.models.task import TaskCreate, TaskOut, TaskSeedOut, TaskUpdate
+from app.utils.bson import utcnow
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.responses import FastJSONResponse
+from app.utils.schedule import due_mask
 
 
-router = APIRouter(prefix="/tasks")
+router = APIRouter(prefix="/tasks", route_class=InstrumentedRoute)
 
 
-def get_db() -> AsyncIOMotorDatabase:
-    return mongo.db
+def get_storage() -> Storage:
+    return storage
 
 
-@router.post("", response_model=TaskOut, status_code=status.HTTP_201_CREATED)
-async def create_task(payload: TaskCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
-    now = utcnow()
-    task_id = payload.ensure_task_id()
-
-    doc = {
-        "owner_id": payload.owner_id,
-        "task_id": task_id,
+def _task_fields(payload: TaskCreate) -> dict:
+    return {
         "title": payload.title,
         "detail": payload.detail,
         "schedule": payload.schedule.value,
         "month": payload.month,
+        "due_mask": due_mask(payload.schedule, payload.month),
         "is_builtin": payload.is_builtin,
+    }
+
+
+@router.post("", response_model=TaskOut, status_code=status.HTTP_201_CREATED)
+async def create_task(payload: TaskCreate, store: Storage = Depends(get_storage)):
+    now = utcnow()
+    doc = {
+        "owner_id": payload.owner_id,
+        "task_id": payload.ensure_task_id(),
+        **_task_fields(payload),
         "created_at": now,
         "updated_at": now,
     }
-
     try:
-        await db["tasks"].insert_one(doc)
-    except Exception as e:
-        raise HTTPException(status_code=409, detail=f"Task already exists or invalid: {e}")
-
+        doc = await store.tasks.create(doc)
+    except Conflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     return TaskOut(**doc)
 
 
+@router.post("/seed/{owner_id}", response_model=TaskSeedOut)
+async def seed_tasks(owner_id: str, store: Storage = Depends(get_storage)):
+    """
+    Give the owner the built-in checklist in one call; tasks it already has count as seeded.
+    On mongo built-ins are shared catalog entries, so this brings the catalog up to date and shows it to the owner.
+    """
+    owner_id = owner_id.strip()
+    created, total = await store.tasks.seed_builtins(owner_id, utcnow())
+    return TaskSeedOut(owner_id=owner_id, checklist_version=CHECKLIST_VERSION, created=created, builtin_tasks=total)
+
+
 @router.get("", response_model=list[TaskOut])
 async def list_tasks(
+    request: Request,
     owner_id: str = Query(min_length=1),
     schedule: Schedule | None = None,
     month: int | None = Query(default=None, ge=1, le=12),
     is_builtin: bool | None = None,
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=200, ge=1, le=1000),
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    cursor: str | None = None,
+    store: Storage = Depends(get_storage),
 ):
-    query: dict = {"owner_id": owner_id.strip()}
-    if schedule is not None:
-        query["schedule"] = schedule.value
-    if month is not None:
-        query["month"] = month
-    if is_builtin is not None:
-        query["is_builtin"] = is_builtin
-
-    cursor = db["tasks"].find(query).sort([("is_builtin", -1), ("title", 1)]).skip(skip).limit(limit)
-    docs = [to_object_id_str(d) async for d in cursor]
-    return [
-        TaskOut(
-            owner_id=d["owner_id"],
-            task_id=d["task_id"],
-            title=d["title"],
-            detail=d.get("detail", ""),
-            schedule=Schedule(d["schedule"]),
-            month=d.get("month"),
-            is_builtin=bool(d.get("is_builtin", False)),
-            created_at=d["created_at"],
-            updated_at=d["updated_at"],
-        )
-        for d in docs
-    ]
+    """
+    Built-in tasks first, then by title. Pass the `X-Next-Cursor` response header back as `cursor`
+    to fetch the next page; the header is omitted on the last page.
+    Send the `ETag` back as `If-None-Match` to get `304 Not Modified` when nothing changed.
+    """
+    owner_id = owner_id.strip()
+    etag = await owner_etag(store, owner_id)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+
+    after = None
+    if cursor is not None:
+        try:
+            after = tuple(decode_cursor(cursor, (bool, str, str)))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    page = await store.tasks.list(
+        owner_id,
+        schedule=schedule.value if schedule is not None else None,
+        month=month,
+        is_builtin=is_builtin,
+        after=after,
+        skip=skip,
+        limit=limit,
+    )
+    headers = {"ETag": etag}
+    if len(page) == limit:
+        last = page[-1]
+        headers["X-Next-Cursor"] = encode_cursor([bool(last.get("is_builtin", False)), last["title"], last["task_id"]])
+    return FastJSONResponse([task_dict(d) for d in page], headers=headers)
 
 
 @router.get("/{task_id}", response_model=TaskOut)
-async def get_task(task_id: str, owner_id: str = Query(min_length=1), db: AsyncIOMotorDatabase = Depends(get_db)):
-    doc = await db["tasks"].find_one({"owner_id": owner_id.strip(), "task_id": task_id})
+async def get_task(task_id: str, owner_id: str = Query(min_length=1), store: Storage = Depends(get_storage)):
+    doc = await store.tasks.get(owner_id.strip(), task_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Task not found")
-    doc = to_object_id_str(doc)
-    return TaskOut(
-        owner_id=doc["owner_id"],
-        task_id=doc["task_id"],
-        title=doc["title"],
-        detail=doc.get("detail", ""),
-        schedule=Schedule(doc["schedule"]),
-        month=doc.get("month"),
-        is_builtin=bool(doc.get("is_builtin", False)),
-        created_at=doc["created_at"],
-        updated_at=doc["updated_at"],
-    )
+    return task_out(doc)
 
 
 @router.put("/{task_id}", response_model=TaskOut)
@@ -101,34 +119,20 @@ async def replace_task(
     task_id: str,
     payload: TaskCreate,
     owner_id: str = Query(min_length=1),
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    expected_version: int | None = Depends(if_match_version),
+    store: Storage = Depends(get_storage),
 ):
+    """Create or overwrite a task. With `If-Match: <version>` only an existing task at that version is overwritten (else 412)."""
     if payload.ensure_task_id() != task_id:
         raise HTTPException(status_code=400, detail="task_id mismatch")
     if payload.owner_id.strip() != owner_id.strip():
         raise HTTPException(status_code=400, detail="owner_id mismatch")
 
-    now = utcnow()
-    update = {
-        "owner_id": payload.owner_id.strip(),
-        "task_id": task_id,
-        "title": payload.title,
-        "detail": payload.detail,
-        "schedule": payload.schedule.value,
-        "month": payload.month,
-        "is_builtin": payload.is_builtin,
-        "updated_at": now,
-    }
-
-    existing = await db["tasks"].find_one({"owner_id": owner_id.strip(), "task_id": task_id})
-    if not existing:
-        update["created_at"] = now
-        await db["tasks"].insert_one(update)
-        return TaskOut(**update)
-
-    await db["tasks"].update_one({"_id": existing["_id"]}, {"$set": update})
-    update["created_at"] = existing["created_at"]
-    return TaskOut(**update)
+    try:
+        doc = await store.tasks.replace(payload.owner_id.strip(), task_id, _task_fields(payload), utcnow(), expected_version=expected_version)
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
+    return task_out(doc)
 
 
 @router.patch("/{task_id}", response_model=TaskOut)
@@ -136,41 +140,40 @@ async def update_task(
     task_id: str,
     payload: TaskUpdate,
     owner_id: str = Query(min_length=1),
-    db: AsyncIOMotorDatabase = Depends(get_db),
+    expected_version: int | None = Depends(if_match_version),
+    store: Storage = Depends(get_storage),
 ):
-    doc = await db["tasks"].find_one({"owner_id": owner_id.strip(), "task_id": task_id})
-    if not doc:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    update: dict = {"updated_at": utcnow()}
+    """Partial update; `If-Match: <version>` makes it fail with 412 if the task changed since that version."""
+    changes: dict = {}
     for field in ["title", "detail", "is_builtin"]:
         value = getattr(payload, field)
         if value is not None:
-            update[field] = value
+            changes[field] = value
     if payload.schedule is not None:
-        update["schedule"] = payload.schedule.value
+        changes["schedule"] = payload.schedule.value
     if payload.month is not None:
-        update["month"] = payload.month
-
-    await db["tasks"].update_one({"_id": doc["_id"]}, {"$set": update})
-    merged = {**doc, **update}
-    merged = to_object_id_str(merged)
-    return TaskOut(
-        owner_id=merged["owner_id"],
-        task_id=merged["task_id"],
-        title=merged["title"],
-        detail=merged.get("detail", ""),
-        schedule=Schedule(merged["schedule"]),
-        month=merged.get("month"),
-        is_builtin=bool(merged.get("is_builtin", False)),
-        created_at=merged["created_at"],
-        updated_at=merged["updated_at"],
-    )
+        changes["month"] = payload.month
+
+    try:
+        doc = await store.tasks.update(owner_id.strip(), task_id, changes, utcnow(), expected_version=expected_version)
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
+    if not doc:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task_out(doc)
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_task(task_id: str, owner_id: str = Query(min_length=1), db: AsyncIOMotorDatabase = Depends(get_db)):
-    result = await db["tasks"].delete_one({"owner_id": owner_id.strip(), "task_id": task_id})
-    if result.deleted_count == 0:
+async def delete_task(
+    task_id: str,
+    owner_id: str = Query(min_length=1),
+    expected_version: int | None = Depends(if_match_version),
+    store: Storage = Depends(get_storage),
+):
+    try:
+        deleted = await store.tasks.delete(owner_id.strip(), task_id, expected_version=expected_version)
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
+    if not deleted:
         raise HTTPException(status_code=404, detail="Task not found")
     return None
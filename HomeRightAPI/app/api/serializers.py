@@ -0,0 +1,81 @@
+"""
+Response shapes built from our own storage documents, shared by the routes that return them.
+
+The `*_dict` helpers skip validation, so only pass them documents read from our own storage.
+"""
+
+from __future__ import annotations
+
+from app.models.enums import Schedule, TaskStatus
+from app.models.progress import ProgressOut
+from app.models.settings import SettingsOut
+from app.models.task import TaskOut
+from app.utils.bson import decimal_from_bson, utcnow
+
+
+DEFAULT_SELECTED_YEAR = 2024
+
+
+def task_dict(doc: dict) -> dict:
+    """TaskOut-shaped dict from one of our own documents, without validation."""
+    return {
+        "owner_id": doc["owner_id"],
+        "task_id": doc["task_id"],
+        "title": doc["title"],
+        "detail": doc.get("detail", ""),
+        "schedule": Schedule(doc["schedule"]),
+        "month": doc.get("month"),
+        "is_builtin": bool(doc.get("is_builtin", False)),
+        "created_at": doc["created_at"],
+        "updated_at": doc["updated_at"],
+        "version": doc.get("version", 0),
+    }
+
+
+def task_out(doc: dict) -> TaskOut:
+    return TaskOut.model_construct(**task_dict(doc))
+
+
+def progress_dict(doc: dict) -> dict:
+    """ProgressOut-shaped dict from one of our own documents, without validation."""
+    return {
+        "id": str(doc["_id"]),
+        "owner_id": doc["owner_id"],
+        "task_id": doc["task_id"],
+        "year": doc["year"],
+        "month": doc["month"],
+        "status": TaskStatus(doc["status"]),
+        "cost": decimal_from_bson(doc.get("cost")),
+        "note": doc.get("note", ""),
+        "date": doc.get("date"),
+        "created_at": doc["created_at"],
+        "updated_at": doc["updated_at"],
+        "version": doc.get("version", 0),
+    }
+
+
+def progress_out(doc: dict) -> ProgressOut:
+    return ProgressOut.model_construct(**progress_dict(doc))
+
+
+def settings_dict(doc: dict) -> dict:
+    """SettingsOut-shaped dict from one of our own documents, without validation."""
+    return {
+        "owner_id": doc["owner_id"],
+        "selected_year": doc["selected_year"],
+        "created_at": doc["created_at"],
+        "updated_at": doc["updated_at"],
+        "version": doc.get("version", 0),
+    }
+
+
+def settings_out(doc: dict) -> SettingsOut:
+    return SettingsOut(**settings_dict(doc))
+
+
+def settings_or_default(owner_id: str, doc: dict | None) -> dict:
+    """Stored settings, or the defaults (version 0, not stored) for an owner who never saved any."""
+    if doc is not None:
+        return doc
+    now = utcnow()
+    return {"owner_id": owner_id, "selected_year": DEFAULT_SELECTED_YEAR, "created_at": now, "updated_at": now, "version": 0}
@@ -0,0 +1,173 @@
+"""
+Admission control: per-owner token buckets and a global cap on database-heavy requests.
+
+Each request to an InstrumentedRoute that names an owner (an `owner_id` path or query parameter) takes
+one token from that owner's bucket for the route. Buckets use the route's ADMISSION_ROUTE_LIMITS entry,
+else ADMISSION_OWNER_RATE and ADMISSION_OWNER_BURST. An empty bucket gets `429` with `Retry-After` set to
+when the next token arrives.
+
+A heavy route also needs one of ADMISSION_MAX_CONCURRENT slots. When all are taken, requests wait in a
+queue of at most ADMISSION_QUEUE_SIZE requests, and at most ADMISSION_QUEUE_PER_OWNER from one owner.
+Freed slots go to the waiting owners in turn, not in arrival order, so one owner with a deep backlog
+cannot hold up the rest. A full queue, or a wait longer than ADMISSION_QUEUE_TIMEOUT_SECONDS, gets
+`503` with `Retry-After`.
+
+All limits are per worker process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from urllib.parse import parse_qsl
+
+from starlette.responses import JSONResponse
+from starlette.types import Scope
+
+from app.core.config import RouteLimit, settings
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+    def response(self) -> JSONResponse:
+        detail = "Too many requests for this owner" if self.status_code == 429 else "Server is busy"
+        return JSONResponse({"detail": detail}, status_code=self.status_code, headers={"Retry-After": str(self.retry_after)})
+
+
+class TokenBuckets:
+    """Token buckets by key; only the `max_keys` most recently used are kept (a dropped bucket starts full)."""
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[tuple, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: tuple, rate: float, burst: float) -> float:
+        """Take a token; returns 0, or the seconds until a token is available if the bucket is empty."""
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+        self._buckets[key] = (tokens - 1 if tokens >= 1 else tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class FairSlots:
+    """`limit` slots; waiters queue per owner and freed slots go round-robin across owners."""
+
+    def __init__(self, limit: int, queue_size: int, per_owner: int) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.per_owner = per_owner
+        self.active = 0
+        self.waiting = 0
+        self._waiters: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+
+    async def acquire(self, owner: str, timeout: float) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        queue = self._waiters.get(owner)
+        if self.waiting >= self.queue_size or (queue is not None and len(queue) >= self.per_owner):
+            raise Rejected(503, "queue_full", timeout)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(owner, deque()).append(waiter)
+        self.waiting += 1
+        try:
+            async with asyncio.timeout(timeout):
+                await waiter
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended; pass it on.
+                self.release()
+            else:
+                self._forget(owner, waiter)
+            if isinstance(e, TimeoutError):
+                raise Rejected(503, "queue_timeout", timeout) from None
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            owner, queue = next(iter(self._waiters.items()))
+            waiter = queue.popleft()
+            self.waiting -= 1
+            if queue:
+                self._waiters.move_to_end(owner)
+            else:
+                del self._waiters[owner]
+            if not waiter.done():
+                # The slot passes to the waiter without ever being free, so nobody can barge in.
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _forget(self, owner: str, waiter: asyncio.Future) -> None:
+        queue = self._waiters.get(owner)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self.waiting -= 1
+            if not queue:
+                del self._waiters[owner]
+
+
+def _owner_id(scope: Scope) -> str | None:
+    owner = scope.get("path_params", {}).get("owner_id")
+    query = scope.get("query_string", b"")
+    if owner is None and b"owner_id=" in query:
+        owner = next((value for name, value in parse_qsl(query.decode("latin-1")) if name == "owner_id"), None)
+    return owner.strip() if owner else None
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        enabled: bool,
+        routes: dict[str, RouteLimit],
+        default: RouteLimit,
+        slots: FairSlots,
+        queue_timeout: float,
+        max_owners: int,
+    ) -> None:
+        self.enabled = enabled
+        self.routes = routes
+        self.default = default
+        self.slots = slots
+        self.queue_timeout = queue_timeout
+        self.buckets = TokenBuckets(max_owners)
+
+    async def enter(self, method: str, route: str, scope: Scope) -> bool:
+        """Admit the request or raise Rejected; returns whether it holds a slot to give back with leave()."""
+        key = f"{method} {route}"
+        limit = self.routes.get(key, self.default)
+        owner = _owner_id(scope)
+        if owner is not None and limit.rate > 0:
+            wait = self.buckets.take((owner, key), limit.rate, limit.burst)
+            if wait:
+                raise Rejected(429, "rate_limited", wait)
+        if not limit.heavy:
+            return False
+        await self.slots.acquire(owner or "", self.queue_timeout)
+        return True
+
+    def leave(self) -> None:
+        self.slots.release()
+
+
+admission = AdmissionController(
+    settings.admission_enabled,
+    settings.admission_route_limits,
+    RouteLimit(rate=settings.admission_owner_rate, burst=settings.admission_owner_burst),
+    FairSlots(settings.admission_max_concurrent, settings.admission_queue_size, settings.admission_queue_per_owner),
+    settings.admission_queue_timeout_seconds,
+    settings.admission_max_owners,
+)
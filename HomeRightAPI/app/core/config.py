@@ -1,6 +1,30 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class RouteLimit(BaseModel):
+    # Requests per second per owner (0: unlimited) and the bucket size.
+    rate: float
+    burst: float
+    # Heavy routes also need one of the ADMISSION_MAX_CONCURRENT slots.
+    heavy: bool = False
+
+
+DEFAULT_ROUTE_LIMITS = {
+    "GET /tasks": RouteLimit(rate=5, burst=20, heavy=True),
+    "GET /progress": RouteLimit(rate=5, burst=20, heavy=True),
+    "PUT /progress/batch": RouteLimit(rate=2, burst=10, heavy=True),
+    "GET /summary/month/{owner_id}/{year}/{month}": RouteLimit(rate=5, burst=20, heavy=True),
+    "GET /summary/year/{owner_id}/{year}": RouteLimit(rate=2, burst=10, heavy=True),
+    "GET /bootstrap/{owner_id}": RouteLimit(rate=1, burst=5, heavy=True),
+    "GET /sync/{owner_id}": RouteLimit(rate=2, burst=10, heavy=True),
+    "GET /export/{owner_id}": RouteLimit(rate=0.1, burst=2, heavy=True),
+    "GET /analytics/costs/{owner_id}": RouteLimit(rate=1, burst=5, heavy=True),
+}
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -8,5 +32,53 @@ class Settings(BaseSettings):
     mongodb_uri: str = "mongodb://localhost:27017"
     mongodb_db: str = "homeright"
 
+    storage_backend: Literal["mongo", "sqlite"] = "mongo"
+    sqlite_path: str = "homeright.db"
+    sqlite_read_threads: int = 4
+
+    progress_batch_max_items: int = 500
+    catalog_cache_ttl_seconds: float = 300.0
+    export_batch_size: int = 500
+    tombstone_ttl_days: float = 30.0
+    sync_settle_seconds: float = 5.0
+
+    progress_write_behind: bool = False
+    progress_write_behind_window_seconds: float = 0.5
+    progress_write_behind_max_pending: int = 10000
+
+    analytics_cache_max_entries: int = 10000
+
+    ready_cache_seconds: float = 2.0
+    ready_ping_timeout_seconds: float = 1.0
+
+    # Empty token: the X-Profile header is ignored.
+    profile_token: str = ""
+    profile_sample_rate: float = 0.0
+    profile_dump_dir: str = ""
+
+    admission_enabled: bool = False
+    admission_max_concurrent: int = 32
+    admission_queue_size: int = 64
+    admission_queue_per_owner: int = 4
+    admission_queue_timeout_seconds: float = 1.0
+    admission_owner_rate: float = 20.0
+    admission_owner_burst: float = 40.0
+    admission_max_owners: int = 100_000
+    # Keyed "METHOD /route/{template}"; routes not listed get ADMISSION_OWNER_RATE/BURST and are not heavy.
+    admission_route_limits: dict[str, RouteLimit] = Field(default_factory=lambda: dict(DEFAULT_ROUTE_LIMITS))
+
+    owner_cache_enabled: bool = False
+    owner_cache_max_records: int = 200_000
+    owner_cache_ttl_seconds: float = 300.0
+
+    reminder_scheduler_enabled: bool = False
+    reminder_interval_seconds: float = 3600.0
+    reminder_batch_size: int = 500
+    reminder_concurrency: int = 4
+    reminder_hour_utc: int = 9
+    reminder_claim_seconds: float = 300.0
+    reminder_outbox_ttl_days: float = 62.0
+    reminder_sink_path: str = ""
+
 
 settings = Settings()
@@ -0,0 +1,226 @@
+"""
+Prometheus metrics, served at /metrics.
+
+HTTP timings come from `InstrumentedRoute`, the route class of every API router, so the `route`
+label is the path template (`/tasks/{task_id}`), never the raw path. Mongo timings come from
+pymongo event listeners registered in `Mongo.connect`; pymongo calls them synchronously on its
+own threads, so each callback only does a dict operation and a histogram observe.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from fastapi.routing import APIRoute
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import monitoring
+from starlette.datastructures import MutableHeaders
+from starlette.types import Receive, Scope, Send
+
+from app.core.admission import Rejected, admission
+from app.core.profiling import current_profile, profiler, timed_endpoint
+
+
+HTTP_LATENCY = Histogram(
+    "homeright_http_request_duration_seconds",
+    "Request latency by route template, including sending the response body.",
+    ["method", "route"],
+)
+HTTP_REQUESTS = Counter("homeright_http_requests_total", "Requests by route template and status.", ["method", "route", "status"])
+HTTP_IN_FLIGHT = Gauge("homeright_http_requests_in_flight", "Requests currently being handled.", ["method", "route"])
+
+MONGO_COMMAND_LATENCY = Histogram(
+    "homeright_mongo_command_duration_seconds",
+    "Mongo command round-trip time by collection and command.",
+    ["collection", "command", "outcome"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float("inf")),
+)
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    "homeright_mongo_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, float("inf")),
+)
+MONGO_POOL_SIZE = Gauge("homeright_mongo_pool_connections", "Open pooled connections per server.", ["address"])
+MONGO_POOL_CHECKED_OUT = Gauge("homeright_mongo_pool_checked_out", "Pooled connections in use per server.", ["address"])
+MONGO_POOL_CHECKOUT_FAILED = Counter("homeright_mongo_pool_checkout_failed_total", "Failed connection checkouts.", ["reason"])
+
+PROGRESS_BUFFER_PENDING = Gauge("homeright_progress_buffer_pending", "Buffered by-key progress upserts waiting to be written.")
+PROGRESS_BUFFER_COALESCED = Counter("homeright_progress_buffer_coalesced_total", "By-key upserts absorbed by a pending upsert for the same key.")
+PROGRESS_BUFFER_BACKPRESSURE = Counter("homeright_progress_buffer_backpressure_total", "By-key upserts that had to flush a full buffer first.")
+PROGRESS_BUFFER_FLUSH = Histogram("homeright_progress_buffer_flush_seconds", "Time to write one batch of buffered progress upserts.")
+
+OWNER_CACHE_REQUESTS = Counter("homeright_owner_cache_requests_total", "Owner cache lookups by scope and result (hit/miss).", ["scope", "result"])
+OWNER_CACHE_EVICTIONS = Counter(
+    "homeright_owner_cache_evictions_total", "Owner cache entries dropped, by scope and reason (size/stale/invalidated).", ["scope", "reason"]
+)
+REMINDER_OWNERS_SCANNED = Counter("homeright_reminder_owners_scanned_total", "Owners checked for due reminders.")
+REMINDER_JOBS = Counter("homeright_reminder_jobs_total", "Reminder jobs written to the outbox (created) or already there (existing).", ["result"])
+REMINDER_DELIVERED = Counter("homeright_reminder_delivered_total", "Reminder jobs handed to the sink.")
+REMINDER_SCAN_SECONDS = Histogram(
+    "homeright_reminder_scan_seconds", "Duration of a full reminder scan.", buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200)
+)
+
+ADMISSION_REJECTED = Counter(
+    "homeright_admission_rejected_total", "Requests turned away, by route and reason (rate_limited/queue_full/queue_timeout).", ["route", "reason"]
+)
+ADMISSION_WAIT = Histogram(
+    "homeright_admission_wait_seconds",
+    "Time heavy requests waited for a concurrency slot.",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float("inf")),
+)
+ADMISSION_ACTIVE = Gauge("homeright_admission_active", "Heavy requests holding a concurrency slot.")
+ADMISSION_ACTIVE.set_function(lambda: admission.slots.active)
+ADMISSION_QUEUED = Gauge("homeright_admission_queued", "Heavy requests waiting for a concurrency slot.")
+ADMISSION_QUEUED.set_function(lambda: admission.slots.waiting)
+
+PROFILED_REQUESTS = Counter("homeright_profiled_requests_total", "Requests profiled, by reason (header/sample).", ["reason"])
+
+STORAGE_PING = Gauge("homeright_storage_ping_seconds", "Latency of the last readiness ping to the database.")
+STORAGE_PING_FAILURES = Counter("homeright_storage_ping_failures_total", "Readiness pings that failed or timed out.")
+
+ANALYTICS_CACHE_REQUESTS = Counter(
+    "homeright_analytics_cache_requests_total", "Cost analytics cache lookups by result (hit/miss).", ["result"]
+)
+
+SUMMARY_COALESCED = Counter(
+    "homeright_summary_coalesced_total", "Summary requests answered by an identical computation already in flight.", ["summary"]
+)
+
+OWNER_CACHE_RECORDS = Gauge("homeright_owner_cache_records", "Task records held by the owner cache.")
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    APIRoute that records latency, status and in-flight count under its path template, applies
+    app.core.admission and adds a `Server-Timing` header to requests picked by app.core.profiling.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # The request handler looks up dependant.call on every request, so the wrapper takes effect here.
+        if asyncio.iscoroutinefunction(self.dependant.call):
+            self.dependant.call = timed_endpoint(self.dependant.call)
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        method = scope["method"]
+        in_flight = HTTP_IN_FLIGHT.labels(method, self.path)
+        status = 500
+        profile = profiler.begin(scope)
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile is not None:
+                    MutableHeaders(scope=message).append("Server-Timing", profile.server_timing(time.perf_counter() - start))
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        if profile is not None:
+            PROFILED_REQUESTS.labels(profile.reason).inc()
+            token = current_profile.set(profile)
+        try:
+            await self._admit_and_handle(scope, receive, send_with_status)
+        finally:
+            HTTP_LATENCY.labels(method, self.path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, self.path, str(status)).inc()
+            in_flight.dec()
+            if profile is not None:
+                current_profile.reset(token)
+                await profiler.finish(profile, method, self.path)
+
+    async def _admit_and_handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not admission.enabled:
+            await super().handle(scope, receive, send)
+            return
+        start = time.perf_counter()
+        try:
+            holds_slot = await admission.enter(scope["method"], self.path, scope)
+        except Rejected as rejected:
+            ADMISSION_REJECTED.labels(self.path, rejected.reason).inc()
+            await rejected.response()(scope, receive, send)
+            return
+        if holds_slot:
+            ADMISSION_WAIT.observe(time.perf_counter() - start)
+        try:
+            await super().handle(scope, receive, send)
+        finally:
+            if holds_slot:
+                admission.leave()
+
+
+# Commands whose first value is not a collection name.
+_COLLECTION_FIELD = {"getMore": "collection"}
+
+
+class CommandMetrics(monitoring.CommandListener):
+    def __init__(self) -> None:
+        self._pending: dict[tuple, str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        field = _COLLECTION_FIELD.get(event.command_name, event.command_name)
+        collection = event.command.get(field)
+        self._pending[(event.connection_id, event.request_id)] = collection if isinstance(collection, str) else ""
+
+    def _finish(self, event, outcome: str) -> None:
+        collection = self._pending.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_LATENCY.labels(collection, event.command_name, outcome).observe(event.duration_micros / 1e6)
+        # Motor runs commands in the issuing request's context, so this finds that request's profile.
+        profile = current_profile.get()
+        if profile is not None:
+            profile.add_command(event.command_name, collection, event.duration_micros / 1e6)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, "ok")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, "error")
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    @staticmethod
+    def _address(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def connection_created(self, event) -> None:
+        MONGO_POOL_SIZE.labels(self._address(event)).inc()
+
+    def connection_closed(self, event) -> None:
+        MONGO_POOL_SIZE.labels(self._address(event)).dec()
+
+    def connection_checked_out(self, event) -> None:
+        MONGO_POOL_CHECKOUT_WAIT.observe(event.duration)
+        MONGO_POOL_CHECKED_OUT.labels(self._address(event)).inc()
+
+    def connection_checked_in(self, event) -> None:
+        MONGO_POOL_CHECKED_OUT.labels(self._address(event)).dec()
+
+    def connection_check_out_failed(self, event) -> None:
+        MONGO_POOL_CHECKOUT_WAIT.observe(event.duration)
+        MONGO_POOL_CHECKOUT_FAILED.labels(event.reason).inc()
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        MONGO_POOL_SIZE.labels(self._address(event)).set(0)
+        MONGO_POOL_CHECKED_OUT.labels(self._address(event)).set(0)
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+
+def mongo_listeners() -> list:
+    return [CommandMetrics(), PoolMetrics()]
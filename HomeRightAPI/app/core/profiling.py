@@ -0,0 +1,148 @@
+"""
+Opt-in per-request profiling.
+
+A request is profiled when it sends `X-Profile: <PROFILE_TOKEN>`, or when it is sampled at random at
+PROFILE_SAMPLE_RATE. A profiled request gets a `Server-Timing` header with these entries, all in
+milliseconds:
+
+- `total`: from routing until the response starts;
+- `handler`: the route function, including the database waits it awaits;
+- `render`: encoding the response body, for routes that return FastJSONResponse;
+- `db`: summed round-trip time of every Mongo command the request issued through `mongo.db`, with the
+  command count in `desc`;
+- one `db-{command}-{collection}` entry per command type, such as `db-find-progress`.
+
+The time in `total` that is not in `handler` or `render` went to request validation, dependencies and
+response_model serialization. Commands issued concurrently overlap, so `db` can exceed `handler`.
+
+With PROFILE_DUMP_DIR set, a profiled request also runs under cProfile. The stats go to
+`{dir}/{ms}-{method}-{route}.prof`, which `snakeviz` or `flameprof` can render. cProfile sees the
+whole event loop, so the file also holds whatever other requests ran meanwhile. Only one request is
+dumped at a time; the others still get their headers.
+
+A request that is not profiled costs a header scan (only while PROFILE_TOKEN is set), a random draw
+(only while the rate is above 0) and a context variable lookup per Mongo command.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import hmac
+import os
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from starlette.types import Scope
+
+from app.core.config import settings
+
+
+PROFILE_HEADER = b"x-profile"
+
+_NON_TOKEN = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class RequestProfile:
+    __slots__ = ("reason", "spans", "commands", "cprofile")
+
+    def __init__(self, reason: str) -> None:
+        self.reason = reason
+        self.spans: dict[str, float] = {}
+        # Appended from pymongo's threads; list.append is atomic.
+        self.commands: list[tuple[str, str, float]] = []
+        self.cprofile: cProfile.Profile | None = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def add_command(self, command: str, collection: str, seconds: float) -> None:
+        self.commands.append((command, collection, seconds))
+
+    def server_timing(self, total: float) -> str:
+        entries = [_timing("total", total)] + [_timing(name, seconds) for name, seconds in self.spans.items()]
+        commands = list(self.commands)
+        if commands:
+            by_name: dict[str, list] = {}
+            for command, collection, seconds in commands:
+                name = f"db-{command}-{collection}" if collection else f"db-{command}"
+                totals = by_name.setdefault(_NON_TOKEN.sub("_", name), [0.0, 0])
+                totals[0] += seconds
+                totals[1] += 1
+            entries.append(_timing("db", sum(c[2] for c in commands), len(commands)))
+            entries += [_timing(name, seconds, count) for name, (seconds, count) in by_name.items()]
+        return ", ".join(entries)
+
+
+def _timing(name: str, seconds: float, commands: int | None = None) -> str:
+    entry = f"{name};dur={seconds * 1000:.2f}"
+    return entry if commands is None else f'{entry};desc="{commands} commands"'
+
+
+# The profile of the request being handled, or None; set by InstrumentedRoute.
+current_profile: ContextVar[RequestProfile | None] = ContextVar("current_profile", default=None)
+
+
+class Profiler:
+    def __init__(self, token: str, sample_rate: float, dump_dir: str) -> None:
+        self.token = token.encode()
+        self.sample_rate = sample_rate
+        self.dump_dir = dump_dir
+        self._dumping = False
+
+    def begin(self, scope: Scope) -> RequestProfile | None:
+        """A profile for the request if it asked for one or was sampled, else None."""
+        reason = None
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    if hmac.compare_digest(value, self.token):
+                        reason = "header"
+                    break
+        if reason is None and self.sample_rate and random.random() < self.sample_rate:
+            reason = "sample"
+        if reason is None:
+            return None
+
+        profile = RequestProfile(reason)
+        if self.dump_dir and not self._dumping:
+            self._dumping = True
+            profile.cprofile = cProfile.Profile()
+            profile.cprofile.enable()
+        return profile
+
+    async def finish(self, profile: RequestProfile, method: str, route: str) -> None:
+        if profile.cprofile is None:
+            return
+        profile.cprofile.disable()
+        self._dumping = False
+        slug = _NON_TOKEN.sub("_", route).strip("_") or "root"
+        path = os.path.join(self.dump_dir, f"{int(time.time() * 1000)}-{method}-{slug}.prof")
+        await asyncio.to_thread(_dump, profile.cprofile, path)
+
+
+def _dump(cprofile: cProfile.Profile, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cprofile.dump_stats(path)
+
+
+def timed_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an async route function so profiled requests record its time as `handler`."""
+
+    async def endpoint(**values: Any) -> Any:
+        profile = current_profile.get()
+        if profile is None:
+            return await call(**values)
+        start = time.perf_counter()
+        try:
+            return await call(**values)
+        finally:
+            profile.add("handler", time.perf_counter() - start)
+
+    return endpoint
+
+
+profiler = Profiler(settings.profile_token, settings.profile_sample_rate, settings.profile_dump_dir)
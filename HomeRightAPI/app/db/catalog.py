@@ -0,0 +1,206 @@
+"""
+Shared built-in task catalog.
+
+Built-in tasks are stored once in `catalog` (no owner_id). Per-owner changes live in
+`task_overlays`: `{owner_id, task_id, hidden, overrides: {title, detail, schedule, month}}`.
+Reads merge the cached catalog with the owner's overlays and own `tasks` documents; an owner
+document with the same task_id as a catalog entry (pre-catalog copies) takes precedence.
+
+Owners only see the catalog once they have seeded built-ins (`POST /tasks/seed/{owner_id}`), which
+records them in `catalog_owners` as `{_id: owner_id, seq, created_at}`. Until then they have no
+built-in tasks, as on the SQLite backend where seeding copies the checklist.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.db.checklist import CHECKLIST, checklist_doc
+from app.utils.bson import utcnow
+from app.utils.schedule import due_mask, months_from_mask
+
+
+OVERRIDE_FIELDS = ("title", "detail", "schedule", "month")
+
+
+class Catalog:
+    """In-process copy of the `catalog` collection, refreshed after `ttl_seconds`."""
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._tasks: dict[str, dict[str, Any]] | None = None
+        self._due_counts: dict[int, int] = {}
+        self._version = ""
+        self._loaded_at = 0.0
+
+    async def tasks(self, db: AsyncIOMotorDatabase) -> dict[str, dict[str, Any]]:
+        if self._tasks is None or time.monotonic() - self._loaded_at > self.ttl_seconds:
+            docs = await db["catalog"].find({}, {"_id": 0}).to_list(length=None)
+            tasks = {d["task_id"]: d for d in docs}
+            due_counts: dict[int, int] = {}
+            for d in docs:
+                for m in months_from_mask(d["due_mask"]):
+                    due_counts[m] = due_counts.get(m, 0) + 1
+            latest = max((d["updated_at"].replace(tzinfo=None) for d in docs), default=None)
+            self._version = f"{len(docs)}.{int(latest.timestamp() * 1000) if latest else 0}"
+            self._tasks, self._due_counts, self._loaded_at = tasks, due_counts, time.monotonic()
+        return self._tasks
+
+    async def due_counts(self, db: AsyncIOMotorDatabase) -> dict[int, int]:
+        """Number of catalog tasks due in each month, before any owner overlays."""
+        await self.tasks(db)
+        return self._due_counts
+
+    async def version(self, db: AsyncIOMotorDatabase) -> str:
+        """Changes whenever catalog entries are added or updated."""
+        await self.tasks(db)
+        return self._version
+
+    def invalidate(self) -> None:
+        self._tasks = None
+
+
+catalog = Catalog(ttl_seconds=settings.catalog_cache_ttl_seconds)
+
+
+def effective_task(entry: dict[str, Any], overlay: dict[str, Any] | None, owner_id: str) -> dict[str, Any] | None:
+    """The owner's view of a catalog entry, or None if the owner has hidden it."""
+    if overlay and overlay.get("hidden"):
+        return None
+    doc = {**entry, "owner_id": owner_id, "is_builtin": True, "version": overlay.get("version", 0) if overlay else 0}
+    if overlay:
+        overrides = overlay.get("overrides") or {}
+        doc.update(overrides)
+        if "schedule" in overrides or "month" in overrides:
+            doc["due_mask"] = due_mask(doc["schedule"], doc.get("month"))
+        # Stored datetimes come back naive (UTC); freshly written ones are aware.
+        doc["updated_at"] = max(entry["updated_at"], overlay["updated_at"], key=lambda dt: dt.replace(tzinfo=None))
+    return doc
+
+
+def effective_mask(entry: dict[str, Any] | None, overlay: dict[str, Any] | None) -> int:
+    if entry is None:
+        return 0
+    doc = effective_task(entry, overlay, "")
+    return doc["due_mask"] if doc else 0
+
+
+async def load_overlays(db: AsyncIOMotorDatabase, owner_id: str) -> dict[str, dict[str, Any]]:
+    return {o["task_id"]: o async for o in db["task_overlays"].find({"owner_id": owner_id})}
+
+
+async def catalog_owner(db: AsyncIOMotorDatabase, owner_id: str) -> dict[str, Any] | None:
+    """The owner's `catalog_owners` record, or None if it has not seeded built-ins."""
+    return await db["catalog_owners"].find_one({"_id": owner_id})
+
+
+async def catalog_owner_ids(db: AsyncIOMotorDatabase, owner_ids: list[str]) -> set[str]:
+    """Which of `owner_ids` see the catalog."""
+    return {d["_id"] async for d in db["catalog_owners"].find({"_id": {"$in": owner_ids}}, {"_id": 1})}
+
+
+async def visible_entries(db: AsyncIOMotorDatabase, owner_id: str) -> dict[str, dict[str, Any]]:
+    """The catalog entries `owner_id` sees: all of them once it has seeded built-ins, else none."""
+    return await catalog.tasks(db) if await catalog_owner(db, owner_id) else {}
+
+
+async def enable_catalog(db: AsyncIOMotorDatabase, owner_id: str, seq: int, now: datetime) -> bool:
+    """Show the catalog to `owner_id` from change `seq` on; False if it already saw it."""
+    result = await db["catalog_owners"].update_one({"_id": owner_id}, {"$setOnInsert": {"seq": seq, "created_at": now}}, upsert=True)
+    return result.upserted_id is not None
+
+
+async def merged_tasks(db: AsyncIOMotorDatabase, owner_id: str, owner_docs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Owner documents plus the owner's effective catalog tasks (unsorted, unfiltered)."""
+    entries, overlays = await asyncio.gather(visible_entries(db, owner_id), load_overlays(db, owner_id))
+    return merge_catalog(entries, overlays, owner_id, owner_docs)
+
+
+def merge_catalog(
+    entries: dict[str, dict[str, Any]], overlays: dict[str, dict[str, Any]], owner_id: str, owner_docs: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """`merged_tasks` from already loaded catalog entries and overlays."""
+    own_ids = {d["task_id"] for d in owner_docs}
+    out = list(owner_docs)
+    for task_id, entry in entries.items():
+        if task_id in own_ids:
+            continue
+        doc = effective_task(entry, overlays.get(task_id), owner_id)
+        if doc is not None:
+            out.append(doc)
+    return out
+
+
+async def apply_checklist(db: AsyncIOMotorDatabase) -> dict[str, int]:
+    """
+    Bring the catalog up to the shipped checklist: insert missing entries with one unordered insert_many
+    (duplicate keys from a concurrent run count as done) and update entries stored at an older revision.
+    Catalog entries that are not in the checklist are left alone. Without changes this is a cached read.
+    """
+    entries = await catalog.tasks(db)
+    now = utcnow()
+    missing = [checklist_doc(e, now) for e in CHECKLIST if e["task_id"] not in entries]
+    revised = [e for e in CHECKLIST if e["task_id"] in entries and entries[e["task_id"]].get("checklist_revision", 0) < e["revision"]]
+    counts = {"inserted": 0, "updated": 0}
+    if missing:
+        try:
+            counts["inserted"] = len((await db["catalog"].insert_many(missing, ordered=False)).inserted_ids)
+        except BulkWriteError as e:
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+            counts["inserted"] = e.details.get("nInserted", 0)
+    if revised:
+        ops = []
+        for e in revised:
+            fields = {k: v for k, v in checklist_doc(e, now).items() if k != "created_at"}
+            ops.append(UpdateOne({"task_id": e["task_id"], "checklist_revision": {"$not": {"$gte": e["revision"]}}}, {"$set": fields}))
+        counts["updated"] = (await db["catalog"].bulk_write(ops, ordered=False)).modified_count
+    if missing or revised:
+        catalog.invalidate()
+    return counts
+
+
+async def update_overlay(
+    db: AsyncIOMotorDatabase,
+    owner_id: str,
+    task_id: str,
+    set_fields: dict[str, Any],
+    now: datetime,
+    expected_version: int | None = None,
+) -> tuple[dict[str, Any] | None, dict[str, Any]] | None:
+    """
+    Upsert an owner's overlay for a catalog task; returns the overlay before and after, or None if
+    `expected_version` does not match. A task without an overlay is at version 0, so only
+    `expected_version` None or 0 may create one. With 0, an existing overlay makes the upsert
+    collide on the unique index and raise DuplicateKeyError instead.
+    """
+    query: dict[str, Any] = {"owner_id": owner_id, "task_id": task_id}
+    if expected_version is not None:
+        query["version"] = expected_version or {"$in": [0, None]}
+    before = await db["task_overlays"].find_one_and_update(
+        query,
+        {"$set": {**set_fields, "updated_at": now}, "$inc": {"version": 1}, "$setOnInsert": {"created_at": now}},
+        upsert=not expected_version,
+    )
+    if before is None and expected_version:
+        return None
+    after: dict[str, Any] = {"owner_id": owner_id, "task_id": task_id, "hidden": False, "overrides": {}, "created_at": now}
+    if before:
+        after.update(before)
+        after["overrides"] = dict(before.get("overrides") or {})
+    after["version"] = (before or {}).get("version", 0) + 1
+    for field, value in set_fields.items():
+        if field.startswith("overrides."):
+            after["overrides"][field.split(".", 1)[1]] = value
+        else:
+            after[field] = value
+    after["updated_at"] = now
+    return before, after
@@ -0,0 +1,190 @@
+"""
+The built-in checklist shipped with the API, mirroring `HomeRight/Data/ChecklistData.swift` (same task ids).
+
+Each entry records the `revision` of the checklist it last changed in. To revise the checklist, edit or add
+entries, set their `revision` to the next CHECKLIST_VERSION and bump CHECKLIST_VERSION. Seeding then writes
+only the entries stored at an older revision (see `app.db.catalog.apply_checklist`).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from app.utils.schedule import due_mask
+
+
+CHECKLIST_VERSION = 1
+
+CHECKLIST: tuple[dict[str, Any], ...] = (
+    {
+        "task_id": "11111111-1111-1111-1111-000000000001",
+        "title": "Inspect and clean range hood filter",
+        "detail": "Wash or replace kitchen vent hood filter; wipe hood interior to keep airflow clear.",
+        "schedule": "monthly",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000002",
+        "title": "Test smoke and carbon monoxide alarms",
+        "detail": "Use the test button; replace batteries if alerts are weak or absent.",
+        "schedule": "monthly",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000003",
+        "title": "Inspect fire extinguisher",
+        "detail": "Ensure gauge reads charged, nozzle is clear, and extinguisher is accessible.",
+        "schedule": "monthly",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000004",
+        "title": "Check water softener",
+        "detail": "Refill salt pellets to the line for proper conditioning.",
+        "schedule": "monthly",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000005",
+        "title": "Quarterly HVAC filter",
+        "detail": "Replace disposable HVAC filters or clean reusable ones to maintain air quality.",
+        "schedule": "quarterly",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000006",
+        "title": "Descale faucet aerators and shower heads",
+        "detail": "Remove mineral buildup for consistent pressure and cleanliness.",
+        "schedule": "quarterly",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000007",
+        "title": "Inspect sink and toilet supply lines",
+        "detail": "Look for bulges, drips, or corrosion; replace if damaged.",
+        "schedule": "quarterly",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000008",
+        "title": "Spring HVAC prep",
+        "detail": "Schedule HVAC inspection before heavy use; clear debris from outdoor units.",
+        "schedule": "spring",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000009",
+        "title": "Clean interior exhaust fans",
+        "detail": "Vacuum and wipe bath and kitchen fans so they vent moisture effectively.",
+        "schedule": "spring",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000010",
+        "title": "Test GFCI outlets",
+        "detail": "Use built-in test/reset buttons to confirm safety circuits function.",
+        "schedule": "spring",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000011",
+        "title": "Summer irrigation tune-up",
+        "detail": "Inspect sprinkler coverage, clean heads, and adjust zones per restrictions.",
+        "schedule": "summer",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000012",
+        "title": "Inspect exterior caulking",
+        "detail": "Check window/door caulk for cracks and reseal to prevent moisture entry.",
+        "schedule": "summer",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000013",
+        "title": "Clean grill and outdoor surfaces",
+        "detail": "Remove grease, check gas connections, and sweep patios or decks.",
+        "schedule": "summer",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000014",
+        "title": "Fall HVAC tune-up",
+        "detail": "Schedule professional service; replace filters and test heating before cold arrives.",
+        "schedule": "fall",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000015",
+        "title": "Clean gutters and downspouts",
+        "detail": "Remove leaves, flush with water, and confirm downspouts drain away from foundation.",
+        "schedule": "fall",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000016",
+        "title": "Inspect roof and flashings",
+        "detail": "Look for missing shingles, cracked sealant, or loose flashing; repair early.",
+        "schedule": "fall",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000017",
+        "title": "Winter weather check",
+        "detail": "Inspect for drafts, seal gaps, and verify insulation in attics or crawl spaces.",
+        "schedule": "winter",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000018",
+        "title": "Reverse ceiling fans",
+        "detail": "Switch to clockwise rotation to gently push warm air down.",
+        "schedule": "winter",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000019",
+        "title": "Protect pipes",
+        "detail": "Insulate exposed pipes and check for slow drips to prevent freezing.",
+        "schedule": "winter",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000020",
+        "title": "Annual plumbing review",
+        "detail": "Check for leaks under sinks, around toilets, and at fixtures; tighten as needed.",
+        "schedule": "annual",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000021",
+        "title": "Deep clean appliances",
+        "detail": "Move major appliances to clean coils and floors; inspect hoses for wear.",
+        "schedule": "annual",
+        "revision": 1,
+    },
+    {
+        "task_id": "11111111-1111-1111-1111-000000000022",
+        "title": "Test and flush water heater",
+        "detail": "Check temperature/pressure relief valve and drain sediment to extend life.",
+        "schedule": "annual",
+        "revision": 1,
+    },
+)
+
+
+def checklist_doc(entry: dict[str, Any], now: datetime) -> dict[str, Any]:
+    """A built-in task document (catalog entry or owner row, less owner_id) for a checklist entry."""
+    return {
+        "task_id": entry["task_id"],
+        "title": entry["title"],
+        "detail": entry["detail"],
+        "schedule": entry["schedule"],
+        "month": None,
+        "due_mask": due_mask(entry["schedule"]),
+        "is_builtin": True,
+        "checklist_revision": entry["revision"],
+        "created_at": now,
+        "updated_at": now,
+    }
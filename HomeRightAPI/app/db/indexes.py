@@ -1,16 +1,89 @@
+"""
+Index definitions and reconciliation.
+
+`INDEXES` declares every index per collection. `ensure_indexes` hashes it and compares the result with the
+fingerprint stored in `schema_meta`; when they match (every start after the first) it costs one point
+read. Otherwise it sends one `create_indexes` per collection, all collections concurrently, and stores
+the new fingerprint. To reconcile regardless of the fingerprint, run from the HomeRightAPI directory:
+
+    python -m app.db.indexes
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
+
+from app.core.config import settings
+from app.db.mongo import mongo
+from app.utils.bson import utcnow
+
+
+INDEXES: dict[str, list[IndexModel]] = {
+    "tasks": [
+        IndexModel([("owner_id", 1), ("task_id", 1)], unique=True),
+        IndexModel([("owner_id", 1), ("schedule", 1), ("month", 1)]),
+        IndexModel([("owner_id", 1), ("is_builtin", -1), ("title", 1), ("task_id", 1)]),
+        IndexModel([("owner_id", 1), ("due_mask", 1)]),
+        IndexModel([("owner_id", 1), ("seq", 1)]),
+    ],
+    "progress": [
+        IndexModel([("owner_id", 1), ("task_id", 1), ("year", 1), ("month", 1)], unique=True),
+        IndexModel([("owner_id", 1), ("year", 1), ("month", 1), ("status", 1)]),
+        IndexModel([("owner_id", 1), ("status", 1), ("year", 1), ("month", 1), ("task_id", 1), ("cost", 1)]),
+        IndexModel([("owner_id", 1), ("updated_at", -1), ("_id", -1)]),
+        IndexModel([("owner_id", 1), ("year", 1), ("updated_at", -1), ("_id", -1)]),
+        IndexModel([("owner_id", 1), ("seq", 1)]),
+    ],
+    "settings": [
+        IndexModel([("owner_id", 1)], unique=True),
+        IndexModel([("owner_id", 1), ("seq", 1)]),
+    ],
+    "catalog": [IndexModel([("task_id", 1)], unique=True)],
+    "task_overlays": [
+        IndexModel([("owner_id", 1), ("task_id", 1)], unique=True),
+        IndexModel([("owner_id", 1), ("seq", 1)]),
+    ],
+    "rollups": [IndexModel([("owner_id", 1), ("year", 1), ("month", 1)], unique=True)],
+    "outbox": [
+        IndexModel([("status", 1), ("due_at", 1)]),
+        IndexModel([("claim", 1)], sparse=True),
+        IndexModel([("sent_at", 1)], expireAfterSeconds=int(settings.reminder_outbox_ttl_days * 86400)),
+    ],
+    "tombstones": [
+        IndexModel([("owner_id", 1), ("seq", 1)]),
+        IndexModel([("deleted_at", 1)], expireAfterSeconds=int(settings.tombstone_ttl_days * 86400)),
+    ],
+}
+
+
+def index_fingerprint() -> str:
+    spec = {name: [model.document for model in models] for name, models in INDEXES.items()}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
+
 
+async def ensure_indexes(db: AsyncIOMotorDatabase, *, force: bool = False) -> bool:
+    """Create missing indexes unless the stored fingerprint shows they exist; returns whether it created any."""
+    fingerprint = index_fingerprint()
+    if not force and await db["schema_meta"].find_one({"_id": "indexes", "fingerprint": fingerprint}, {"_id": 1}):
+        return False
+    await asyncio.gather(*(db[name].create_indexes(models) for name, models in INDEXES.items()))
+    await db["schema_meta"].replace_one({"_id": "indexes"}, {"fingerprint": fingerprint, "updated_at": utcnow()}, upsert=True)
+    return True
 
-async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
-    await db["tasks"].create_index([("owner_id", 1), ("task_id", 1)], unique=True)
-    await db["tasks"].create_index([("owner_id", 1), ("schedule", 1), ("month", 1)])
-    await db["tasks"].create_index([("owner_id", 1), ("is_builtin", 1)])
 
-    await db["progress"].create_index(
-        [("owner_id", 1), ("task_id", 1), ("year", 1), ("month", 1)],
-        unique=True,
-    )
-    await db["progress"].create_index([("owner_id", 1), ("year", 1), ("month", 1), ("status", 1)])
+async def _main() -> None:
+    mongo.connect()
+    try:
+        await ensure_indexes(mongo.db, force=True)
+    finally:
+        mongo.close()
+    print(f"indexes reconciled ({index_fingerprint()[:12]})")
 
-    await db["settings"].create_index([("owner_id", 1)], unique=True)
 
+if __name__ == "__main__":
+    asyncio.run(_main())
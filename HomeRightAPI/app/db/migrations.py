@@ -0,0 +1,192 @@
+"""
+One-shot data migrations.
+
+Run from the HomeRightAPI directory:
+
+    python -m app.db.migrations
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteMany, UpdateOne
+
+from app.db.catalog import OVERRIDE_FIELDS, apply_checklist, catalog
+from app.db.mongo import mongo
+from app.db.rollups import rebuild_rollups
+from app.utils.bson import utcnow
+from app.utils.schedule import due_mask
+
+
+BATCH_SIZE = 1000
+
+
+async def backfill_due_masks(db: AsyncIOMotorDatabase) -> int:
+    """Set `due_mask` on tasks written before it existed. Safe to re-run."""
+    updated = 0
+    ops: list[UpdateOne] = []
+    cursor = db["tasks"].find({"due_mask": {"$exists": False}}, {"schedule": 1, "month": 1}, batch_size=BATCH_SIZE)
+    async for doc in cursor:
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"due_mask": due_mask(doc["schedule"], doc.get("month"))}}))
+        if len(ops) >= BATCH_SIZE:
+            result = await db["tasks"].bulk_write(ops, ordered=False)
+            updated += result.modified_count
+            ops = []
+    if ops:
+        result = await db["tasks"].bulk_write(ops, ordered=False)
+        updated += result.modified_count
+    return updated
+
+
+async def promote_builtin_catalog(db: AsyncIOMotorDatabase) -> dict[str, int]:
+    """
+    Move per-owner built-in task copies into the shared catalog. Safe to re-run.
+
+    The oldest copy of each task_id becomes the catalog entry. Copies that differ from it become
+    overlay overrides, and catalog tasks an owner had deleted become hidden overlays for that owner.
+    Owners who had copies are recorded in `catalog_owners`; owners who had none keep seeing no built-ins.
+    """
+    now = utcnow()
+    pipeline = [
+        {"$match": {"is_builtin": True}},
+        {"$sort": {"created_at": 1}},
+        {
+            "$group": {
+                "_id": "$task_id",
+                "title": {"$first": "$title"},
+                "detail": {"$first": "$detail"},
+                "schedule": {"$first": "$schedule"},
+                "month": {"$first": "$month"},
+            }
+        },
+    ]
+    ops = []
+    async for row in db["tasks"].aggregate(pipeline, allowDiskUse=True):
+        entry = {field: row.get(field) for field in OVERRIDE_FIELDS}
+        entry["due_mask"] = due_mask(entry["schedule"], entry["month"])
+        ops.append(UpdateOne({"task_id": row["_id"]}, {"$setOnInsert": {**entry, "created_at": now, "updated_at": now}}, upsert=True))
+    if ops:
+        await db["catalog"].bulk_write(ops, ordered=False)
+    catalog.invalidate()
+    entries = await catalog.tasks(db)
+
+    counts = {"catalog": len(entries), "owners": 0, "overlays": 0, "removed": 0}
+    owner_ops: list[UpdateOne] = []
+    overlay_ops: list[UpdateOne] = []
+    task_ops: list[DeleteMany] = []
+
+    async def flush() -> None:
+        nonlocal owner_ops, overlay_ops, task_ops
+        if owner_ops:
+            await db["catalog_owners"].bulk_write(owner_ops, ordered=False)
+        if overlay_ops:
+            await db["task_overlays"].bulk_write(overlay_ops, ordered=False)
+        if task_ops:
+            await db["tasks"].bulk_write(task_ops, ordered=False)
+        owner_ops, overlay_ops, task_ops = [], [], []
+
+    def finish_owner(owner_id: str, copies: list[dict]) -> None:
+        owner_ops.append(UpdateOne({"_id": owner_id}, {"$setOnInsert": {"seq": 0, "created_at": now}}, upsert=True))
+        counts["owners"] += 1
+        pending = len(overlay_ops)
+        for copy in copies:
+            entry = entries[copy["task_id"]]
+            overrides = {f"overrides.{f}": copy.get(f) for f in OVERRIDE_FIELDS if copy.get(f) != entry.get(f)}
+            if overrides:
+                overlay_ops.append(
+                    UpdateOne(
+                        {"owner_id": owner_id, "task_id": copy["task_id"]},
+                        {"$set": {**overrides, "hidden": False, "updated_at": now}, "$setOnInsert": {"created_at": now}},
+                        upsert=True,
+                    )
+                )
+        for task_id in entries.keys() - {c["task_id"] for c in copies}:
+            overlay_ops.append(
+                UpdateOne(
+                    {"owner_id": owner_id, "task_id": task_id},
+                    {"$setOnInsert": {"hidden": True, "created_at": now, "updated_at": now}},
+                    upsert=True,
+                )
+            )
+        counts["overlays"] += len(overlay_ops) - pending
+        counts["removed"] += len(copies)
+        task_ops.append(DeleteMany({"_id": {"$in": [c["_id"] for c in copies]}}))
+
+    owner_id, copies = None, []
+    cursor = db["tasks"].find({"is_builtin": True, "task_id": {"$in": list(entries)}}, batch_size=BATCH_SIZE).sort("owner_id", 1)
+    async for doc in cursor:
+        if doc["owner_id"] != owner_id and copies:
+            finish_owner(owner_id, copies)
+            copies = []
+            if len(overlay_ops) >= BATCH_SIZE:
+                await flush()
+        owner_id = doc["owner_id"]
+        copies.append(doc)
+    if copies:
+        finish_owner(owner_id, copies)
+    await flush()
+    return counts
+
+
+async def backfill_catalog_owners(db: AsyncIOMotorDatabase) -> int:
+    """
+    Record in `catalog_owners` the owners of catalogs promoted before it existed: those with overlays
+    or with progress on a catalog task. Safe to re-run.
+    """
+    task_ids = list(await catalog.tasks(db))
+    if not task_ids:
+        return 0
+    added = 0
+    now = utcnow()
+    for name in ("task_overlays", "progress"):
+        ops: list[UpdateOne] = []
+        pipeline = [{"$match": {"task_id": {"$in": task_ids}}}, {"$group": {"_id": "$owner_id"}}]
+        async for row in db[name].aggregate(pipeline, allowDiskUse=True, batchSize=BATCH_SIZE):
+            ops.append(UpdateOne({"_id": row["_id"]}, {"$setOnInsert": {"seq": 0, "created_at": now}}, upsert=True))
+            if len(ops) >= BATCH_SIZE:
+                added += (await db["catalog_owners"].bulk_write(ops, ordered=False)).upserted_count
+                ops = []
+        if ops:
+            added += (await db["catalog_owners"].bulk_write(ops, ordered=False)).upserted_count
+    return added
+
+
+async def backfill_owner_versions(db: AsyncIOMotorDatabase) -> int:
+    """
+    Give every owner with tasks, overlays, progress or settings an `owner_versions` row (version 0),
+    so that scans over `owner_versions` also see owners who have not written since it was added. Safe to re-run.
+    """
+    added = 0
+    for name in ("settings", "tasks", "task_overlays", "progress"):
+        ops: list[UpdateOne] = []
+        async for row in db[name].aggregate([{"$group": {"_id": "$owner_id"}}], allowDiskUse=True, batchSize=BATCH_SIZE):
+            ops.append(UpdateOne({"_id": row["_id"]}, {"$setOnInsert": {"version": 0}}, upsert=True))
+            if len(ops) >= BATCH_SIZE:
+                added += (await db["owner_versions"].bulk_write(ops, ordered=False)).upserted_count
+                ops = []
+        if ops:
+            added += (await db["owner_versions"].bulk_write(ops, ordered=False)).upserted_count
+    return added
+
+
+async def run_all(db: AsyncIOMotorDatabase) -> None:
+    print(f"backfill_due_masks: updated {await backfill_due_masks(db)} tasks")
+    print(f"backfill_owner_versions: added {await backfill_owner_versions(db)} owners")
+    print(f"promote_builtin_catalog: {await promote_builtin_catalog(db)}")
+    print(f"backfill_catalog_owners: added {await backfill_catalog_owners(db)} owners")
+    print(f"apply_checklist: {await apply_checklist(db)}")
+    print(f"rebuild_rollups: fixed {len(await rebuild_rollups(db, fix=True))} rollups")
+
+
+async def _main() -> None:
+    mongo.connect()
+    try:
+        await run_all(mongo.db)
+    finally:
+        mongo.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -3,6 +3,7 @@ from __future__ import annotations
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
 from app.core.config import settings
+from app.core.metrics import mongo_listeners
 
 
 class Mongo:
@@ -13,7 +14,7 @@ class Mongo:
     def connect(self) -> None:
         if self._client is not None:
             return
-        self._client = AsyncIOMotorClient(settings.mongodb_uri)
+        self._client = AsyncIOMotorClient(settings.mongodb_uri, event_listeners=mongo_listeners())
         self._db = self._client[settings.mongodb_db]
 
     def close(self) -> None:
@@ -0,0 +1,290 @@
+"""
+Server-side due reminders (mongo backend only).
+
+A scan streams every owner in `owner_versions` through a bounded pipeline: one producer reads owner
+ids in batches of `REMINDER_BATCH_SIZE` and `REMINDER_CONCURRENCY` workers each load a batch's
+tasks, overlays and completed progress with three `$in` queries. They then apply the /summary/month
+rules: a task is due when its due mask has the month's bit, and done when the month's progress is
+`complete`. Each owner with something left to do gets one `outbox` job per month, `_id`
+`reminder:{owner_id}:{YYYY-MM}`, written with `$setOnInsert` upserts in unordered bulk writes.
+Re-running a scan, or running it on several replicas at once, never creates a second job.
+
+Owners enter `owner_versions` with their first write. Run `python -m app.db.migrations` once after deploying,
+so that `backfill_owner_versions` adds owners whose data predates the collection; otherwise they are never scanned.
+
+Delivery claims due jobs in batches, hands them to a sink and marks them sent. The only sink
+is `LocalSink`, which writes JSON lines to REMINDER_SINK_PATH (or the log), standing in for APNs.
+Claims expire after REMINDER_CLAIM_SECONDS, so jobs held by a crashed worker are retried.
+
+Run from the HomeRightAPI directory:
+
+    python -m app.db.reminders scan [--year YYYY --month M]
+    python -m app.db.reminders deliver
+
+or set REMINDER_SCHEDULER_ENABLED=true to scan and deliver every REMINDER_INTERVAL_SECONDS
+inside the API process.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Protocol
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.core.metrics import REMINDER_DELIVERED, REMINDER_JOBS, REMINDER_OWNERS_SCANNED, REMINDER_SCAN_SECONDS
+from app.db.catalog import catalog, catalog_owner_ids, merge_catalog
+from app.db.mongo import mongo
+from app.db.rollups import task_due_mask
+from app.models.enums import TaskStatus
+from app.utils.bson import utcnow
+from app.utils.schedule import month_bit
+
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+
+def job_id(owner_id: str, year: int, month: int) -> str:
+    return f"reminder:{owner_id}:{year}-{month:02d}"
+
+
+async def _owner_batches(db: AsyncIOMotorDatabase, queue: asyncio.Queue, batch_size: int, workers: int) -> None:
+    batch: list[str] = []
+    async for doc in db["owner_versions"].find({}, {"_id": 1}, batch_size=batch_size):
+        batch.append(doc["_id"])
+        if len(batch) >= batch_size:
+            await queue.put(batch)
+            batch = []
+    if batch:
+        await queue.put(batch)
+    for _ in range(workers):
+        await queue.put(None)
+
+
+async def _due_jobs(db: AsyncIOMotorDatabase, owners: list[str], year: int, month: int, due_at: datetime) -> list[dict[str, Any]]:
+    """One job per owner in `owners` with tasks due and not complete in the month."""
+    bit = month_bit(month)
+    entries = await catalog.tasks(db)
+    projection = {"_id": 0, "owner_id": 1, "task_id": 1, "title": 1, "schedule": 1, "month": 1, "due_mask": 1}
+    own_docs, overlay_docs, done_docs, enabled = await asyncio.gather(
+        db["tasks"].find({"owner_id": {"$in": owners}}, projection).to_list(length=None),
+        db["task_overlays"].find({"owner_id": {"$in": owners}}).to_list(length=None),
+        db["progress"]
+        .find(
+            {"owner_id": {"$in": owners}, "year": year, "month": month, "status": TaskStatus.complete.value},
+            {"_id": 0, "owner_id": 1, "task_id": 1},
+        )
+        .to_list(length=None),
+        catalog_owner_ids(db, owners),
+    )
+    own: dict[str, list[dict]] = {}
+    for d in own_docs:
+        own.setdefault(d["owner_id"], []).append(d)
+    overlays: dict[str, dict[str, dict]] = {}
+    for o in overlay_docs:
+        overlays.setdefault(o["owner_id"], {})[o["task_id"]] = o
+    done = {(p["owner_id"], p["task_id"]) for p in done_docs}
+
+    now = utcnow()
+    jobs = []
+    for owner_id in owners:
+        tasks = [
+            {"task_id": t["task_id"], "title": t.get("title", "")}
+            for t in merge_catalog(entries if owner_id in enabled else {}, overlays.get(owner_id, {}), owner_id, own.get(owner_id, []))
+            if task_due_mask(t) & bit and (owner_id, t["task_id"]) not in done
+        ]
+        if tasks:
+            tasks.sort(key=lambda t: (t["title"], t["task_id"]))
+            jobs.append(
+                {
+                    "_id": job_id(owner_id, year, month),
+                    "kind": "due_reminder",
+                    "owner_id": owner_id,
+                    "year": year,
+                    "month": month,
+                    "tasks": tasks,
+                    "status": "pending",
+                    "due_at": due_at,
+                    "created_at": now,
+                }
+            )
+    return jobs
+
+
+async def _write_jobs(db: AsyncIOMotorDatabase, jobs: list[dict[str, Any]]) -> int:
+    """Insert jobs that do not exist yet; returns how many were new."""
+    ops = [UpdateOne({"_id": job["_id"]}, {"$setOnInsert": job}, upsert=True) for job in jobs]
+    try:
+        result = await db["outbox"].bulk_write(ops, ordered=False)
+        return result.upserted_count
+    except BulkWriteError as e:
+        # Another scan upserting the same job at the same moment loses the race on _id; that is fine.
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != DUPLICATE_KEY for err in errors):
+            raise
+        return e.details.get("nUpserted", 0)
+
+
+async def scan_owners(
+    db: AsyncIOMotorDatabase,
+    year: int,
+    month: int,
+    *,
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+) -> dict[str, int]:
+    """Queue a reminder job for every owner with incomplete tasks due in the month."""
+    batch_size = batch_size or settings.reminder_batch_size
+    concurrency = concurrency or settings.reminder_concurrency
+    due_at = datetime(year, month, 1, settings.reminder_hour_utc)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    totals = {"owners": 0, "jobs": 0, "created": 0}
+
+    async def worker() -> None:
+        while (owners := await queue.get()) is not None:
+            jobs = await _due_jobs(db, owners, year, month, due_at)
+            created = await _write_jobs(db, jobs) if jobs else 0
+            totals["owners"] += len(owners)
+            totals["jobs"] += len(jobs)
+            totals["created"] += created
+            REMINDER_OWNERS_SCANNED.inc(len(owners))
+            REMINDER_JOBS.labels("created").inc(created)
+            REMINDER_JOBS.labels("existing").inc(len(jobs) - created)
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(_owner_batches(db, queue, batch_size, concurrency))]
+    tasks += [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+        REMINDER_SCAN_SECONDS.observe(time.perf_counter() - start)
+    return totals
+
+
+class ReminderSink(Protocol):
+    async def send(self, jobs: list[dict[str, Any]]) -> None: ...
+
+
+class LocalSink:
+    """Appends each job as a JSON line to `path`, or logs it when no path is set."""
+
+    def __init__(self, path: str = "") -> None:
+        self.path = path
+
+    async def send(self, jobs: list[dict[str, Any]]) -> None:
+        lines = [json.dumps(job, default=str) for job in jobs]
+        if not self.path:
+            for line in lines:
+                logger.info("reminder %s", line)
+            return
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: list[str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+
+
+async def deliver_due(db: AsyncIOMotorDatabase, sink: ReminderSink, *, batch_size: int | None = None) -> int:
+    """Send every job whose due_at has passed; returns how many were sent."""
+    batch_size = batch_size or settings.reminder_batch_size
+    sent = 0
+    while True:
+        now = utcnow()
+        claimable = {
+            "due_at": {"$lte": now},
+            "$or": [
+                {"status": "pending"},
+                {"status": "sending", "claimed_at": {"$lt": now - timedelta(seconds=settings.reminder_claim_seconds)}},
+            ],
+        }
+        ids = [d["_id"] for d in await db["outbox"].find(claimable, {"_id": 1}).limit(batch_size).to_list(length=batch_size)]
+        if not ids:
+            return sent
+        claim = str(ObjectId())
+        await db["outbox"].update_many(
+            {"_id": {"$in": ids}, **claimable}, {"$set": {"status": "sending", "claim": claim, "claimed_at": now}}
+        )
+        jobs = await db["outbox"].find({"claim": claim}).to_list(length=None)
+        if not jobs:
+            continue
+        await sink.send(jobs)
+        await db["outbox"].update_many({"claim": claim}, {"$set": {"status": "sent", "sent_at": utcnow()}, "$unset": {"claim": ""}})
+        sent += len(jobs)
+        REMINDER_DELIVERED.inc(len(jobs))
+
+
+class ReminderScheduler:
+    """Scans for the current month and delivers due jobs every `interval` seconds, in the API process."""
+
+    def __init__(self, interval: float, sink: ReminderSink) -> None:
+        self.interval = interval
+        self.sink = sink
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_once(self) -> None:
+        now = utcnow()
+        totals = await scan_owners(mongo.db, now.year, now.month)
+        sent = await deliver_due(mongo.db, self.sink)
+        logger.info("reminder scan %s; %d reminders sent", totals, sent)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("reminder scheduler run failed")
+            await asyncio.sleep(self.interval)
+
+
+reminder_scheduler = ReminderScheduler(settings.reminder_interval_seconds, LocalSink(settings.reminder_sink_path))
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Queue and deliver due-task reminders.")
+    parser.add_argument("command", choices=["scan", "deliver"])
+    parser.add_argument("--year", type=int, default=None)
+    parser.add_argument("--month", type=int, default=None, choices=range(1, 13))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    now = utcnow()
+    mongo.connect()
+    try:
+        if args.command == "scan":
+            totals = await scan_owners(mongo.db, args.year or now.year, args.month or now.month)
+            print(f"{totals['owners']} owners scanned, {totals['jobs']} with tasks due, {totals['created']} new jobs")
+        else:
+            sent = await deliver_due(mongo.db, LocalSink(settings.reminder_sink_path))
+            print(f"{sent} reminders sent")
+    finally:
+        mongo.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,282 @@
+"""
+Incrementally maintained monthly rollups.
+
+`rollups` holds one document per `(owner_id, year, month)` with `completed_tasks` and
+`completed_cost_total` (Decimal128) for that month's completed progress on tasks due that month,
+which is what the full month summary counts. Tasks are not
+year-scoped, so due counts live on `year=DUE_YEAR` documents (one per owner and month) and are
+merged in on read. Those counts cover the owner's own tasks plus overlay changes to built-in
+catalog tasks; the catalog's own due counts come from the in-process catalog cache, for owners who
+see the catalog.
+
+Every progress and task write path applies its delta here; a task whose due months change also
+moves its completed progress in or out of those months. To recompute from scratch and report
+drift, run from the HomeRightAPI directory:
+
+    python -m app.db.rollups verify [--owner OWNER_ID]
+    python -m app.db.rollups rebuild [--owner OWNER_ID]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Iterable
+
+from bson.decimal128 import Decimal128
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne, UpdateOne
+
+from app.db.catalog import catalog, catalog_owner, catalog_owner_ids, effective_mask, load_overlays, visible_entries
+from app.db.mongo import mongo
+from app.db.versions import bump_owner_landed
+from app.models.enums import TaskStatus
+from app.utils.bson import decimal_from_bson, decimal_to_bson
+from app.utils.schedule import due_mask, month_bit, months_from_mask
+
+
+DUE_YEAR = 0
+
+TASK_MASK_FIELDS = {"owner_id": 1, "task_id": 1, "due_mask": 1, "schedule": 1, "month": 1}
+
+
+@dataclass
+class MonthRollup:
+    due_tasks: int = 0
+    completed_tasks: int = 0
+    completed_cost_total: Decimal = Decimal(0)
+
+
+def task_due_mask(doc: dict | None) -> int:
+    if not doc:
+        return 0
+    if doc.get("due_mask") is not None:
+        return doc["due_mask"]
+    return due_mask(doc["schedule"], doc.get("month"))
+
+
+def _is_complete(doc: dict | None) -> bool:
+    return bool(doc) and doc.get("status") == TaskStatus.complete.value
+
+
+def _add_completion(deltas: dict[tuple[str, int, int], list], doc: dict, sign: int) -> None:
+    delta = deltas.setdefault((doc["owner_id"], doc["year"], doc["month"]), [0, Decimal(0)])
+    delta[0] += sign
+    delta[1] += sign * (decimal_from_bson(doc.get("cost")) or Decimal(0))
+
+
+def _completion_ops(deltas: dict[tuple[str, int, int], list]) -> list[UpdateOne]:
+    return [
+        UpdateOne(
+            {"owner_id": owner_id, "year": year, "month": month},
+            {"$inc": {"completed_tasks": count, "completed_cost_total": decimal_to_bson(cost)}},
+            upsert=True,
+        )
+        for (owner_id, year, month), (count, cost) in deltas.items()
+        if count or cost
+    ]
+
+
+async def task_masks(db: AsyncIOMotorDatabase, keys: Iterable[tuple[str, str]]) -> dict[tuple[str, str], int]:
+    """Current due masks for `(owner_id, task_id)` pairs: owner tasks, else the owner's view of the catalog task."""
+    by_owner: dict[str, set[str]] = {}
+    for owner_id, task_id in keys:
+        by_owner.setdefault(owner_id, set()).add(task_id)
+    if not by_owner:
+        return {}
+    query = {"$or": [{"owner_id": owner_id, "task_id": {"$in": sorted(ids)}} for owner_id, ids in by_owner.items()]}
+    masks = {(d["owner_id"], d["task_id"]): task_due_mask(d) async for d in db["tasks"].find(query, TASK_MASK_FIELDS)}
+
+    entries = await catalog.tasks(db)
+    builtin = [(o, t) for o, ids in by_owner.items() for t in ids if t in entries and (o, t) not in masks]
+    if builtin:
+        enabled = await catalog_owner_ids(db, sorted({o for o, _ in builtin}))
+        builtin = [(o, t) for o, t in builtin if o in enabled]
+    if builtin:
+        query = {"$or": [{"owner_id": owner_id, "task_id": task_id} for owner_id, task_id in builtin]}
+        overlays = {(o["owner_id"], o["task_id"]): o async for o in db["task_overlays"].find(query)}
+        for owner_id, task_id in builtin:
+            masks[(owner_id, task_id)] = effective_mask(entries[task_id], overlays.get((owner_id, task_id)))
+    return masks
+
+
+async def apply_progress_changes(db: AsyncIOMotorDatabase, changes: Iterable[tuple[dict | None, dict | None]]) -> None:
+    """
+    Apply `(before, after)` progress document pairs; `None` means absent (insert or delete).
+    Completed records only count in months their task is due, so this reads the tasks' due masks.
+    """
+    completed = [(doc, sign) for before, after in changes for doc, sign in ((before, -1), (after, 1)) if _is_complete(doc)]
+    if not completed:
+        return
+    masks = await task_masks(db, {(doc["owner_id"], doc["task_id"]) for doc, _ in completed})
+
+    deltas: dict[tuple[str, int, int], list] = {}
+    for doc, sign in completed:
+        if masks.get((doc["owner_id"], doc["task_id"]), 0) & month_bit(doc["month"]):
+            _add_completion(deltas, doc, sign)
+    ops = _completion_ops(deltas)
+    if ops:
+        await db["rollups"].bulk_write(ops, ordered=False)
+
+
+async def apply_due_change(db: AsyncIOMotorDatabase, owner_id: str, task_id: str, before_mask: int, after_mask: int) -> None:
+    """
+    Move a task's due count from `before_mask` to `after_mask` (0 for a new or removed task).
+    Its completed progress in the months it joined or left starts or stops counting as well.
+    """
+    changed = months_from_mask(before_mask ^ after_mask)
+    if not changed:
+        return
+    ops = [
+        UpdateOne(
+            {"owner_id": owner_id, "year": DUE_YEAR, "month": month},
+            {"$inc": {"due_tasks": 1 if after_mask & month_bit(month) else -1}},
+            upsert=True,
+        )
+        for month in changed
+    ]
+    deltas: dict[tuple[str, int, int], list] = {}
+    query = {"owner_id": owner_id, "task_id": task_id, "status": TaskStatus.complete.value, "month": {"$in": list(changed)}}
+    async for doc in db["progress"].find(query, {"owner_id": 1, "year": 1, "month": 1, "cost": 1}):
+        _add_completion(deltas, doc, 1 if after_mask & month_bit(doc["month"]) else -1)
+    await db["rollups"].bulk_write(ops + _completion_ops(deltas), ordered=False)
+
+
+async def read_rollups(db: AsyncIOMotorDatabase, owner_id: str, year: int, months: Iterable[int]) -> dict[int, MonthRollup]:
+    """Rollups for the given months of `year`, with due counts merged in. One indexed query plus a point read."""
+    months = list(months)
+    catalog_due = await catalog.due_counts(db) if await catalog_owner(db, owner_id) else {}
+    out = {m: MonthRollup(due_tasks=catalog_due.get(m, 0)) for m in months}
+    cursor = db["rollups"].find({"owner_id": owner_id, "year": {"$in": [DUE_YEAR, year]}, "month": {"$in": months}})
+    async for doc in cursor:
+        item = out[doc["month"]]
+        if doc["year"] == DUE_YEAR:
+            item.due_tasks += doc.get("due_tasks", 0)
+        else:
+            item.completed_tasks = doc.get("completed_tasks", 0)
+            item.completed_cost_total = decimal_from_bson(doc.get("completed_cost_total")) or Decimal(0)
+    return out
+
+
+def _expected_pipeline(owner_id: str) -> list[dict]:
+    return [
+        {"$match": {"owner_id": owner_id, "status": TaskStatus.complete.value}},
+        {
+            "$group": {
+                "_id": {"year": "$year", "month": "$month", "task_id": "$task_id"},
+                "completed": {"$sum": 1},
+                "cost": {"$sum": {"$ifNull": ["$cost", Decimal128("0")]}},
+            }
+        },
+        {"$unionWith": {"coll": "tasks", "pipeline": [{"$match": {"owner_id": owner_id}}, {"$project": {"_id": 0, **TASK_MASK_FIELDS}}]}},
+    ]
+
+
+async def compute_rollups(db: AsyncIOMotorDatabase, owner_id: str) -> dict[tuple[int, int], dict[str, Any]]:
+    """Recompute an owner's rollups from `progress` and `tasks` (one aggregation) plus catalog overlays."""
+    expected: dict[tuple[int, int], dict[str, Any]] = {}
+    masks: dict[str, int] = {}
+    completions = []
+    async for row in db["progress"].aggregate(_expected_pipeline(owner_id)):
+        if "completed" in row:
+            completions.append(row)
+            continue
+        masks[row["task_id"]] = task_due_mask(row)
+        for month in months_from_mask(masks[row["task_id"]]):
+            expected.setdefault((DUE_YEAR, month), {"due_tasks": 0})["due_tasks"] += 1
+
+    entries = await visible_entries(db, owner_id)
+    overlays = await load_overlays(db, owner_id)
+    for task_id, entry in entries.items():
+        masks.setdefault(task_id, effective_mask(entry, overlays.get(task_id)))
+    for task_id, overlay in overlays.items():
+        entry = entries.get(task_id)
+        base, effective = effective_mask(entry, None), effective_mask(entry, overlay)
+        for month in months_from_mask(base ^ effective):
+            step = 1 if month in months_from_mask(effective) else -1
+            expected.setdefault((DUE_YEAR, month), {"due_tasks": 0})["due_tasks"] += step
+
+    for row in completions:
+        group = row["_id"]
+        if not masks.get(group["task_id"], 0) & month_bit(group["month"]):
+            continue
+        item = expected.setdefault((group["year"], group["month"]), {"completed_tasks": 0, "completed_cost_total": Decimal(0)})
+        item["completed_tasks"] += row["completed"]
+        item["completed_cost_total"] += decimal_from_bson(row["cost"]) or Decimal(0)
+    return expected
+
+
+async def _owner_ids(db: AsyncIOMotorDatabase, owner_id: str | None = None):
+    if owner_id is not None:
+        yield owner_id
+        return
+    pipeline = [
+        {"$group": {"_id": "$owner_id"}},
+        {"$unionWith": {"coll": "tasks", "pipeline": [{"$group": {"_id": "$owner_id"}}]}},
+        {"$unionWith": {"coll": "task_overlays", "pipeline": [{"$group": {"_id": "$owner_id"}}]}},
+        {"$unionWith": {"coll": "rollups", "pipeline": [{"$group": {"_id": "$owner_id"}}]}},
+        {"$group": {"_id": "$_id"}},
+    ]
+    async for row in db["progress"].aggregate(pipeline, allowDiskUse=True):
+        yield row["_id"]
+
+
+def _normalize(fields: dict[str, Any]) -> dict[str, Any]:
+    out = {k: v for k, v in fields.items() if k in ("due_tasks", "completed_tasks", "completed_cost_total")}
+    if "completed_cost_total" in out:
+        out["completed_cost_total"] = decimal_from_bson(out["completed_cost_total"]) or Decimal(0)
+    return {k: v for k, v in out.items() if v}
+
+
+async def rebuild_rollups(db: AsyncIOMotorDatabase, owner_id: str | None = None, fix: bool = False) -> list[dict[str, Any]]:
+    """
+    Compare stored rollups with a from-scratch recomputation and return the drifted entries.
+    With `fix=True`, drifted documents are replaced with the recomputed values.
+    """
+    drift: list[dict[str, Any]] = []
+    async for owner in _owner_ids(db, owner_id):
+        expected = await compute_rollups(db, owner)
+        actual = {(d["year"], d["month"]): d async for d in db["rollups"].find({"owner_id": owner})}
+        ops = []
+        for key in expected.keys() | actual.keys():
+            want = _normalize(expected.get(key, {}))
+            have = _normalize(actual.get(key, {}))
+            if want == have:
+                continue
+            year, month = key
+            drift.append({"owner_id": owner, "year": year, "month": month, "expected": want, "actual": have})
+            if fix:
+                replacement = {"owner_id": owner, "year": year, "month": month}
+                for field, value in want.items():
+                    replacement[field] = decimal_to_bson(value) if field == "completed_cost_total" else value
+                ops.append(ReplaceOne({"owner_id": owner, "year": year, "month": month}, replacement, upsert=True))
+        if ops:
+            await db["rollups"].bulk_write(ops, ordered=False)
+            await bump_owner_landed(db, owner)
+    return drift
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Verify or rebuild the monthly rollups collection.")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    parser.add_argument("--owner", default=None, help="Only check this owner_id")
+    args = parser.parse_args()
+
+    mongo.connect()
+    try:
+        drift = await rebuild_rollups(mongo.db, owner_id=args.owner, fix=args.command == "rebuild")
+    finally:
+        mongo.close()
+
+    for entry in drift:
+        print(f"{entry['owner_id']} {entry['year']}-{entry['month']:02d}: expected {entry['expected']} actual {entry['actual']}")
+    action = "fixed" if args.command == "rebuild" else "found"
+    print(f"{len(drift)} drifted rollups {action}")
+    if drift and args.command == "verify":
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from app.core.config import settings
+from app.db.storage.base import Conflict, CostTotals, PreconditionFailed, Storage, WriteResult
+
+
+def create_storage() -> Storage:
+    """The backend selected by STORAGE_BACKEND (`mongo` or `sqlite`), behind the owner cache if enabled."""
+    if settings.storage_backend == "sqlite":
+        from app.db.storage.sqlite import SQLiteStorage
+
+        backend: Storage = SQLiteStorage(settings.sqlite_path, settings.sqlite_read_threads)
+    else:
+        from app.db.storage.mongo import MongoStorage
+
+        backend = MongoStorage()
+    if settings.owner_cache_enabled:
+        from app.db.storage.cached import CachedStorage
+
+        return CachedStorage(backend, settings.owner_cache_max_records, settings.owner_cache_ttl_seconds)
+    return backend
+
+
+storage = create_storage()
+
+__all__ = ["Conflict", "CostTotals", "PreconditionFailed", "Storage", "WriteResult", "create_storage", "storage"]
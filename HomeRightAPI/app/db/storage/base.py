@@ -0,0 +1,205 @@
+"""
+Repository interfaces shared by the storage backends.
+
+Repositories take and return plain dicts shaped like the Mongo documents (`_id`, naive UTC
+datetimes, `cost` as a Decimal or Decimal128), so the `app.api.serializers` helpers work
+for every backend. Progress ids are 24-character hex strings on every backend.
+
+Tasks, progress and settings carry a `version` that every write increments (records written before
+versioning read as 0). Mutations take an optional `expected_version` and only apply at that version:
+a record at another version raises PreconditionFailed, a missing one reads as not found.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Iterable, Literal, NamedTuple
+
+from app.db.rollups import MonthRollup
+
+
+class Conflict(Exception):
+    """The write collides with an existing record (duplicate key)."""
+
+
+class PreconditionFailed(Exception):
+    """The record is not at the `expected_version` the write was conditioned on."""
+
+
+class CostTotals(NamedTuple):
+    total: Decimal
+    count: int
+
+
+class WriteResult(NamedTuple):
+    status: Literal["created", "updated", "error"]
+    id: str | None = None
+    error: str | None = None
+
+
+class TaskRepository(ABC):
+    @abstractmethod
+    async def create(self, doc: dict[str, Any]) -> dict[str, Any]:
+        """Insert a new task; raises Conflict if (owner_id, task_id) exists."""
+
+    @abstractmethod
+    async def get(self, owner_id: str, task_id: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    async def list(
+        self,
+        owner_id: str,
+        *,
+        schedule: str | None,
+        month: int | None,
+        is_builtin: bool | None,
+        after: tuple[bool, str, str] | None,
+        skip: int,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        """Built-in tasks first, then by title and task_id; `after` is the last (is_builtin, title, task_id) seen."""
+
+    @abstractmethod
+    async def for_owner(self, owner_id: str) -> list[dict[str, Any]]:
+        """Every task of the owner in list order, with only the fields TaskOut and due_mask need."""
+
+    @abstractmethod
+    async def due_in_month(self, owner_id: str, month: int) -> list[dict[str, Any]]: ...
+
+    @abstractmethod
+    async def replace(
+        self, owner_id: str, task_id: str, fields: dict[str, Any], now: datetime, *, expected_version: int | None = None
+    ) -> dict[str, Any]:
+        """Create or overwrite a task with `fields` (everything but created_at); only overwrite with `expected_version`."""
+
+    @abstractmethod
+    async def update(
+        self, owner_id: str, task_id: str, changes: dict[str, Any], now: datetime, *, expected_version: int | None = None
+    ) -> dict[str, Any] | None:
+        """Apply a partial update; returns None if the task does not exist."""
+
+    @abstractmethod
+    async def delete(self, owner_id: str, task_id: str, *, expected_version: int | None = None) -> bool: ...
+
+    @abstractmethod
+    async def seed_builtins(self, owner_id: str, now: datetime) -> tuple[int, int]:
+        """
+        Give the owner the built-in checklist (`app.db.checklist`), keeping tasks it already has.
+        Returns (records created, checklist tasks the owner now has).
+        """
+
+
+class ProgressRepository(ABC):
+    @abstractmethod
+    async def create(self, doc: dict[str, Any]) -> dict[str, Any]:
+        """Insert a new record; raises Conflict if its (owner_id, task_id, year, month) exists."""
+
+    @abstractmethod
+    async def get(self, owner_id: str, progress_id: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    async def get_by_key(self, key: dict[str, Any]) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    async def list(
+        self,
+        owner_id: str,
+        *,
+        year: int | None,
+        month: int | None,
+        task_id: str | None,
+        status: str | None,
+        after: tuple[datetime, Any] | None,
+        skip: int,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        """Newest first by (updated_at, _id); `after` is the last (updated_at, _id) seen."""
+
+    @abstractmethod
+    async def for_year(self, owner_id: str, year: int) -> list[dict[str, Any]]:
+        """The owner's records for `year`, with only the fields ProgressOut needs."""
+
+    @abstractmethod
+    async def for_month(self, owner_id: str, year: int, month: int) -> list[dict[str, Any]]: ...
+
+    @abstractmethod
+    async def upsert_by_key(self, key: dict[str, Any], fields: dict[str, Any], now: datetime) -> dict[str, Any]:
+        """Create or overwrite the record for key (owner_id, task_id, year, month)."""
+
+    @abstractmethod
+    async def upsert_many(
+        self,
+        writes: list[tuple[dict[str, Any], dict[str, Any]]],
+        now: datetime,
+        insert_ids: list[str | None] | None = None,
+    ) -> list[WriteResult]:
+        """
+        `upsert_by_key` for many distinct keys; one result per write, in order.
+        `insert_ids` optionally fixes the id each write gets if it creates a record.
+        """
+
+    @abstractmethod
+    async def update(
+        self, owner_id: str, progress_id: str, changes: dict[str, Any], now: datetime, *, expected_version: int | None = None
+    ) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    async def replace(
+        self, owner_id: str, progress_id: str, fields: dict[str, Any], now: datetime, *, expected_version: int | None = None
+    ) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    async def delete(self, owner_id: str, progress_id: str, *, expected_version: int | None = None) -> bool: ...
+
+
+class SettingsRepository(ABC):
+    @abstractmethod
+    async def get(self, owner_id: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    async def upsert(self, owner_id: str, selected_year: int, now: datetime, *, expected_version: int | None = None) -> dict[str, Any]:
+        """Create or update the owner's settings; only update with `expected_version`."""
+
+    @abstractmethod
+    async def delete(self, owner_id: str, *, expected_version: int | None = None) -> bool: ...
+
+
+class SummaryRepository(ABC):
+    @abstractmethod
+    async def month_totals(self, owner_id: str, year: int, months: Iterable[int]) -> dict[int, MonthRollup]:
+        """Due/completed counts and completed cost for the given months of `year`."""
+
+    @abstractmethod
+    async def cost_totals(self, owner_id: str, year: int | None) -> dict[str, dict[Any, CostTotals]]:
+        """
+        Completed progress (all years, or only `year`) as exact cost totals and record counts, grouped
+        under "year" (by year), "month" (by (year, month)) and "task" (by task_id).
+        """
+
+
+class Storage(ABC):
+    tasks: TaskRepository
+    progress: ProgressRepository
+    settings: SettingsRepository
+    summaries: SummaryRepository
+
+    @abstractmethod
+    async def connect(self) -> None:
+        """Open connections and create indexes / schema."""
+
+    @abstractmethod
+    async def close(self) -> None: ...
+
+    @abstractmethod
+    async def ping(self) -> None:
+        """One round trip to the database; raises if it cannot be reached."""
+
+    @abstractmethod
+    async def owner_version(self, owner_id: str) -> str:
+        """Changes whenever anything an owner's reads depend on changes, never before the data does; used for ETags."""
+
+    @abstractmethod
+    async def cache_stamp(self, owner_id: str, scope: Literal["tasks", "settings"]) -> str:
+        """Changes whenever the owner's tasks (or settings) change, on any worker, never before the data does; stamps the read cache."""
@@ -0,0 +1,175 @@
+"""
+Per-owner read cache for merged task lists (OWNER_CACHE_ENABLED=true).
+
+`CachedStorage` wraps a backend and keeps each owner's full task list in an in-process LRU, bounded
+by the total number of cached records and expired after a TTL. Task reads (`list`, `get`,
+`due_in_month`, `for_owner`) are answered from the cached list. Writes through the wrapper drop the
+owner's entry. Every hit is checked against `Storage.cache_stamp`, one point read instead of the two
+queries and catalog merge of a load, so writes made by other workers invalidate it as well. Settings
+are not cached: loading them is a single point read, no dearer than the stamp check.
+
+Cached values are shared between requests and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from app.core.metrics import OWNER_CACHE_EVICTIONS, OWNER_CACHE_RECORDS, OWNER_CACHE_REQUESTS
+from app.db.rollups import task_due_mask
+from app.db.storage.base import Storage, TaskRepository
+from app.utils.schedule import month_bit
+
+
+@dataclass
+class _Entry:
+    value: Any
+    stamp: str
+    expires_at: float
+    size: int
+
+
+def _sort_key(doc: dict) -> tuple[bool, str, str]:
+    return (not doc.get("is_builtin", False), doc["title"], doc["task_id"])
+
+
+class OwnerCache:
+    """LRU of (scope, owner_id) -> value, bounded by `max_records` and expired after `ttl_seconds`."""
+
+    def __init__(self, store: Storage, max_records: int, ttl_seconds: float) -> None:
+        self.store = store
+        self.max_records = max_records
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._records = 0
+
+    async def get(self, scope: str, owner_id: str, load: Callable[[], Awaitable[Any]], size: Callable[[Any], int]) -> Any:
+        key = (scope, owner_id)
+        # Read the stamp before loading: a write landing in between leaves an older stamp on newer data.
+        stamp = await self.store.cache_stamp(owner_id, scope)
+        entry = self._entries.get(key)
+        if entry is not None and entry.stamp == stamp and entry.expires_at > time.monotonic():
+            self._entries.move_to_end(key)
+            OWNER_CACHE_REQUESTS.labels(scope, "hit").inc()
+            return entry.value
+
+        OWNER_CACHE_REQUESTS.labels(scope, "miss").inc()
+        if entry is not None:
+            self._remove(key, "stale")
+        value = await load()
+        self._put(key, _Entry(value, stamp, time.monotonic() + self.ttl_seconds, max(size(value), 1)))
+        return value
+
+    def invalidate(self, scope: str, owner_id: str) -> None:
+        if (scope, owner_id) in self._entries:
+            self._remove((scope, owner_id), "invalidated")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._records = 0
+        OWNER_CACHE_RECORDS.set(0)
+
+    def _put(self, key: tuple[str, str], entry: _Entry) -> None:
+        if entry.size > self.max_records:
+            return
+        if key in self._entries:
+            self._remove(key, "stale")
+        self._entries[key] = entry
+        self._records += entry.size
+        while self._records > self.max_records:
+            self._remove(next(iter(self._entries)), "size")
+        OWNER_CACHE_RECORDS.set(self._records)
+
+    def _remove(self, key: tuple[str, str], reason: str) -> None:
+        entry = self._entries.pop(key)
+        self._records -= entry.size
+        OWNER_CACHE_EVICTIONS.labels(key[0], reason).inc()
+        OWNER_CACHE_RECORDS.set(self._records)
+
+
+class CachedTaskRepository(TaskRepository):
+    def __init__(self, inner: TaskRepository, cache: OwnerCache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    async def for_owner(self, owner_id: str) -> list[dict[str, Any]]:
+        return await self.cache.get("tasks", owner_id, lambda: self.inner.for_owner(owner_id), len)
+
+    async def get(self, owner_id: str, task_id: str) -> dict[str, Any] | None:
+        return next((t for t in await self.for_owner(owner_id) if t["task_id"] == task_id), None)
+
+    async def list(self, owner_id, *, schedule, month, is_builtin, after, skip, limit):
+        after_key = None if after is None else (not after[0], after[1], after[2])
+        docs = [
+            d
+            for d in await self.for_owner(owner_id)
+            if (schedule is None or d["schedule"] == schedule)
+            and (month is None or d.get("month") == month)
+            and (is_builtin is None or bool(d.get("is_builtin", False)) == is_builtin)
+            and (after_key is None or _sort_key(d) > after_key)
+        ]
+        return docs[skip : skip + limit]
+
+    async def due_in_month(self, owner_id: str, month: int) -> list[dict[str, Any]]:
+        bit = month_bit(month)
+        return [t for t in await self.for_owner(owner_id) if task_due_mask(t) & bit]
+
+    async def create(self, doc):
+        try:
+            return await self.inner.create(doc)
+        finally:
+            self.cache.invalidate("tasks", doc["owner_id"])
+
+    async def replace(self, owner_id, task_id, fields, now, *, expected_version=None):
+        try:
+            return await self.inner.replace(owner_id, task_id, fields, now, expected_version=expected_version)
+        finally:
+            self.cache.invalidate("tasks", owner_id)
+
+    async def update(self, owner_id, task_id, changes, now, *, expected_version=None):
+        try:
+            return await self.inner.update(owner_id, task_id, changes, now, expected_version=expected_version)
+        finally:
+            self.cache.invalidate("tasks", owner_id)
+
+    async def delete(self, owner_id, task_id, *, expected_version=None):
+        try:
+            return await self.inner.delete(owner_id, task_id, expected_version=expected_version)
+        finally:
+            self.cache.invalidate("tasks", owner_id)
+
+    async def seed_builtins(self, owner_id: str, now: datetime) -> tuple[int, int]:
+        try:
+            return await self.inner.seed_builtins(owner_id, now)
+        finally:
+            self.cache.invalidate("tasks", owner_id)
+
+
+class CachedStorage(Storage):
+    def __init__(self, inner: Storage, max_records: int, ttl_seconds: float) -> None:
+        self.inner = inner
+        self.cache = OwnerCache(inner, max_records, ttl_seconds)
+        self.tasks = CachedTaskRepository(inner.tasks, self.cache)
+        self.progress = inner.progress
+        self.settings = inner.settings
+        self.summaries = inner.summaries
+
+    async def connect(self) -> None:
+        await self.inner.connect()
+
+    async def close(self) -> None:
+        self.cache.clear()
+        await self.inner.close()
+
+    async def ping(self) -> None:
+        await self.inner.ping()
+
+    async def owner_version(self, owner_id: str) -> str:
+        return await self.inner.owner_version(owner_id)
+
+    async def cache_stamp(self, owner_id, scope):
+        return await self.inner.cache_stamp(owner_id, scope)
@@ -0,0 +1,495 @@
+"""
+Mongo storage backend: the full feature set (shared catalog with overlays, rollups, change
+sequence and tombstones for /sync). Every write allocates the owner's next seq first and is
+marked landed when it returns, see `app.db.versions`.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Iterable
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.db.catalog import (
+    OVERRIDE_FIELDS,
+    apply_checklist,
+    catalog,
+    catalog_owner,
+    effective_mask,
+    effective_task,
+    enable_catalog,
+    merged_tasks,
+    update_overlay,
+    visible_entries,
+)
+from app.db.checklist import CHECKLIST
+from app.db.indexes import ensure_indexes
+from app.db.mongo import mongo
+from app.db.rollups import MonthRollup, apply_due_change, apply_progress_changes, read_rollups, rebuild_rollups, task_due_mask
+from app.db.storage.base import (
+    Conflict,
+    CostTotals,
+    PreconditionFailed,
+    ProgressRepository,
+    SettingsRepository,
+    Storage,
+    SummaryRepository,
+    TaskRepository,
+    WriteResult,
+)
+from app.db.versions import next_owner_seq, next_owner_seqs, owner_write, record_tombstone
+from app.models.enums import Schedule, TaskStatus
+from app.utils.bson import decimal_from_bson, decimal_to_bson, utcnow
+from app.utils.schedule import due_mask, month_bit
+
+
+TASK_PROJECTION = {
+    "_id": 0,
+    **dict.fromkeys(("owner_id", "task_id", "title", "detail", "schedule", "month", "due_mask", "is_builtin", "created_at", "updated_at", "version"), 1),
+}
+PROGRESS_PROJECTION = dict.fromkeys(
+    ("owner_id", "task_id", "year", "month", "status", "cost", "note", "date", "created_at", "updated_at", "version"), 1
+)
+
+
+def _sort_key(doc: dict) -> tuple[bool, str, str]:
+    return (not doc.get("is_builtin", False), doc["title"], doc["task_id"])
+
+
+def _object_id(progress_id: str) -> ObjectId | None:
+    return ObjectId(progress_id) if ObjectId.is_valid(progress_id) else None
+
+
+def _progress_fields(fields: dict[str, Any]) -> dict[str, Any]:
+    return {**fields, "cost": decimal_to_bson(fields["cost"])} if "cost" in fields else dict(fields)
+
+
+def _match(query: dict[str, Any], expected_version: int | None) -> dict[str, Any]:
+    """`query` narrowed to `expected_version`; records written before versioning count as version 0."""
+    if expected_version is None:
+        return query
+    return {**query, "version": expected_version or {"$in": [0, None]}}
+
+
+async def _precondition(collection: str, query: dict[str, Any], expected_version: int | None) -> None:
+    """After a versioned write matched nothing, tell a stale version apart from a missing record."""
+    if expected_version is not None and await mongo.db[collection].find_one(query, {"_id": 1}):
+        raise PreconditionFailed(f"Record does not match version {expected_version}")
+
+
+class MongoTaskRepository(TaskRepository):
+    async def _catalog_overlay(self, owner_id: str, task_id: str) -> tuple[dict | None, dict | None]:
+        entry = (await visible_entries(mongo.db, owner_id)).get(task_id)
+        if entry is None:
+            return None, None
+        return entry, await mongo.db["task_overlays"].find_one({"owner_id": owner_id, "task_id": task_id})
+
+    async def _update_overlay(self, owner_id: str, task_id: str, set_fields: dict, now: datetime, expected_version: int | None):
+        try:
+            result = await update_overlay(mongo.db, owner_id, task_id, set_fields, now, expected_version)
+        except DuplicateKeyError:
+            result = None
+        if result is None:
+            raise PreconditionFailed(f"Task does not match version {expected_version}")
+        return result
+
+    @owner_write
+    async def create(self, doc: dict[str, Any]) -> dict[str, Any]:
+        db = mongo.db
+        if doc["task_id"] in await visible_entries(db, doc["owner_id"]):
+            raise Conflict("Task already exists as a built-in catalog task")
+        doc = {**doc, "seq": await next_owner_seq(db, doc["owner_id"], "tasks"), "version": 1}
+        try:
+            await db["tasks"].insert_one(doc)
+        except DuplicateKeyError as e:
+            raise Conflict(f"Task already exists or invalid: {e}")
+        await apply_due_change(db, doc["owner_id"], doc["task_id"], 0, doc["due_mask"])
+        return doc
+
+    async def get(self, owner_id: str, task_id: str) -> dict[str, Any] | None:
+        doc = await mongo.db["tasks"].find_one({"owner_id": owner_id, "task_id": task_id})
+        if doc:
+            return doc
+        entry, overlay = await self._catalog_overlay(owner_id, task_id)
+        return effective_task(entry, overlay, owner_id) if entry else None
+
+    async def list(self, owner_id, *, schedule, month, is_builtin, after, skip, limit):
+        db = mongo.db
+        query: dict = {"owner_id": owner_id}
+        if schedule is not None:
+            query["schedule"] = schedule
+        if month is not None:
+            query["month"] = month
+        if is_builtin is not None:
+            query["is_builtin"] = is_builtin
+        if after is not None:
+            last_builtin, last_title, last_task_id = after
+            query["$or"] = [
+                {"is_builtin": {"$lt": last_builtin}},
+                {"is_builtin": last_builtin, "title": {"$gt": last_title}},
+                {"is_builtin": last_builtin, "title": last_title, "task_id": {"$gt": last_task_id}},
+            ]
+
+        # The merged page can only draw from the first skip+limit owner documents.
+        owner_docs = await db["tasks"].find(query).sort([("is_builtin", -1), ("title", 1), ("task_id", 1)]).limit(skip + limit).to_list(length=None)
+        after_key = None if after is None else (not after[0], after[1], after[2])
+        docs = [
+            d
+            for d in await merged_tasks(db, owner_id, owner_docs)
+            if (schedule is None or d["schedule"] == schedule)
+            and (month is None or d.get("month") == month)
+            and (is_builtin is None or bool(d.get("is_builtin", False)) == is_builtin)
+            and (after_key is None or _sort_key(d) > after_key)
+        ]
+        docs.sort(key=_sort_key)
+        return docs[skip : skip + limit]
+
+    async def for_owner(self, owner_id: str) -> list[dict[str, Any]]:
+        db = mongo.db
+        owner_docs = await db["tasks"].find({"owner_id": owner_id}, TASK_PROJECTION).to_list(length=5000)
+        return sorted(await merged_tasks(db, owner_id, owner_docs), key=_sort_key)
+
+    async def due_in_month(self, owner_id: str, month: int) -> list[dict[str, Any]]:
+        db = mongo.db
+        bit = month_bit(month)
+        tasks = await db["tasks"].find({"owner_id": owner_id, "due_mask": {"$bitsAllSet": bit}}).to_list(length=5000)
+        return [t for t in await merged_tasks(db, owner_id, tasks) if t["due_mask"] & bit]
+
+    @owner_write
+    async def replace(self, owner_id, task_id, fields, now, *, expected_version=None):
+        db = mongo.db
+        query = {"owner_id": owner_id, "task_id": task_id}
+        entry = (await visible_entries(db, owner_id)).get(task_id)
+        seq = await next_owner_seq(db, owner_id, "tasks")
+        update = {"$set": {**fields, "updated_at": now, "seq": seq}, "$inc": {"version": 1}, "$setOnInsert": {"created_at": now}}
+        # Catalog tasks only have an owner document if it predates the catalog; otherwise they get an overlay.
+        before = await db["tasks"].find_one_and_update(
+            _match(query, expected_version),
+            update,
+            upsert=entry is None and expected_version is None,
+            return_document=ReturnDocument.BEFORE,
+        )
+        if before:
+            await apply_due_change(db, owner_id, task_id, task_due_mask(before), fields["due_mask"])
+            return {**before, **update["$set"], "version": before.get("version", 0) + 1}
+        if entry is not None:
+            overrides = {field: fields[field] for field in OVERRIDE_FIELDS}
+            before, after = await self._update_overlay(owner_id, task_id, {"hidden": False, "overrides": overrides, "seq": seq}, now, expected_version)
+            await apply_due_change(db, owner_id, task_id, effective_mask(entry, before), effective_mask(entry, after))
+            return effective_task(entry, after, owner_id)
+        if expected_version is not None:
+            raise PreconditionFailed(f"Task does not match version {expected_version}")
+
+        await apply_due_change(db, owner_id, task_id, 0, fields["due_mask"])
+        return {**query, **update["$set"], "created_at": now, "version": 1}
+
+    @owner_write
+    async def update(self, owner_id, task_id, changes, now, *, expected_version=None):
+        db = mongo.db
+        query = {"owner_id": owner_id, "task_id": task_id}
+        seq = await next_owner_seq(db, owner_id, "tasks")
+        update: dict = {**changes, "updated_at": now, "seq": seq}
+        if "schedule" in changes:
+            update["due_mask"] = due_mask(changes["schedule"], changes.get("month"))
+        before = await db["tasks"].find_one_and_update(
+            _match(query, expected_version), {"$set": update, "$inc": {"version": 1}}, return_document=ReturnDocument.BEFORE
+        )
+        if before:
+            after = {**before, **update, "version": before.get("version", 0) + 1}
+            if "month" in changes and "schedule" not in changes and before["schedule"] == Schedule.custom.value:
+                # A month-only change moves a custom task; the mask needs the stored schedule.
+                after["due_mask"] = due_mask(before["schedule"], changes["month"])
+                await db["tasks"].update_one({"_id": before["_id"], "version": after["version"]}, {"$set": {"due_mask": after["due_mask"]}})
+            if task_due_mask(after) != task_due_mask(before):
+                await apply_due_change(db, owner_id, task_id, task_due_mask(before), task_due_mask(after))
+            return after
+
+        entry, overlay = await self._catalog_overlay(owner_id, task_id)
+        if entry is None or (overlay and overlay.get("hidden")):
+            await _precondition("tasks", query, expected_version)
+            return None
+        overrides = {f"overrides.{field}": value for field, value in changes.items() if field in OVERRIDE_FIELDS}
+        before, after = await self._update_overlay(owner_id, task_id, {**overrides, "seq": seq}, now, expected_version)
+        await apply_due_change(db, owner_id, task_id, effective_mask(entry, before), effective_mask(entry, after))
+        return effective_task(entry, after, owner_id)
+
+    @owner_write
+    async def delete(self, owner_id, task_id, *, expected_version=None):
+        db = mongo.db
+        query = {"owner_id": owner_id, "task_id": task_id}
+        seq = await next_owner_seq(db, owner_id, "tasks")
+        doc = await db["tasks"].find_one_and_delete(_match(query, expected_version))
+        if doc:
+            await record_tombstone(db, owner_id, "task", {"task_id": task_id}, seq)
+            await apply_due_change(db, owner_id, task_id, task_due_mask(doc), 0)
+            return True
+
+        # Built-in catalog tasks are hidden for this owner rather than deleted.
+        entry, overlay = await self._catalog_overlay(owner_id, task_id)
+        if entry is None or (overlay and overlay.get("hidden")):
+            await _precondition("tasks", query, expected_version)
+            return False
+        before, _ = await self._update_overlay(owner_id, task_id, {"hidden": True, "seq": seq}, utcnow(), expected_version)
+        await apply_due_change(db, owner_id, task_id, effective_mask(entry, before), 0)
+        return True
+
+    @owner_write
+    async def seed_builtins(self, owner_id, now):
+        # Built-ins are shared catalog entries: seeding shows them to the owner, and hidden ones stay hidden.
+        db = mongo.db
+        await apply_checklist(db)
+        ids = sorted(e["task_id"] for e in CHECKLIST)
+        enabled = False
+        if await catalog_owner(db, owner_id) is None:
+            enabled = await enable_catalog(db, owner_id, await next_owner_seq(db, owner_id, "tasks"), now)
+            if enabled:
+                # The catalog's due months, and any progress already recorded against them, now count for this owner.
+                await rebuild_rollups(db, owner_id, fix=True)
+        own = await db["tasks"].find({"owner_id": owner_id, "task_id": {"$in": ids}}, {"task_id": 1}).to_list(length=None)
+        total = sum(1 for t in await merged_tasks(db, owner_id, own) if t["task_id"] in ids)
+        return (total - len(own) if enabled else 0), total
+
+
+class MongoProgressRepository(ProgressRepository):
+    @owner_write
+    async def create(self, doc: dict[str, Any]) -> dict[str, Any]:
+        db = mongo.db
+        doc = {**_progress_fields(doc), "seq": await next_owner_seq(db, doc["owner_id"]), "version": 1}
+        try:
+            result = await db["progress"].insert_one(doc)
+        except DuplicateKeyError as e:
+            raise Conflict(f"Progress already exists or invalid: {e}")
+        doc["_id"] = result.inserted_id
+        await apply_progress_changes(db, [(None, doc)])
+        return doc
+
+    async def get(self, owner_id: str, progress_id: str) -> dict[str, Any] | None:
+        oid = _object_id(progress_id)
+        return await mongo.db["progress"].find_one({"_id": oid, "owner_id": owner_id}) if oid else None
+
+    async def get_by_key(self, key: dict[str, Any]) -> dict[str, Any] | None:
+        return await mongo.db["progress"].find_one(key)
+
+    async def list(self, owner_id, *, year, month, task_id, status, after, skip, limit):
+        query: dict = {"owner_id": owner_id}
+        if year is not None:
+            query["year"] = year
+        if month is not None:
+            query["month"] = month
+        if task_id is not None:
+            query["task_id"] = task_id
+        if status is not None:
+            query["status"] = status
+        if after is not None:
+            updated_at, last_id = after
+            query["$or"] = [{"updated_at": {"$lt": updated_at}}, {"updated_at": updated_at, "_id": {"$lt": last_id}}]
+        cursor = mongo.db["progress"].find(query).sort([("updated_at", -1), ("_id", -1)]).skip(skip).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def for_year(self, owner_id: str, year: int) -> list[dict[str, Any]]:
+        return await mongo.db["progress"].find({"owner_id": owner_id, "year": year}, PROGRESS_PROJECTION).to_list(length=None)
+
+    async def for_month(self, owner_id: str, year: int, month: int) -> list[dict[str, Any]]:
+        return await mongo.db["progress"].find(
+            {"owner_id": owner_id, "year": year, "month": month},
+            {"_id": 0, "task_id": 1, "status": 1, "cost": 1, "note": 1, "date": 1, "updated_at": 1},
+        ).to_list(length=5000)
+
+    @staticmethod
+    def _by_key_update(fields: dict[str, Any], now: datetime, seq: int) -> dict[str, Any]:
+        return {"$set": {**_progress_fields(fields), "updated_at": now, "seq": seq}, "$inc": {"version": 1}, "$setOnInsert": {"created_at": now}}
+
+    @owner_write
+    async def upsert_by_key(self, key: dict[str, Any], fields: dict[str, Any], now: datetime) -> dict[str, Any]:
+        db = mongo.db
+        update = self._by_key_update(fields, now, await next_owner_seq(db, key["owner_id"]))
+        # Ask for the previous version so the rollup delta needs no extra read; pin _id for inserts.
+        new_id = ObjectId()
+        update["$setOnInsert"]["_id"] = new_id
+        before = await db["progress"].find_one_and_update(key, update, upsert=True, return_document=ReturnDocument.BEFORE)
+        after = {**(before or {"_id": new_id, "created_at": now}), **key, **update["$set"], "version": (before or {}).get("version", 0) + 1}
+        await apply_progress_changes(db, [(before, after)])
+        return after
+
+    @owner_write
+    async def upsert_many(self, writes, now, insert_ids=None):
+        db = mongo.db
+        if not writes:
+            return []
+        seqs = await next_owner_seqs(db, (key["owner_id"] for key, _ in writes))
+        updates = [self._by_key_update(fields, now, seqs[key["owner_id"]]) for key, fields in writes]
+        for update, insert_id in zip(updates, insert_ids or []):
+            if insert_id is not None:
+                update["$setOnInsert"]["_id"] = ObjectId(insert_id)
+
+        # Previous versions feed the rollup deltas; one indexed read for the whole batch.
+        existing: dict[tuple, dict] = {}
+        async for doc in db["progress"].find({"$or": [key for key, _ in writes]}):
+            existing[(doc["owner_id"], doc["task_id"], doc["year"], doc["month"])] = doc
+
+        upserted_ids: dict[int, ObjectId] = {}
+        write_errors: dict[int, str] = {}
+        try:
+            result = await db["progress"].bulk_write([UpdateOne(key, update, upsert=True) for (key, _), update in zip(writes, updates)], ordered=False)
+            upserted_ids = result.upserted_ids or {}
+        except BulkWriteError as e:
+            details = e.details
+            upserted_ids = {u["index"]: u["_id"] for u in details.get("upserted", [])}
+            write_errors = {err["index"]: err.get("errmsg", "write failed") for err in details.get("writeErrors", [])}
+
+        results = []
+        changes = []
+        for index, ((key, _), update) in enumerate(zip(writes, updates)):
+            if index in write_errors:
+                results.append(WriteResult("error", error=write_errors[index]))
+                continue
+            before = existing.get((key["owner_id"], key["task_id"], key["year"], key["month"]))
+            if index in upserted_ids:
+                results.append(WriteResult("created", id=str(upserted_ids[index])))
+            else:
+                results.append(WriteResult("updated", id=str(before["_id"]) if before else None))
+            changes.append((before, {**key, **update["$set"]}))
+        await apply_progress_changes(db, changes)
+        return results
+
+    async def update(self, owner_id, progress_id, changes, now, *, expected_version=None):
+        return await self._modify(owner_id, progress_id, _progress_fields(changes), now, expected_version)
+
+    async def replace(self, owner_id, progress_id, fields, now, *, expected_version=None):
+        # Every user field is set, so an update keeps _id and created_at without reading them first.
+        try:
+            return await self._modify(owner_id, progress_id, {**_progress_fields(fields), "owner_id": owner_id}, now, expected_version)
+        except DuplicateKeyError as e:
+            raise Conflict(f"Progress already exists for that task and month: {e}")
+
+    @owner_write
+    async def _modify(self, owner_id: str, progress_id: str, set_fields: dict, now: datetime, expected_version: int | None) -> dict | None:
+        db = mongo.db
+        oid = _object_id(progress_id)
+        if oid is None:
+            return None
+        query = {"_id": oid, "owner_id": owner_id}
+        update = {**set_fields, "updated_at": now, "seq": await next_owner_seq(db, owner_id)}
+        before = await db["progress"].find_one_and_update(
+            _match(query, expected_version), {"$set": update, "$inc": {"version": 1}}, return_document=ReturnDocument.BEFORE
+        )
+        if not before:
+            await _precondition("progress", query, expected_version)
+            return None
+        after = {**before, **update, "version": before.get("version", 0) + 1}
+        await apply_progress_changes(db, [(before, after)])
+        return after
+
+    @owner_write
+    async def delete(self, owner_id, progress_id, *, expected_version=None):
+        db = mongo.db
+        oid = _object_id(progress_id)
+        if oid is None:
+            return False
+        query = {"_id": oid, "owner_id": owner_id}
+        seq = await next_owner_seq(db, owner_id)
+        doc = await db["progress"].find_one_and_delete(_match(query, expected_version))
+        if not doc:
+            await _precondition("progress", query, expected_version)
+            return False
+        key = {"id": progress_id, "task_id": doc["task_id"], "year": doc["year"], "month": doc["month"]}
+        await record_tombstone(db, owner_id, "progress", key, seq)
+        await apply_progress_changes(db, [(doc, None)])
+        return True
+
+
+class MongoSettingsRepository(SettingsRepository):
+    async def get(self, owner_id: str) -> dict[str, Any] | None:
+        return await mongo.db["settings"].find_one({"owner_id": owner_id})
+
+    @owner_write
+    async def upsert(self, owner_id, selected_year, now, *, expected_version=None):
+        db = mongo.db
+        seq = await next_owner_seq(db, owner_id, "settings")
+        doc = await db["settings"].find_one_and_update(
+            _match({"owner_id": owner_id}, expected_version),
+            {"$set": {"selected_year": selected_year, "updated_at": now, "seq": seq}, "$inc": {"version": 1}, "$setOnInsert": {"created_at": now}},
+            upsert=expected_version is None,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            raise PreconditionFailed(f"Settings do not match version {expected_version}")
+        return doc
+
+    @owner_write
+    async def delete(self, owner_id, *, expected_version=None):
+        db = mongo.db
+        query = {"owner_id": owner_id}
+        seq = await next_owner_seq(db, owner_id, "settings")
+        if not await db["settings"].find_one_and_delete(_match(query, expected_version), {"_id": 1}):
+            await _precondition("settings", query, expected_version)
+            return False
+        await record_tombstone(db, owner_id, "settings", {"owner_id": owner_id}, seq)
+        return True
+
+
+class MongoSummaryRepository(SummaryRepository):
+    async def month_totals(self, owner_id: str, year: int, months: Iterable[int]) -> dict[int, MonthRollup]:
+        return await read_rollups(mongo.db, owner_id, year, months)
+
+    async def cost_totals(self, owner_id, year):
+        match: dict[str, Any] = {"owner_id": owner_id, "status": TaskStatus.complete.value}
+        if year is not None:
+            match["year"] = year
+
+        def totals(key: Any) -> list[dict]:
+            # $sum skips records without a cost and adds Decimal128 exactly.
+            return [{"$group": {"_id": key, "total": {"$sum": "$cost"}, "count": {"$sum": 1}}}]
+
+        pipeline = [
+            {"$match": match},
+            # Covered by the (owner_id, status, year, month, task_id, cost) index.
+            {"$project": {"_id": 0, "year": 1, "month": 1, "task_id": 1, "cost": 1}},
+            {"$facet": {"year": totals("$year"), "month": totals({"year": "$year", "month": "$month"}), "task": totals("$task_id")}},
+        ]
+        (facets,) = await mongo.db["progress"].aggregate(pipeline).to_list(length=1)
+        return {
+            name: {
+                (g["_id"]["year"], g["_id"]["month"]) if name == "month" else g["_id"]: CostTotals(
+                    decimal_from_bson(g["total"]) or Decimal(0), g["count"]
+                )
+                for g in groups
+            }
+            for name, groups in facets.items()
+        }
+
+
+class MongoStorage(Storage):
+    def __init__(self) -> None:
+        self.tasks = MongoTaskRepository()
+        self.progress = MongoProgressRepository()
+        self.settings = MongoSettingsRepository()
+        self.summaries = MongoSummaryRepository()
+
+    async def connect(self) -> None:
+        mongo.connect()
+        await ensure_indexes(mongo.db)
+        # Warm the catalog so the first requests do not each load it.
+        await catalog.tasks(mongo.db)
+
+    async def close(self) -> None:
+        mongo.close()
+
+    async def ping(self) -> None:
+        await mongo.db.command("ping")
+
+    async def owner_version(self, owner_id: str) -> str:
+        # `landed` moves after each write lands, so the tag is never ahead of the data. The "." keeps
+        # these tags apart from the "<version>-<catalog>" ones issued before `landed` existed.
+        doc = await mongo.db["owner_versions"].find_one({"_id": owner_id}, {"landed": 1})
+        return f"{doc.get('landed', 0) if doc else 0}.{await catalog.version(mongo.db)}"
+
+    async def cache_stamp(self, owner_id: str, scope: str) -> str:
+        field = f"{scope}_version"
+        doc = await mongo.db["owner_versions"].find_one({"_id": owner_id}, {field: 1})
+        stamp = str(doc.get(field, 0) if doc else 0)
+        return f"{stamp}-{await catalog.version(mongo.db)}" if scope == "tasks" else stamp
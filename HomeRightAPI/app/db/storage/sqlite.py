@@ -0,0 +1,653 @@
+"""
+SQLite storage backend for single-node installs (STORAGE_BACKEND=sqlite).
+
+One database file in WAL mode: writes go through a single writer thread, reads through a small
+pool of reader threads with their own connections, so reads never wait on writes. There is no
+shared catalog, rollup collection or change sequence: built-in tasks are ordinary task rows,
+month totals come from indexed queries, and /sync and /export need the Mongo backend.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Iterable
+
+from bson import ObjectId
+
+from app.db.checklist import CHECKLIST, checklist_doc
+from app.db.rollups import MonthRollup
+from app.db.storage.base import (
+    Conflict,
+    CostTotals,
+    PreconditionFailed,
+    ProgressRepository,
+    SettingsRepository,
+    Storage,
+    SummaryRepository,
+    TaskRepository,
+    WriteResult,
+)
+from app.models.enums import Schedule, TaskStatus
+from app.utils.bson import decimal_from_bson
+from app.utils.schedule import due_mask, month_bit, months_from_mask
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    owner_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    detail TEXT NOT NULL DEFAULT '',
+    schedule TEXT NOT NULL,
+    month INTEGER,
+    due_mask INTEGER NOT NULL,
+    is_builtin INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner_id, task_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tasks_owner_order ON tasks (owner_id, is_builtin DESC, title, task_id);
+
+CREATE TABLE IF NOT EXISTS progress (
+    id TEXT PRIMARY KEY,
+    owner_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    cost TEXT,
+    note TEXT NOT NULL DEFAULT '',
+    date TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (owner_id, task_id, year, month)
+);
+CREATE INDEX IF NOT EXISTS progress_owner_updated ON progress (owner_id, updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS progress_owner_month ON progress (owner_id, year, month, status);
+CREATE INDEX IF NOT EXISTS progress_owner_costs ON progress (owner_id, status, year, month, task_id, cost);
+
+CREATE TABLE IF NOT EXISTS settings (
+    owner_id TEXT PRIMARY KEY,
+    selected_year INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS owner_versions (
+    owner_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    tasks_version INTEGER NOT NULL DEFAULT 0,
+    settings_version INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+TASK_COLUMNS = ("owner_id", "task_id", "title", "detail", "schedule", "month", "due_mask", "is_builtin", "created_at", "updated_at", "version")
+PROGRESS_FIELDS = ("task_id", "year", "month", "status", "cost", "note", "date")
+PROGRESS_COLUMNS = ("id", "owner_id", *PROGRESS_FIELDS, "created_at", "updated_at", "version")
+VERSIONED_TABLES = ("tasks", "progress", "settings")
+CACHE_SCOPES = ("tasks", "settings")
+
+
+def _ts(value: datetime | None) -> str | None:
+    """Naive UTC ISO timestamp truncated to milliseconds, as Mongo stores datetimes."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}"
+
+
+def _dt(value: str | None) -> datetime | None:
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def _cost(value: Any) -> str | None:
+    value = decimal_from_bson(value)
+    return None if value is None else str(value)
+
+
+def _task(row: sqlite3.Row) -> dict[str, Any]:
+    doc = dict(row)
+    doc["is_builtin"] = bool(doc["is_builtin"])
+    doc["created_at"], doc["updated_at"] = _dt(doc["created_at"]), _dt(doc["updated_at"])
+    return doc
+
+
+def _progress(row: sqlite3.Row) -> dict[str, Any]:
+    doc = dict(row)
+    if "id" in doc:
+        doc["_id"] = doc.pop("id")
+    if "cost" in doc:
+        doc["cost"] = None if doc["cost"] is None else Decimal(doc["cost"])
+    for field in ("date", "created_at", "updated_at"):
+        if field in doc:
+            doc[field] = _dt(doc[field])
+    return doc
+
+
+def _version_clause(expected_version: int | None) -> tuple[str, list[int]]:
+    return ("", []) if expected_version is None else (" AND version = ?", [expected_version])
+
+
+def _precondition(conn: sqlite3.Connection, sql: str, params: Iterable[Any], expected_version: int | None) -> None:
+    """After a versioned write matched nothing, tell a stale version apart from a missing row."""
+    if expected_version is not None and conn.execute(sql, tuple(params)).fetchone() is not None:
+        raise PreconditionFailed(f"Record does not match version {expected_version}")
+
+
+def _bump(conn: sqlite3.Connection, owner_id: str, scope: str | None = None) -> None:
+    """Next owner version; `scope` ("tasks" or "settings") also moves that scope's cache stamp."""
+    if scope is None:
+        conn.execute(
+            "INSERT INTO owner_versions (owner_id, version) VALUES (?, 1) ON CONFLICT (owner_id) DO UPDATE SET version = version + 1",
+            (owner_id,),
+        )
+        return
+    column = f"{scope}_version"
+    conn.execute(
+        f"INSERT INTO owner_versions (owner_id, version, {column}) VALUES (?, 1, 1) "
+        f"ON CONFLICT (owner_id) DO UPDATE SET version = version + 1, {column} = {column} + 1",
+        (owner_id,),
+    )
+
+
+class SQLiteDatabase:
+    """A WAL-mode database file shared by one writer thread and `read_threads` reader threads."""
+
+    def __init__(self, path: str, read_threads: int) -> None:
+        self.path = path
+        self.read_threads = read_threads
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writer: ThreadPoolExecutor | None = None
+        self._readers: ThreadPoolExecutor | None = None
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout = 5000")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _read(self, fn: Callable, args: tuple) -> Any:
+        return fn(self._connection(), *args)
+
+    def _write(self, fn: Callable, args: tuple) -> Any:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn, *args)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    async def open(self) -> None:
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._readers = ThreadPoolExecutor(max_workers=self.read_threads, thread_name_prefix="sqlite-reader")
+
+        def init(conn: sqlite3.Connection) -> None:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(SCHEMA)
+            # Files created before records were versioned.
+            for table in VERSIONED_TABLES:
+                if "version" not in {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(owner_versions)")}
+            for scope in CACHE_SCOPES:
+                if f"{scope}_version" not in columns:
+                    conn.execute(f"ALTER TABLE owner_versions ADD COLUMN {scope}_version INTEGER NOT NULL DEFAULT 0")
+
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._read, init, ())
+
+    async def read(self, fn: Callable, *args: Any) -> Any:
+        if self._readers is None:
+            raise RuntimeError("SQLite is not open")
+        return await asyncio.get_running_loop().run_in_executor(self._readers, self._read, fn, args)
+
+    async def write(self, fn: Callable, *args: Any) -> Any:
+        """Run `fn(conn, *args)` in one IMMEDIATE transaction on the writer thread."""
+        if self._writer is None:
+            raise RuntimeError("SQLite is not open")
+        return await asyncio.get_running_loop().run_in_executor(self._writer, self._write, fn, args)
+
+    def close(self) -> None:
+        for executor in (self._writer, self._readers):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self._writer = self._readers = None
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class SQLiteTaskRepository(TaskRepository):
+    def __init__(self, db: SQLiteDatabase) -> None:
+        self.db = db
+
+    async def create(self, doc: dict[str, Any]) -> dict[str, Any]:
+        doc = {**doc, "version": 1}
+
+        def insert(conn: sqlite3.Connection) -> None:
+            row = {**doc, "created_at": _ts(doc["created_at"]), "updated_at": _ts(doc["updated_at"])}
+            try:
+                conn.execute(
+                    f"INSERT INTO tasks ({', '.join(TASK_COLUMNS)}) VALUES ({', '.join('?' * len(TASK_COLUMNS))})",
+                    [row[c] for c in TASK_COLUMNS],
+                )
+            except sqlite3.IntegrityError as e:
+                raise Conflict(f"Task already exists or invalid: {e}")
+            _bump(conn, doc["owner_id"], "tasks")
+
+        await self.db.write(insert)
+        return doc
+
+    async def get(self, owner_id: str, task_id: str) -> dict[str, Any] | None:
+        def select(conn: sqlite3.Connection) -> dict | None:
+            row = conn.execute("SELECT * FROM tasks WHERE owner_id = ? AND task_id = ?", (owner_id, task_id)).fetchone()
+            return _task(row) if row else None
+
+        return await self.db.read(select)
+
+    async def list(self, owner_id, *, schedule, month, is_builtin, after, skip, limit):
+        sql = "SELECT * FROM tasks WHERE owner_id = ?"
+        params: list[Any] = [owner_id]
+        for column, value in (("schedule", schedule), ("month", month), ("is_builtin", is_builtin)):
+            if value is not None:
+                sql += f" AND {column} = ?"
+                params.append(value)
+        if after is not None:
+            last_builtin, last_title, last_task_id = after
+            sql += " AND (is_builtin < ? OR (is_builtin = ? AND title > ?) OR (is_builtin = ? AND title = ? AND task_id > ?))"
+            params += [last_builtin, last_builtin, last_title, last_builtin, last_title, last_task_id]
+        sql += " ORDER BY is_builtin DESC, title, task_id LIMIT ? OFFSET ?"
+        params += [limit, skip]
+        return await self.db.read(lambda conn: [_task(r) for r in conn.execute(sql, params)])
+
+    async def for_owner(self, owner_id: str) -> list[dict[str, Any]]:
+        sql = f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks WHERE owner_id = ? ORDER BY is_builtin DESC, title, task_id"
+        return await self.db.read(lambda conn: [_task(r) for r in conn.execute(sql, (owner_id,))])
+
+    async def due_in_month(self, owner_id: str, month: int) -> list[dict[str, Any]]:
+        sql = "SELECT * FROM tasks WHERE owner_id = ? AND due_mask & ? != 0"
+        return await self.db.read(lambda conn: [_task(r) for r in conn.execute(sql, (owner_id, month_bit(month)))])
+
+    async def replace(self, owner_id, task_id, fields, now, *, expected_version=None):
+        row = {**fields, "owner_id": owner_id, "task_id": task_id, "created_at": _ts(now), "updated_at": _ts(now), "version": 1}
+        updated = [c for c in TASK_COLUMNS if c not in ("owner_id", "task_id", "created_at", "version")]
+
+        def upsert(conn: sqlite3.Connection) -> dict:
+            if expected_version is None:
+                result = conn.execute(
+                    f"INSERT INTO tasks ({', '.join(TASK_COLUMNS)}) VALUES ({', '.join('?' * len(TASK_COLUMNS))}) "
+                    f"ON CONFLICT (owner_id, task_id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in updated)}, "
+                    "version = version + 1 RETURNING *",
+                    [row[c] for c in TASK_COLUMNS],
+                ).fetchone()
+            else:
+                result = conn.execute(
+                    f"UPDATE tasks SET {', '.join(f'{c} = ?' for c in updated)}, version = version + 1 "
+                    "WHERE owner_id = ? AND task_id = ? AND version = ? RETURNING *",
+                    [*(row[c] for c in updated), owner_id, task_id, expected_version],
+                ).fetchone()
+                if result is None:
+                    raise PreconditionFailed(f"Task does not match version {expected_version}")
+            _bump(conn, owner_id, "tasks")
+            return _task(result)
+
+        return await self.db.write(upsert)
+
+    async def update(self, owner_id, task_id, changes, now, *, expected_version=None):
+        version_sql, version_params = _version_clause(expected_version)
+
+        def apply(conn: sqlite3.Connection) -> dict | None:
+            update = {**changes, "updated_at": _ts(now)}
+            assignments = [f"{c} = ?" for c in update]
+            params = list(update.values())
+            if "schedule" in changes:
+                assignments.append("due_mask = ?")
+                params.append(due_mask(changes["schedule"], changes.get("month")))
+            elif "month" in changes:
+                # A month-only change moves a custom task and leaves other schedules' masks alone.
+                assignments.append("due_mask = CASE WHEN schedule = ? THEN ? ELSE due_mask END")
+                params += [Schedule.custom.value, month_bit(changes["month"])]
+            result = conn.execute(
+                f"UPDATE tasks SET {', '.join(assignments)}, version = version + 1 WHERE owner_id = ? AND task_id = ?{version_sql} RETURNING *",
+                [*params, owner_id, task_id, *version_params],
+            ).fetchone()
+            if result is None:
+                _precondition(conn, "SELECT 1 FROM tasks WHERE owner_id = ? AND task_id = ?", (owner_id, task_id), expected_version)
+                return None
+            _bump(conn, owner_id, "tasks")
+            return _task(result)
+
+        return await self.db.write(apply)
+
+    async def delete(self, owner_id, task_id, *, expected_version=None):
+        version_sql, version_params = _version_clause(expected_version)
+
+        def remove(conn: sqlite3.Connection) -> bool:
+            if conn.execute(f"DELETE FROM tasks WHERE owner_id = ? AND task_id = ?{version_sql}", (owner_id, task_id, *version_params)).rowcount == 0:
+                _precondition(conn, "SELECT 1 FROM tasks WHERE owner_id = ? AND task_id = ?", (owner_id, task_id), expected_version)
+                return False
+            _bump(conn, owner_id, "tasks")
+            return True
+
+        return await self.db.write(remove)
+
+    async def seed_builtins(self, owner_id, now):
+        # Built-ins are the owner's own rows here, so later checklist revisions do not touch existing ones.
+        rows = [{**checklist_doc(e, now), "owner_id": owner_id, "version": 1, "created_at": _ts(now), "updated_at": _ts(now)} for e in CHECKLIST]
+        ids = [e["task_id"] for e in CHECKLIST]
+
+        def seed(conn: sqlite3.Connection) -> tuple[int, int]:
+            before = conn.total_changes
+            conn.executemany(
+                f"INSERT INTO tasks ({', '.join(TASK_COLUMNS)}) VALUES ({', '.join('?' * len(TASK_COLUMNS))}) "
+                "ON CONFLICT (owner_id, task_id) DO NOTHING",
+                [[row[c] for c in TASK_COLUMNS] for row in rows],
+            )
+            created = conn.total_changes - before
+            if created:
+                _bump(conn, owner_id, "tasks")
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM tasks WHERE owner_id = ? AND task_id IN ({', '.join('?' * len(ids))})", (owner_id, *ids)
+            ).fetchone()[0]
+            return created, total
+
+        return await self.db.write(seed)
+
+
+class SQLiteProgressRepository(ProgressRepository):
+    def __init__(self, db: SQLiteDatabase) -> None:
+        self.db = db
+
+    @staticmethod
+    def _row(fields: dict[str, Any]) -> dict[str, Any]:
+        return {
+            **fields,
+            "cost": _cost(fields.get("cost")),
+            "note": fields.get("note", ""),
+            "date": _ts(fields.get("date")),
+        }
+
+    async def create(self, doc: dict[str, Any]) -> dict[str, Any]:
+        doc = {**doc, "_id": str(ObjectId()), "version": 1}
+        row = {**self._row(doc), "id": doc["_id"], "created_at": _ts(doc["created_at"]), "updated_at": _ts(doc["updated_at"])}
+
+        def insert(conn: sqlite3.Connection) -> None:
+            try:
+                conn.execute(
+                    f"INSERT INTO progress ({', '.join(PROGRESS_COLUMNS)}) VALUES ({', '.join('?' * len(PROGRESS_COLUMNS))})",
+                    [row[c] for c in PROGRESS_COLUMNS],
+                )
+            except sqlite3.IntegrityError as e:
+                raise Conflict(f"Progress already exists or invalid: {e}")
+            _bump(conn, doc["owner_id"])
+
+        await self.db.write(insert)
+        return doc
+
+    async def get(self, owner_id: str, progress_id: str) -> dict[str, Any] | None:
+        def select(conn: sqlite3.Connection) -> dict | None:
+            row = conn.execute("SELECT * FROM progress WHERE id = ? AND owner_id = ?", (progress_id, owner_id)).fetchone()
+            return _progress(row) if row else None
+
+        return await self.db.read(select)
+
+    async def get_by_key(self, key: dict[str, Any]) -> dict[str, Any] | None:
+        def select(conn: sqlite3.Connection) -> dict | None:
+            row = conn.execute(
+                "SELECT * FROM progress WHERE owner_id = ? AND task_id = ? AND year = ? AND month = ?",
+                (key["owner_id"], key["task_id"], key["year"], key["month"]),
+            ).fetchone()
+            return _progress(row) if row else None
+
+        return await self.db.read(select)
+
+    async def list(self, owner_id, *, year, month, task_id, status, after, skip, limit):
+        sql = "SELECT * FROM progress WHERE owner_id = ?"
+        params: list[Any] = [owner_id]
+        for column, value in (("year", year), ("month", month), ("task_id", task_id), ("status", status)):
+            if value is not None:
+                sql += f" AND {column} = ?"
+                params.append(value)
+        if after is not None:
+            updated_at, last_id = _ts(after[0]), str(after[1])
+            sql += " AND (updated_at < ? OR (updated_at = ? AND id < ?))"
+            params += [updated_at, updated_at, last_id]
+        sql += " ORDER BY updated_at DESC, id DESC LIMIT ? OFFSET ?"
+        params += [limit, skip]
+        return await self.db.read(lambda conn: [_progress(r) for r in conn.execute(sql, params)])
+
+    async def for_year(self, owner_id: str, year: int) -> list[dict[str, Any]]:
+        sql = f"SELECT {', '.join(PROGRESS_COLUMNS)} FROM progress WHERE owner_id = ? AND year = ?"
+        return await self.db.read(lambda conn: [_progress(r) for r in conn.execute(sql, (owner_id, year))])
+
+    async def for_month(self, owner_id: str, year: int, month: int) -> list[dict[str, Any]]:
+        sql = "SELECT task_id, status, cost, note, date, updated_at FROM progress WHERE owner_id = ? AND year = ? AND month = ?"
+        return await self.db.read(lambda conn: [_progress(r) for r in conn.execute(sql, (owner_id, year, month))])
+
+    def _upsert(self, conn: sqlite3.Connection, key: dict[str, Any], fields: dict[str, Any], now: datetime, new_id: str | None = None) -> tuple[dict, bool]:
+        new_id = new_id or str(ObjectId())
+        row = {**self._row({**fields, **key}), "id": new_id, "created_at": _ts(now), "updated_at": _ts(now), "version": 1}
+        result = conn.execute(
+            f"INSERT INTO progress ({', '.join(PROGRESS_COLUMNS)}) VALUES ({', '.join('?' * len(PROGRESS_COLUMNS))}) "
+            "ON CONFLICT (owner_id, task_id, year, month) DO UPDATE SET "
+            "status = excluded.status, cost = excluded.cost, note = excluded.note, date = excluded.date, updated_at = excluded.updated_at, "
+            "version = version + 1 RETURNING *",
+            [row[c] for c in PROGRESS_COLUMNS],
+        ).fetchone()
+        return _progress(result), result["id"] == new_id
+
+    async def upsert_by_key(self, key: dict[str, Any], fields: dict[str, Any], now: datetime) -> dict[str, Any]:
+        def upsert(conn: sqlite3.Connection) -> dict:
+            doc, _ = self._upsert(conn, key, fields, now)
+            _bump(conn, key["owner_id"])
+            return doc
+
+        return await self.db.write(upsert)
+
+    async def upsert_many(self, writes, now, insert_ids=None):
+        ids = insert_ids or [None] * len(writes)
+
+        def upsert(conn: sqlite3.Connection) -> list[WriteResult]:
+            results = []
+            owners = set()
+            for (key, fields), insert_id in zip(writes, ids):
+                try:
+                    doc, created = self._upsert(conn, key, fields, now, insert_id)
+                except sqlite3.Error as e:
+                    results.append(WriteResult("error", error=str(e)))
+                    continue
+                owners.add(key["owner_id"])
+                results.append(WriteResult("created" if created else "updated", id=doc["_id"]))
+            for owner_id in owners:
+                _bump(conn, owner_id)
+            return results
+
+        return await self.db.write(upsert) if writes else []
+
+    async def update(self, owner_id, progress_id, changes, now, *, expected_version=None):
+        update = {**changes, "updated_at": _ts(now)}
+        if "cost" in update:
+            update["cost"] = _cost(update["cost"])
+        if "date" in update:
+            update["date"] = _ts(update["date"])
+        return await self._modify(owner_id, progress_id, update, expected_version)
+
+    async def replace(self, owner_id, progress_id, fields, now, *, expected_version=None):
+        row = {**self._row(fields), "updated_at": _ts(now)}
+        try:
+            return await self._modify(owner_id, progress_id, {c: row[c] for c in (*PROGRESS_FIELDS, "updated_at")}, expected_version)
+        except sqlite3.IntegrityError as e:
+            raise Conflict(f"Progress already exists for that task and month: {e}")
+
+    async def _modify(self, owner_id: str, progress_id: str, update: dict[str, Any], expected_version: int | None) -> dict | None:
+        version_sql, version_params = _version_clause(expected_version)
+
+        def apply(conn: sqlite3.Connection) -> dict | None:
+            row = conn.execute(
+                f"UPDATE progress SET {', '.join(f'{c} = ?' for c in update)}, version = version + 1 "
+                f"WHERE id = ? AND owner_id = ?{version_sql} RETURNING *",
+                [*update.values(), progress_id, owner_id, *version_params],
+            ).fetchone()
+            if row is None:
+                _precondition(conn, "SELECT 1 FROM progress WHERE id = ? AND owner_id = ?", (progress_id, owner_id), expected_version)
+                return None
+            _bump(conn, owner_id)
+            return _progress(row)
+
+        return await self.db.write(apply)
+
+    async def delete(self, owner_id, progress_id, *, expected_version=None):
+        version_sql, version_params = _version_clause(expected_version)
+
+        def remove(conn: sqlite3.Connection) -> bool:
+            if conn.execute(f"DELETE FROM progress WHERE id = ? AND owner_id = ?{version_sql}", (progress_id, owner_id, *version_params)).rowcount == 0:
+                _precondition(conn, "SELECT 1 FROM progress WHERE id = ? AND owner_id = ?", (progress_id, owner_id), expected_version)
+                return False
+            _bump(conn, owner_id)
+            return True
+
+        return await self.db.write(remove)
+
+
+class SQLiteSettingsRepository(SettingsRepository):
+    def __init__(self, db: SQLiteDatabase) -> None:
+        self.db = db
+
+    @staticmethod
+    def _settings(row: sqlite3.Row) -> dict[str, Any]:
+        return {**dict(row), "created_at": _dt(row["created_at"]), "updated_at": _dt(row["updated_at"])}
+
+    async def get(self, owner_id: str) -> dict[str, Any] | None:
+        row = await self.db.read(lambda conn: conn.execute("SELECT * FROM settings WHERE owner_id = ?", (owner_id,)).fetchone())
+        return self._settings(row) if row else None
+
+    async def upsert(self, owner_id, selected_year, now, *, expected_version=None):
+        def upsert(conn: sqlite3.Connection) -> sqlite3.Row:
+            if expected_version is None:
+                row = conn.execute(
+                    "INSERT INTO settings (owner_id, selected_year, created_at, updated_at, version) VALUES (?, ?, ?, ?, 1) "
+                    "ON CONFLICT (owner_id) DO UPDATE SET selected_year = excluded.selected_year, updated_at = excluded.updated_at, "
+                    "version = version + 1 RETURNING *",
+                    (owner_id, selected_year, _ts(now), _ts(now)),
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "UPDATE settings SET selected_year = ?, updated_at = ?, version = version + 1 WHERE owner_id = ? AND version = ? RETURNING *",
+                    (selected_year, _ts(now), owner_id, expected_version),
+                ).fetchone()
+                if row is None:
+                    raise PreconditionFailed(f"Settings do not match version {expected_version}")
+            _bump(conn, owner_id, "settings")
+            return row
+
+        return self._settings(await self.db.write(upsert))
+
+    async def delete(self, owner_id, *, expected_version=None):
+        version_sql, version_params = _version_clause(expected_version)
+
+        def remove(conn: sqlite3.Connection) -> bool:
+            if conn.execute(f"DELETE FROM settings WHERE owner_id = ?{version_sql}", (owner_id, *version_params)).rowcount == 0:
+                _precondition(conn, "SELECT 1 FROM settings WHERE owner_id = ?", (owner_id,), expected_version)
+                return False
+            _bump(conn, owner_id, "settings")
+            return True
+
+        return await self.db.write(remove)
+
+
+class SQLiteSummaryRepository(SummaryRepository):
+    def __init__(self, db: SQLiteDatabase) -> None:
+        self.db = db
+
+    async def month_totals(self, owner_id: str, year: int, months: Iterable[int]) -> dict[int, MonthRollup]:
+        months = list(months)
+
+        def totals(conn: sqlite3.Connection) -> dict[int, MonthRollup]:
+            out = {m: MonthRollup() for m in months}
+            for row in conn.execute("SELECT due_mask, COUNT(*) AS n FROM tasks WHERE owner_id = ? GROUP BY due_mask", (owner_id,)):
+                for m in months_from_mask(row["due_mask"]):
+                    if m in out:
+                        out[m].due_tasks += row["n"]
+            # Completed records only count in months their task is due, as in the full month summary.
+            rows = conn.execute(
+                "SELECT p.month, p.cost FROM progress p JOIN tasks t ON t.owner_id = p.owner_id AND t.task_id = p.task_id"
+                f" WHERE p.owner_id = ? AND p.year = ? AND p.month IN ({', '.join('?' * len(months))}) AND p.status = ?"
+                " AND (t.due_mask >> (p.month - 1)) & 1",
+                (owner_id, year, *months, TaskStatus.complete.value),
+            )
+            for row in rows:
+                item = out[row["month"]]
+                item.completed_tasks += 1
+                if row["cost"] is not None:
+                    item.completed_cost_total += Decimal(row["cost"])
+            return out
+
+        return await self.db.read(totals)
+
+    async def cost_totals(self, owner_id, year):
+        sql = "SELECT year, month, task_id, cost FROM progress WHERE owner_id = ? AND status = ?"
+        params: list[Any] = [owner_id, TaskStatus.complete.value]
+        if year is not None:
+            sql += " AND year = ?"
+            params.append(year)
+
+        def totals(conn: sqlite3.Connection) -> dict[str, dict[Any, CostTotals]]:
+            # Costs are decimal strings; summing them in Python keeps the totals exact.
+            out: dict[str, dict[Any, CostTotals]] = {"year": {}, "month": {}, "task": {}}
+            for row in conn.execute(sql, params):
+                cost = Decimal(row["cost"]) if row["cost"] is not None else Decimal(0)
+                for name, key in (("year", row["year"]), ("month", (row["year"], row["month"])), ("task", row["task_id"])):
+                    total, count = out[name].get(key, (Decimal(0), 0))
+                    out[name][key] = CostTotals(total + cost, count + 1)
+            return out
+
+        return await self.db.read(totals)
+
+
+class SQLiteStorage(Storage):
+    def __init__(self, path: str, read_threads: int = 4) -> None:
+        self.db = SQLiteDatabase(path, read_threads)
+        self.tasks = SQLiteTaskRepository(self.db)
+        self.progress = SQLiteProgressRepository(self.db)
+        self.settings = SQLiteSettingsRepository(self.db)
+        self.summaries = SQLiteSummaryRepository(self.db)
+
+    async def connect(self) -> None:
+        await self.db.open()
+
+    async def close(self) -> None:
+        self.db.close()
+
+    async def ping(self) -> None:
+        await self.db.read(lambda conn: conn.execute("SELECT 1").fetchone())
+
+    async def owner_version(self, owner_id: str) -> str:
+        row = await self.db.read(lambda conn: conn.execute("SELECT version FROM owner_versions WHERE owner_id = ?", (owner_id,)).fetchone())
+        return str(row["version"] if row else 0)
+
+    async def cache_stamp(self, owner_id: str, scope: str) -> str | None:
+        # The stamp moves in the same transaction as the write, so it is never ahead of the data.
+        sql = f"SELECT {scope}_version AS version FROM owner_versions WHERE owner_id = ?"
+        row = await self.db.read(lambda conn: conn.execute(sql, (owner_id,)).fetchone())
+        return str(row["version"] if row else 0)
@@ -0,0 +1,95 @@
+"""
+Per-owner change sequence.
+
+`owner_versions` holds `{_id: owner_id, version, pending, landed, changed_at}`. Every task, overlay,
+progress and settings write first allocates the next `version` and stores it on the written document
+as `seq`; deletes record a `tombstones` document with the allocated seq instead. /sync returns
+everything with `seq` above a client's token.
+
+Allocation also counts the write as `pending`. When the repository method returns (or raises), the
+`owner_write` wrapper marks it landed: `pending` goes down, and `landed` goes up, as does
+`tasks_version` / `settings_version` for task and settings writes. Conditional reads build their ETag
+from `landed` and the per-owner read cache (`app.db.storage.cached`) is stamped with the scope
+counters, so neither can be ahead of the data, and progress writes do not invalidate the cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from app.utils.bson import utcnow
+
+
+T = TypeVar("T")
+
+# (db, owner_id, scope) for each seq allocated by the running owner_write method.
+_allocated: ContextVar[list[tuple[AsyncIOMotorDatabase, str, str | None]] | None] = ContextVar("owner_seqs_allocated", default=None)
+
+
+def owner_write(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Mark the seqs a repository write allocates as landed once it returns or raises."""
+
+    @functools.wraps(method)
+    async def write(*args: Any, **kwargs: Any) -> T:
+        if _allocated.get() is not None:
+            return await method(*args, **kwargs)
+        allocated: list[tuple[AsyncIOMotorDatabase, str, str | None]] = []
+        token = _allocated.set(allocated)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _allocated.reset(token)
+            await _land(allocated)
+
+    return write
+
+
+async def _land(allocated: list[tuple[AsyncIOMotorDatabase, str, str | None]]) -> None:
+    if not allocated:
+        return
+    db = allocated[0][0]
+    incs: dict[str, dict[str, int]] = {}
+    for _, owner_id, scope in allocated:
+        inc = incs.setdefault(owner_id, {"pending": 0, "landed": 1})
+        inc["pending"] -= 1
+        if scope is not None:
+            inc[f"{scope}_version"] = 1
+    await asyncio.gather(*(db["owner_versions"].update_one({"_id": owner_id}, {"$inc": inc}) for owner_id, inc in incs.items()))
+
+
+async def next_owner_seq(db: AsyncIOMotorDatabase, owner_id: str, scope: str | None = None) -> int:
+    """Allocate the owner's next seq for a write; only call it from an `owner_write` method."""
+    allocated = _allocated.get()
+    if allocated is None:
+        raise RuntimeError("next_owner_seq called outside an owner_write method")
+    doc = await db["owner_versions"].find_one_and_update(
+        {"_id": owner_id},
+        {"$inc": {"version": 1, "pending": 1}, "$set": {"changed_at": utcnow()}},
+        projection={"version": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    allocated.append((db, owner_id, scope))
+    return doc["version"]
+
+
+async def bump_owner_landed(db: AsyncIOMotorDatabase, owner_id: str) -> None:
+    """Change the owner's ETag after a write that /sync does not track (rollup repairs)."""
+    await db["owner_versions"].update_one({"_id": owner_id}, {"$inc": {"landed": 1}}, upsert=True)
+
+
+async def next_owner_seqs(db: AsyncIOMotorDatabase, owner_ids: Iterable[str]) -> dict[str, int]:
+    owners = sorted(set(owner_ids))
+    seqs = await asyncio.gather(*(next_owner_seq(db, owner_id) for owner_id in owners))
+    return dict(zip(owners, seqs))
+
+
+async def record_tombstone(db: AsyncIOMotorDatabase, owner_id: str, kind: str, key: dict[str, Any], seq: int) -> None:
+    """Remember a hard delete for /sync until the tombstone TTL expires it."""
+    await db["tombstones"].insert_one({"owner_id": owner_id, "kind": kind, "key": key, "seq": seq, "deleted_at": utcnow()})
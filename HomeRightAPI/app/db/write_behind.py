@@ -0,0 +1,177 @@
+"""
+Write-behind buffer for PUT /progress/by-key (PROGRESS_WRITE_BEHIND=true).
+
+Upserts are held in memory for up to `window` seconds, keyed by (owner_id, task_id, year, month),
+so a client tapping through statuses for one task costs one database write instead of several.
+Everything pending is written with one `upsert_many` call. The by-key response is built from the
+stored record plus the buffered fields, and every other progress read flushes the owner's pending
+writes first, so clients always read their own writes.
+
+When the buffer is full, the next new key flushes it first; if that flush fails (the database is
+down), put() raises BufferFull instead of accepting more writes, and the route answers 503.
+
+The buffer lives in one worker process: pending writes are lost if the process dies before the
+window elapses, and on_shutdown flushes them. Leave it off unless losing up to `window` seconds
+of by-key writes on a crash is acceptable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.metrics import (
+    PROGRESS_BUFFER_BACKPRESSURE,
+    PROGRESS_BUFFER_COALESCED,
+    PROGRESS_BUFFER_FLUSH,
+    PROGRESS_BUFFER_PENDING,
+)
+from app.db.storage import Storage, storage
+from app.utils.bson import utcnow
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    key: dict[str, Any]
+    fields: dict[str, Any]
+    base: dict[str, Any] | None
+    insert_id: str | None
+
+    def doc(self, now: datetime) -> dict[str, Any]:
+        """The record as it will read once this entry is written."""
+        base = self.base or {"_id": self.insert_id, "created_at": now}
+        version = (self.base or {}).get("version", 0) + 1
+        return {**base, **self.key, **self.fields, "updated_at": now, "version": version}
+
+
+class BufferFull(Exception):
+    """The buffer is full and flushing it failed, so the write was not accepted."""
+
+
+def _key_tuple(key: dict[str, Any]) -> tuple:
+    return key["owner_id"], key["task_id"], key["year"], key["month"]
+
+
+class ProgressWriteBuffer:
+    def __init__(self, store: Storage, window: float, max_pending: int) -> None:
+        self.store = store
+        self.window = window
+        self.max_pending = max_pending
+        self._pending: dict[tuple, _Entry] = {}
+        self._inflight: dict[tuple, _Entry] = {}
+        self._owners: dict[str, int] = {}
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+        # Bumped after every flush; lets put() notice a flush that raced its base-record read.
+        self._epoch = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.progress_write_behind
+
+    def _add(self, key: tuple, entry: _Entry) -> None:
+        self._pending[key] = entry
+        self._owners[key[0]] = self._owners.get(key[0], 0) + 1
+        PROGRESS_BUFFER_PENDING.set(len(self._pending))
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def put(self, key: dict[str, Any], fields: dict[str, Any], now: datetime) -> dict[str, Any]:
+        """Buffer an upsert_by_key and return the record as it will read once flushed; raises BufferFull."""
+        k = _key_tuple(key)
+        while True:
+            entry = self._pending.get(k)
+            if entry is not None:
+                entry.fields = fields
+                PROGRESS_BUFFER_COALESCED.inc()
+                return entry.doc(now)
+
+            # Backpressure: a writer that finds the buffer full pays for the flush.
+            if len(self._pending) + len(self._inflight) >= self.max_pending:
+                PROGRESS_BUFFER_BACKPRESSURE.inc()
+                # A failed flush keeps its records buffered, so retrying here would never end.
+                if not await self.flush():
+                    raise BufferFull(f"{len(self._pending)} progress writes are waiting on a failed flush")
+                continue
+
+            inflight = self._inflight.get(k)
+            if inflight is not None:
+                entry = _Entry(key, fields, inflight.doc(now), inflight.insert_id)
+            else:
+                epoch = self._epoch
+                base = await self.store.progress.get_by_key(key)
+                if k in self._pending or k in self._inflight or epoch != self._epoch:
+                    continue
+                entry = _Entry(key, fields, base, None if base else str(ObjectId()))
+            self._add(k, entry)
+            return entry.doc(now)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self, owner_id: str | None = None) -> bool:
+        """Write pending upserts (only `owner_id`'s when given) in one batch; False if the write failed."""
+        async with self._lock:
+            if owner_id is None:
+                batch, self._pending = self._pending, {}
+                self._owners.clear()
+            else:
+                batch = {k: e for k, e in self._pending.items() if k[0] == owner_id}
+                for k in batch:
+                    del self._pending[k]
+                self._owners.pop(owner_id, None)
+            PROGRESS_BUFFER_PENDING.set(len(self._pending))
+            if not batch:
+                return True
+
+            self._inflight = batch
+            entries = list(batch.values())
+            start = time.perf_counter()
+            try:
+                results = await self.store.progress.upsert_many(
+                    [(e.key, e.fields) for e in entries],
+                    utcnow(),
+                    insert_ids=[e.insert_id for e in entries],
+                )
+            except Exception:
+                logger.exception("progress write-behind flush of %d records failed; keeping them buffered", len(entries))
+                # Newer writes for the same key, buffered during the flush, win.
+                for k, e in batch.items():
+                    if k not in self._pending:
+                        self._add(k, e)
+                return False
+            finally:
+                self._inflight = {}
+                self._epoch += 1
+                PROGRESS_BUFFER_FLUSH.observe(time.perf_counter() - start)
+
+            for entry, result in zip(entries, results):
+                if result.status == "error":
+                    logger.error("progress write-behind dropped %s: %s", entry.key, result.error)
+            return True
+
+    async def flush_owner(self, owner_id: str) -> None:
+        """Make `owner_id`'s buffered writes visible before a read."""
+        if self._owners.get(owner_id) or any(k[0] == owner_id for k in self._inflight):
+            await self.flush(owner_id)
+
+    async def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+
+
+progress_buffer = ProgressWriteBuffer(storage, settings.progress_write_behind_window_seconds, settings.progress_write_behind_max_pending)
@@ -1,25 +1,34 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from app.api.negotiation import ContentNegotiationMiddleware
+from app.api.readiness import readiness
 from app.api.router import api_router
 from app.core.config import settings
-from app.db.indexes import ensure_indexes
-from app.db.mongo import mongo
+from app.db.reminders import reminder_scheduler
+from app.db.storage import storage
+from app.db.write_behind import progress_buffer
+from app.utils.responses import FastJSONResponse
 
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, default_response_class=FastJSONResponse)
+app.add_middleware(ContentNegotiationMiddleware)
 
 
 @app.on_event("startup")
 async def on_startup() -> None:
-    mongo.connect()
-    await ensure_indexes(mongo.db)
+    await storage.connect()
+    if settings.reminder_scheduler_enabled and settings.storage_backend == "mongo":
+        reminder_scheduler.start()
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
-    mongo.close()
+    await reminder_scheduler.stop()
+    await progress_buffer.close()
+    await storage.close()
 
 
 @app.get("/health")
@@ -27,5 +36,17 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/ready")
+async def ready() -> FastJSONResponse:
+    """200 once the database answers a ping (cached for READY_CACHE_SECONDS), 503 otherwise."""
+    result = await readiness.check()
+    return FastJSONResponse(result, status_code=200 if result["status"] == "ready" else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 app.include_router(api_router)
 
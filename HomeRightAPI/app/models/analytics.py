@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.models.enums import Schedule
+
+
+class YearCosts(BaseModel):
+    year: int
+    total: Decimal
+    count: int
+
+
+class MonthCosts(BaseModel):
+    year: int
+    month: int
+    total: Decimal
+    count: int
+
+
+class TaskCosts(BaseModel):
+    task_id: str
+    # None for tasks that have since been deleted.
+    title: Optional[str] = None
+    schedule: Optional[Schedule] = None
+    total: Decimal
+    count: int
+
+
+class ScheduleCosts(BaseModel):
+    schedule: Optional[Schedule] = None
+    total: Decimal
+    count: int
+
+
+class CostAnalyticsOut(BaseModel):
+    owner_id: str
+    year: Optional[int] = None
+    total: Decimal
+    completed_count: int
+    by_year: list[YearCosts]
+    by_month: list[MonthCosts]
+    by_task: list[TaskCosts]
+    by_schedule: list[ScheduleCosts]
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.models.progress import ProgressOut
+from app.models.settings import SettingsOut
+from app.models.task import TaskOut
+
+
+class BootstrapOut(BaseModel):
+    owner_id: str
+    year: int
+    month: int
+    settings: SettingsOut
+    tasks: list[TaskOut]
+    progress: list[ProgressOut]
+    # Same shape as GET /summary/month/{owner_id}/{year}/{month}.
+    summary: dict[str, Any]
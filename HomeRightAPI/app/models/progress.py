@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -45,4 +45,23 @@ class ProgressOut(BaseModel):
     date: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
+    version: int = 0
 
+
+class ProgressBatch(BaseModel):
+    # Items are validated one by one in the route so a bad row only fails itself.
+    items: list[dict[str, Any]]
+
+
+class ProgressBatchItemResult(BaseModel):
+    index: int
+    status: Literal["created", "updated", "superseded", "error"]
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ProgressBatchOut(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: list[ProgressBatchItemResult]
@@ -14,4 +14,5 @@ class SettingsOut(BaseModel):
     selected_year: int
     created_at: datetime
     updated_at: datetime
+    version: int = 0
 
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+YEAR_SUMMARY_NOTES = (
+    "This endpoint mirrors the iOS app's year totals; month-level 'yearProgress' is computed in-app and can also be derived from /summary/month."
+)
+
+
+class MonthTotals(BaseModel):
+    month: int
+    due_tasks: int
+    completed_tasks: int
+    completed_cost_total: float
+
+
+class YearSummaryOut(BaseModel):
+    owner_id: str
+    year: int
+    months: int
+    completed_count: int
+    completed_cost_total: float
+    by_month: list[MonthTotals]
+    notes: str = YEAR_SUMMARY_NOTES
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel
+
+from app.models.progress import ProgressOut
+from app.models.settings import SettingsOut
+from app.models.task import TaskOut
+
+
+class Tombstone(BaseModel):
+    kind: Literal["task", "progress", "settings"]
+    key: dict[str, Any]
+    seq: int
+
+
+class SyncOut(BaseModel):
+    owner_id: str
+    token: str
+    full: bool
+    tasks: list[TaskOut]
+    progress: list[ProgressOut]
+    settings: Optional[SettingsOut] = None
+    tombstones: list[Tombstone]
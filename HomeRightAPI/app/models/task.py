@@ -51,6 +51,13 @@ class TaskUpdate(BaseModel):
         return self
 
 
+class TaskSeedOut(BaseModel):
+    owner_id: str
+    checklist_version: int
+    created: int
+    builtin_tasks: int
+
+
 class TaskOut(BaseModel):
     owner_id: str
     task_id: str
@@ -61,4 +68,5 @@ class TaskOut(BaseModel):
     is_builtin: bool
     created_at: datetime
     updated_at: datetime
+    version: int = 0
 
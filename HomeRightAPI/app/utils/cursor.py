@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import base64
+from typing import Any
+
+from bson import json_util
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Opaque pagination cursor for the sort-key values of the last item on a page."""
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, schema: tuple[type | tuple[type, ...], ...]) -> list[Any]:
+    """Values of a cursor from `encode_cursor`; ValueError unless there is one value of each type in `schema`."""
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(schema):
+        raise ValueError("Invalid cursor")
+    for value, expected in zip(values, schema):
+        allowed = expected if isinstance(expected, tuple) else (expected,)
+        # bool is an int subclass; only accept it where the schema names it.
+        if not isinstance(value, allowed) or (isinstance(value, bool) and bool not in allowed):
+            raise ValueError("Invalid cursor")
+    return values
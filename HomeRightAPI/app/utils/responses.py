@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+import msgpack
+import orjson
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from fastapi.responses import ORJSONResponse
+
+from app.core.profiling import current_profile
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# The encoding negotiated for the current request; set by app.api.negotiation.ContentNegotiationMiddleware.
+response_media_type: ContextVar[str] = ContextVar("response_media_type", default="application/json")
+
+
+def _msgpack_default(value: Any) -> Any:
+    # Datetimes are strings, exactly as in the JSON body, so both encodings decode to the same document.
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    return _orjson_default(value)
+
+
+def packb(content: Any) -> bytes:
+    return msgpack.packb(content, default=_msgpack_default, datetime=False)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    Serializes already-shaped dicts with orjson, skipping response_model validation.
+    Output matches Pydantic's JSON for our models: Decimals as strings, UTC datetimes with a `Z` suffix.
+    Encodes the same document as MessagePack when the request negotiated it.
+    Only return trusted content built from our own documents.
+    """
+
+    def render(self, content: Any) -> bytes:
+        profile = current_profile.get()
+        if profile is None:
+            return self._encode(content)
+        start = time.perf_counter()
+        try:
+            return self._encode(content)
+        finally:
+            profile.add("render", time.perf_counter() - start)
+
+    def _encode(self, content: Any) -> bytes:
+        if response_media_type.get() == MSGPACK_MEDIA_TYPE:
+            self.media_type = MSGPACK_MEDIA_TYPE
+            return packb(content)
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_UTC_Z)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from app.models.enums import Schedule
+
+
+# Months (1-12) in which each schedule is due. Custom tasks are due in their own `month`.
+SCHEDULE_MONTHS: dict[Schedule, tuple[int, ...]] = {
+    Schedule.monthly: tuple(range(1, 13)),
+    Schedule.quarterly: (1, 4, 7, 10),
+    Schedule.seasonal: (3,),
+    Schedule.annual: (1,),
+    Schedule.spring: (3,),
+    Schedule.summer: (6,),
+    Schedule.fall: (9,),
+    Schedule.winter: (12,),
+    Schedule.custom: (),
+}
+
+
+def month_bit(month: int) -> int:
+    return 1 << (month - 1)
+
+
+def due_months(schedule: Schedule | str, month: int | None = None) -> tuple[int, ...]:
+    schedule = Schedule(schedule)
+    if schedule == Schedule.custom:
+        return (month,) if month is not None else ()
+    return SCHEDULE_MONTHS[schedule]
+
+
+def due_mask(schedule: Schedule | str, month: int | None = None) -> int:
+    """12-bit mask of due months; bit 0 is January. Stored on task documents as `due_mask`."""
+    mask = 0
+    for m in due_months(schedule, month):
+        mask |= month_bit(m)
+    return mask
+
+
+def months_from_mask(mask: int) -> tuple[int, ...]:
+    return tuple(m for m in range(1, 13) if mask & month_bit(m))
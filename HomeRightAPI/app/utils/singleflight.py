@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from prometheus_client import Counter
+
+
+class SingleFlight:
+    """
+    Shares one in-flight computation between concurrent callers with the same key (within one worker).
+    The computation runs as its own task, so a caller that disconnects does not cancel it for the others.
+    Results are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, coalesced: Counter, label: str) -> None:
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._coalesced = coalesced.labels(label)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._coalesced.inc()
+        return await asyncio.shield(task)
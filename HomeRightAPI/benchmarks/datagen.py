@@ -0,0 +1,158 @@
+"""
+Synthetic data for the load benchmark: N owners x M custom tasks x Y years of monthly progress,
+written with unordered insert_many batches, followed by a rollup rebuild so the summary routes
+read the same documents they would in production.
+
+Run from the HomeRightAPI directory against a scratch database:
+
+    python -m benchmarks.datagen --owners 50 --tasks 40 --years 3 --db homeright_bench --drop
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Iterator
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.db.indexes import ensure_indexes
+from app.db.mongo import mongo
+from app.db.rollups import rebuild_rollups
+from app.models.enums import Schedule, TaskStatus
+from app.utils.bson import decimal_to_bson
+from app.utils.schedule import due_mask, due_months
+
+
+SCHEDULES = [s for s in Schedule if s != Schedule.custom]
+STATUSES = [s.value for s in TaskStatus]
+
+
+def owner_id(index: int) -> str:
+    return f"bench-owner-{index:05d}"
+
+
+def task_id(index: int) -> str:
+    return f"bench-task-{index:04d}"
+
+
+def _tasks(owner: str, count: int, rng: random.Random, now: datetime) -> Iterator[dict[str, Any]]:
+    for i in range(count):
+        schedule = rng.choice(SCHEDULES + [Schedule.custom])
+        month = rng.randint(1, 12) if schedule == Schedule.custom else None
+        yield {
+            "owner_id": owner,
+            "task_id": task_id(i),
+            "title": f"Task {i:04d}",
+            "detail": "",
+            "schedule": schedule.value,
+            "month": month,
+            "due_mask": due_mask(schedule, month),
+            "is_builtin": False,
+            "created_at": now,
+            "updated_at": now,
+            "seq": 1,
+            "version": 1,
+        }
+
+
+def _progress(owner: str, task: dict[str, Any], years: range, rng: random.Random, now: datetime) -> Iterator[dict[str, Any]]:
+    for year in years:
+        for month in due_months(task["schedule"], task["month"]):
+            status = rng.choice(STATUSES)
+            updated = now - timedelta(minutes=rng.randint(0, 525_600))
+            yield {
+                "owner_id": owner,
+                "task_id": task["task_id"],
+                "year": year,
+                "month": month,
+                "status": status,
+                "cost": decimal_to_bson(Decimal(rng.randint(0, 50_000)) / 100) if status == TaskStatus.complete.value else None,
+                "note": "",
+                "date": updated if status == TaskStatus.complete.value else None,
+                "created_at": updated,
+                "updated_at": updated,
+                "seq": 1,
+            "version": 1,
+            }
+
+
+async def _insert_batched(db: AsyncIOMotorDatabase, collection: str, docs: Iterator[dict[str, Any]], batch_size: int) -> int:
+    total = 0
+    batch: list[dict[str, Any]] = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await db[collection].insert_many(batch, ordered=False)
+            total += len(batch)
+            batch = []
+    if batch:
+        await db[collection].insert_many(batch, ordered=False)
+        total += len(batch)
+    return total
+
+
+async def seed(
+    db: AsyncIOMotorDatabase,
+    owners: int,
+    tasks: int,
+    years: int,
+    first_year: int = 2024,
+    batch_size: int = 1000,
+    seed_value: int = 0,
+) -> dict[str, int]:
+    """Insert the synthetic data set and rebuild rollups. Deterministic for a given `seed_value`."""
+    rng = random.Random(seed_value)
+    now = datetime.now(timezone.utc)
+    year_range = range(first_year, first_year + years)
+    counts = {"owners": owners, "tasks": 0, "progress": 0}
+    for i in range(owners):
+        owner = owner_id(i)
+        task_docs = list(_tasks(owner, tasks, rng, now))
+        counts["tasks"] += await _insert_batched(db, "tasks", iter(task_docs), batch_size)
+        progress = (doc for task in task_docs for doc in _progress(owner, task, year_range, rng, now))
+        counts["progress"] += await _insert_batched(db, "progress", progress, batch_size)
+        await db["settings"].insert_one({"owner_id": owner, "selected_year": year_range[-1], "created_at": now, "updated_at": now, "seq": 1, "version": 1})
+        await db["owner_versions"].insert_one({"_id": owner, "version": 1, "changed_at": now - timedelta(days=1)})
+    await rebuild_rollups(db, fix=True)
+    return counts
+
+
+async def drop(db: AsyncIOMotorDatabase) -> None:
+    for name in ("tasks", "progress", "settings", "rollups", "owner_versions", "tombstones", "task_overlays"):
+        await db[name].drop()
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Seed synthetic owners, tasks and progress for benchmarks.")
+    parser.add_argument("--owners", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=40, help="Custom tasks per owner")
+    parser.add_argument("--years", type=int, default=3, help="Years of progress per task")
+    parser.add_argument("--first-year", type=int, default=2024)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", default="homeright_bench", help="Database name (never the production one)")
+    parser.add_argument("--drop", action="store_true", help="Drop the benchmark collections first")
+    args = parser.parse_args()
+
+    settings.mongodb_db = args.db
+    mongo.connect()
+    try:
+        if args.drop:
+            await drop(mongo.db)
+        # Dropped collections lose their indexes, so skip the fingerprint check.
+        await ensure_indexes(mongo.db, force=args.drop)
+        start = time.perf_counter()
+        counts = await seed(mongo.db, args.owners, args.tasks, args.years, args.first_year, args.batch_size, args.seed)
+    finally:
+        mongo.close()
+    print(f"seeded {counts} into {args.db} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
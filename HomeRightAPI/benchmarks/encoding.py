@@ -0,0 +1,64 @@
+"""
+Body size and encode/decode time of JSON vs MessagePack for list_tasks, list_progress and month_summary
+responses, as FastJSONResponse renders them. Sizes are reported raw and gzipped. Needs no database.
+
+Run from the HomeRightAPI directory:
+
+    python -m benchmarks.encoding [--docs 500] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+
+import msgpack
+import orjson
+
+from app.api.serializers import progress_dict, task_dict
+from app.utils.bson import decimal_from_bson
+from app.utils.responses import MSGPACK_MEDIA_TYPE, FastJSONResponse, response_media_type
+from benchmarks.serialization import make_progress_docs, make_task_docs, summary_items, timed
+
+
+def render(content, media_type: str) -> bytes:
+    token = response_media_type.set(media_type)
+    try:
+        return FastJSONResponse(content).body
+    finally:
+        response_media_type.reset(token)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tasks = make_task_docs(args.docs)
+    progress = make_progress_docs(args.docs)
+    cases = {
+        "list_tasks": [task_dict(d) for d in tasks],
+        "list_progress": [progress_dict(d) for d in progress],
+        "month_summary": summary_items(tasks, progress, lambda c: None if c is None else float(decimal_from_bson(c))),
+    }
+    formats = {
+        "json": ("application/json", orjson.loads),
+        "msgpack": (MSGPACK_MEDIA_TYPE, msgpack.unpackb),
+    }
+
+    print(f"{'route':<15}{'format':<9}{'bytes':>9}{'gzip':>9}{'encode us/doc':>15}{'decode us/doc':>15}")
+    for name, content in cases.items():
+        decoded = {}
+        for fmt, (media_type, loads) in formats.items():
+            t_encode, body = timed(lambda: render(content, media_type), args.repeat)
+            t_decode, decoded[fmt] = timed(lambda: loads(body), args.repeat)
+            print(
+                f"{name:<15}{fmt:<9}{len(body):>9}{len(gzip.compress(body)):>9}"
+                f"{t_encode / args.docs * 1e6:>15.2f}{t_decode / args.docs * 1e6:>15.2f}"
+            )
+        assert decoded["json"] == decoded["msgpack"], f"{name}: encodings decode to different documents"
+
+
+if __name__ == "__main__":
+    main()
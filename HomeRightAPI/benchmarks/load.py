@@ -0,0 +1,210 @@
+"""
+Load benchmark: drives the app in-process (httpx ASGI transport, no network or server) against a
+local mongod seeded by `benchmarks.datagen`, one scenario per route, and writes throughput and
+p50/p95/p99 latency per scenario to a JSON file.
+
+Run from the HomeRightAPI directory (`docker compose up -d mongo` gives a local mongod):
+
+    python -m benchmarks.datagen --owners 50 --tasks 40 --years 3 --drop
+    python -m benchmarks.load --concurrency 16 --requests 2000 --output bench.json
+    python -m benchmarks.load --compare benchmarks/baseline.json --output bench.json
+
+`--compare` exits with status 1 when a scenario's p95 grows, or its throughput drops, by more
+than `--tolerance` relative to the baseline. Record `benchmarks/baseline.json` with
+`--save-baseline benchmarks/baseline.json` on the machine that runs the comparison, and commit it;
+numbers from different machines or data sets are not comparable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+
+from app.core.config import settings
+from app.db.storage import storage
+from app.main import app
+from app.models.enums import TaskStatus
+from benchmarks.datagen import owner_id, task_id
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    request: Callable[[random.Random, "Dataset"], tuple[str, dict[str, Any] | None]]
+
+
+@dataclass
+class Dataset:
+    owners: int
+    tasks: int
+    first_year: int
+    years: int
+
+    def owner(self, rng: random.Random) -> str:
+        return owner_id(rng.randrange(self.owners))
+
+    def year(self, rng: random.Random) -> int:
+        return self.first_year + rng.randrange(self.years)
+
+
+def _progress_body(rng: random.Random, data: Dataset) -> tuple[str, dict[str, Any]]:
+    status = rng.choice(list(TaskStatus))
+    body = {
+        "owner_id": data.owner(rng),
+        "task_id": task_id(rng.randrange(data.tasks)),
+        "year": data.year(rng),
+        "month": rng.randint(1, 12),
+        "status": status.value,
+        "cost": f"{rng.randint(0, 50_000) / 100:.2f}" if status == TaskStatus.complete else None,
+    }
+    return "/progress/by-key", body
+
+
+SCENARIOS = [
+    Scenario("tasks_list", "GET", lambda rng, d: (f"/tasks?owner_id={d.owner(rng)}", None)),
+    Scenario("progress_list", "GET", lambda rng, d: (f"/progress?owner_id={d.owner(rng)}&year={d.year(rng)}", None)),
+    Scenario("progress_by_key", "PUT", _progress_body),
+    Scenario("summary_month", "GET", lambda rng, d: (f"/summary/month/{d.owner(rng)}/{d.year(rng)}/{rng.randint(1, 12)}", None)),
+    Scenario("summary_year", "GET", lambda rng, d: (f"/summary/year/{d.owner(rng)}/{d.year(rng)}", None)),
+    Scenario("settings_get", "GET", lambda rng, d: (f"/settings/{d.owner(rng)}", None)),
+    Scenario("settings_put", "PUT", lambda rng, d: (f"/settings/{d.owner(rng)}", {"selected_year": d.year(rng)})),
+    Scenario("bootstrap", "GET", lambda rng, d: (f"/bootstrap/{d.owner(rng)}", None)),
+]
+
+
+def _percentile(sorted_ms: list[float], q: int) -> float:
+    if len(sorted_ms) < 2:
+        return sorted_ms[0] if sorted_ms else 0.0
+    return statistics.quantiles(sorted_ms, n=100, method="inclusive")[q - 1]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, data: Dataset, requests: int, concurrency: int, seed: int) -> dict[str, Any]:
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker(index: int) -> None:
+        nonlocal remaining, errors
+        rng = random.Random(f"{seed}-{scenario.name}-{index}")
+        while remaining > 0:
+            remaining -= 1
+            path, body = scenario.request(rng, data)
+            start = time.perf_counter()
+            response = await client.request(scenario.method, path, json=body)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Human-readable regressions of `results` against `baseline`; empty when within tolerance."""
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        current = results["scenarios"].get(name)
+        if current is None:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {current['throughput_rps']} req/s vs baseline {base['throughput_rps']} req/s")
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{name}: {current['errors']} errors vs baseline {base['errors']}")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    data = Dataset(owners=args.owners, tasks=args.tasks, first_year=args.first_year, years=args.years)
+    selected = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    settings.mongodb_db = args.db
+    await storage.connect()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in selected:
+                # Warm caches and the connection pool before measuring.
+                await run_scenario(client, scenario, data, args.warmup, args.concurrency, args.seed + 1)
+            scenarios = {}
+            for scenario in selected:
+                scenarios[scenario.name] = await run_scenario(client, scenario, data, args.requests, args.concurrency, args.seed)
+                print(f"{scenario.name:16} {json.dumps(scenarios[scenario.name])}")
+    finally:
+        await storage.close()
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage": settings.storage_backend,
+            "db": args.db,
+            "owners": args.owners,
+            "tasks": args.tasks,
+            "years": args.years,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-process load benchmark for the HomeRight API routes.")
+    parser.add_argument("--db", default="homeright_bench")
+    parser.add_argument("--owners", type=int, default=50, help="Must match the seeded data set")
+    parser.add_argument("--tasks", type=int, default=40)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--first-year", type=int, default=2024)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=200, help="Unmeasured requests per scenario")
+    parser.add_argument("--scenario", action="append", choices=[s.name for s in SCENARIOS], help="Repeatable; default all")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="Fail on regressions against this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Also write the results as a new baseline")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Owner cache cost per task-list read: uncached (`for_owner` on the backend), cache miss (stamp read
+plus load) and cache hit (stamp read only), for one owner with `--tasks` custom tasks. Uses the
+backend selected by STORAGE_BACKEND; the owner's tasks are created first and deleted afterwards.
+
+Run from the HomeRightAPI directory:
+
+    STORAGE_BACKEND=sqlite SQLITE_PATH=/tmp/homeright_bench.db python -m benchmarks.owner_cache --tasks 40
+    python -m benchmarks.owner_cache --db homeright_bench --tasks 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+from app.core.config import settings
+from app.db.storage.base import Storage
+from app.db.storage.cached import CachedStorage
+from app.models.enums import Schedule
+from app.utils.schedule import due_mask
+
+
+def backend() -> Storage:
+    if settings.storage_backend == "sqlite":
+        from app.db.storage.sqlite import SQLiteStorage
+
+        return SQLiteStorage(settings.sqlite_path, settings.sqlite_read_threads)
+    from app.db.storage.mongo import MongoStorage
+
+    return MongoStorage()
+
+
+async def seed(store: Storage, owner_id: str, tasks: int) -> list[str]:
+    now = datetime.now(timezone.utc)
+    ids = [f"bench-cache-task-{i:05d}" for i in range(tasks)]
+    for i, task_id in enumerate(ids):
+        await store.tasks.create(
+            {
+                "owner_id": owner_id,
+                "task_id": task_id,
+                "title": f"Task {i}",
+                "detail": "Inspect, clean and replace as needed.",
+                "schedule": Schedule.monthly.value,
+                "month": None,
+                "due_mask": due_mask(Schedule.monthly, None),
+                "is_builtin": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+    return ids
+
+
+async def timed(read: Callable[[], Awaitable[Any]], repeat: int, before: Callable[[], None] | None = None) -> dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        await read()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    return {
+        "mean_us": round(statistics.fmean(samples), 1),
+        "p50_us": round(samples[len(samples) // 2], 1),
+        "p95_us": round(samples[int(len(samples) * 0.95)], 1),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    settings.mongodb_db = args.db
+    inner = backend()
+    cached = CachedStorage(inner, max_records=1_000_000, ttl_seconds=3600)
+    await inner.connect()
+    try:
+        ids = await seed(inner, args.owner, args.tasks)
+        try:
+            async def read() -> list[dict[str, Any]]:
+                return await cached.tasks.for_owner(args.owner)
+
+            await read()
+            results = {
+                "uncached": await timed(lambda: inner.tasks.for_owner(args.owner), args.repeat),
+                "miss": await timed(read, args.repeat, before=cached.cache.clear),
+                "hit": await timed(read, args.repeat),
+            }
+        finally:
+            for task_id in ids:
+                await inner.tasks.delete(args.owner, task_id)
+    finally:
+        await inner.close()
+    return {"storage": settings.storage_backend, "tasks": args.tasks, "repeat": args.repeat, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Owner cache hit/miss cost against the configured backend.")
+    parser.add_argument("--db", default="homeright_bench")
+    parser.add_argument("--owner", default="bench-cache-owner")
+    parser.add_argument("--tasks", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Per-document serialization cost of list_tasks, list_progress and month_summary responses,
+before (Pydantic model per document + FastAPI response_model validation + json) and after
+(trusted dicts + FastJSONResponse/orjson). Needs no database.
+
+Run from the HomeRightAPI directory:
+
+    python -m benchmarks.serialization [--docs 2000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.serializers import progress_dict, task_dict
+from app.models.enums import Schedule, TaskStatus
+from app.models.progress import ProgressOut
+from app.models.task import TaskOut
+from app.utils.bson import decimal_from_bson, to_object_id_str
+from app.utils.responses import FastJSONResponse
+
+
+def make_task_docs(n: int) -> list[dict]:
+    now = datetime(2025, 1, 1, 12, 0, 0, 123000)
+    schedules = list(Schedule)
+    return [
+        {
+            "_id": ObjectId(),
+            "owner_id": "bench-owner",
+            "task_id": f"task-{i:05d}",
+            "title": f"Task {i}",
+            "detail": "Inspect, clean and replace as needed.",
+            "schedule": schedules[i % len(schedules)].value,
+            "month": (i % 12) + 1 if schedules[i % len(schedules)] == Schedule.custom else None,
+            "due_mask": 4095,
+            "is_builtin": i % 3 == 0,
+            "created_at": now,
+            "updated_at": now + timedelta(seconds=i),
+        }
+        for i in range(n)
+    ]
+
+
+def make_progress_docs(n: int) -> list[dict]:
+    now = datetime(2025, 1, 1, 12, 0, 0, 123000)
+    statuses = list(TaskStatus)
+    return [
+        {
+            "_id": ObjectId(),
+            "owner_id": "bench-owner",
+            "task_id": f"task-{i:05d}",
+            "year": 2025,
+            "month": (i % 12) + 1,
+            "status": statuses[i % len(statuses)].value,
+            "cost": Decimal128(Decimal(f"{i % 200}.25")) if i % 2 else None,
+            "note": "Replaced filter",
+            "date": now,
+            "created_at": now,
+            "updated_at": now + timedelta(seconds=i),
+        }
+        for i in range(n)
+    ]
+
+
+# Baseline implementations, as the routes serialized responses before the fast path.
+
+
+def task_before(doc: dict) -> TaskOut:
+    d = to_object_id_str(doc)
+    return TaskOut(
+        owner_id=d["owner_id"],
+        task_id=d["task_id"],
+        title=d["title"],
+        detail=d.get("detail", ""),
+        schedule=Schedule(d["schedule"]),
+        month=d.get("month"),
+        is_builtin=bool(d.get("is_builtin", False)),
+        created_at=d["created_at"],
+        updated_at=d["updated_at"],
+    )
+
+
+def progress_before(doc: dict) -> ProgressOut:
+    d = to_object_id_str(doc)
+    return ProgressOut(
+        id=d["_id"],
+        owner_id=d["owner_id"],
+        task_id=d["task_id"],
+        year=d["year"],
+        month=d["month"],
+        status=TaskStatus(d["status"]),
+        cost=decimal_from_bson(d.get("cost")),
+        note=d.get("note", ""),
+        date=d.get("date"),
+        created_at=d["created_at"],
+        updated_at=d["updated_at"],
+    )
+
+
+def summary_items(tasks: list[dict], progress: list[dict], cost) -> list[dict]:
+    by_task = {p["task_id"]: p for p in progress}
+    out = []
+    for t in tasks:
+        p = by_task.get(t["task_id"])
+        out.append(
+            {
+                "task_id": t["task_id"],
+                "title": t.get("title", ""),
+                "detail": t.get("detail", ""),
+                "schedule": t.get("schedule"),
+                "month": t.get("month"),
+                "is_builtin": bool(t.get("is_builtin", False)),
+                "progress": None
+                if not p
+                else {
+                    "status": p.get("status"),
+                    "cost": cost(p.get("cost")),
+                    "note": p.get("note", ""),
+                    "date": p.get("date"),
+                    "updated_at": p.get("updated_at"),
+                },
+            }
+        )
+    return {"owner_id": "bench-owner", "tasks": out}
+
+
+async def render_before(model, items) -> bytes:
+    field = create_model_field("Response", list[model], mode="serialization")
+    content = await serialize_response(field=field, response_content=items)
+    return JSONResponse(content).body
+
+
+def timed(fn, repeat: int) -> tuple[float, bytes]:
+    best = float("inf")
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tasks = make_task_docs(args.docs)
+    progress = make_progress_docs(args.docs)
+    loop = asyncio.new_event_loop()
+
+    cases = {
+        "list_tasks": (
+            lambda: loop.run_until_complete(render_before(TaskOut, [task_before(d) for d in tasks])),
+            lambda: FastJSONResponse([task_dict(d) for d in tasks]).body,
+        ),
+        "list_progress": (
+            lambda: loop.run_until_complete(render_before(ProgressOut, [progress_before(d) for d in progress])),
+            lambda: FastJSONResponse([progress_dict(d) for d in progress]).body,
+        ),
+        "month_summary": (
+            lambda: JSONResponse(jsonable_encoder(summary_items(tasks, progress, decimal_from_bson))).body,
+            lambda: FastJSONResponse(
+                summary_items(tasks, progress, lambda c: None if c is None else float(decimal_from_bson(c)))
+            ).body,
+        ),
+    }
+
+    print(f"{'route':<15}{'before us/doc':>15}{'after us/doc':>15}{'speedup':>10}")
+    for name, (before, after) in cases.items():
+        t_before, body_before = timed(before, args.repeat)
+        t_after, body_after = timed(after, args.repeat)
+        assert json.loads(body_before) == json.loads(body_after), f"{name}: fast path output differs"
+        per_before = t_before / args.docs * 1e6
+        per_after = t_after / args.docs * 1e6
+        print(f"{name:<15}{per_before:>15.2f}{per_after:>15.2f}{per_before / per_after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
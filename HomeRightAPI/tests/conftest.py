@@ -0,0 +1,115 @@
+"""
+Shared fixtures. Tests run against mongomock-motor, so no mongod is needed; `client` drives the app
+in-process over httpx's ASGI transport (startup hooks do not run, the fixtures stand in for them).
+`store` runs storage tests once per backend: Mongo on mongomock, SQLite on a temporary file.
+
+mongomock lacks a few things the app relies on ($bitsAllSet, $unionWith, $inc on Decimal128, bulk
+upsert indexes); they are filled in below with just enough behaviour for these tests.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+import httpx
+import mongomock.aggregate
+import mongomock.collection
+import mongomock.filtering
+import pytest
+from bson.decimal128 import Decimal128
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import BulkWriteError
+
+from app.db.catalog import catalog
+from app.db.indexes import ensure_indexes
+from app.db.mongo import mongo
+from app.db.storage.mongo import MongoStorage
+from app.db.storage.sqlite import SQLiteStorage
+from app.main import app
+
+
+_bulk_execute = mongomock.collection.BulkOperationBuilder.execute
+
+
+def _execute(self, write_concern=None):
+    # Report upserts by operation index, as MongoDB does, rather than by upsert count.
+    upserted = []
+
+    def tracked(index, fn):
+        def run():
+            result = fn()
+            if result.get("upserted") is not None:
+                upserted.append({"index": index, "_id": result["upserted"]})
+            return result
+
+        run.__name__ = fn.__name__
+        return run
+
+    self.executors = [tracked(index, fn) for index, fn in enumerate(self.executors)]
+    try:
+        result = _bulk_execute(self, write_concern)
+    except BulkWriteError as e:
+        e.details["upserted"] = upserted
+        raise
+    result["upserted"] = upserted
+    return result
+
+
+def _union_with(collection, database, options):
+    other = database.get_collection(options["coll"])
+    extra = mongomock.aggregate.process_pipeline(list(other._store.documents), database, options.get("pipeline", []), None)
+    return list(collection) + list(extra)
+
+
+def _inc(doc, field, value):
+    current = doc.get(field, 0)
+    if isinstance(value, Decimal128) or isinstance(current, Decimal128):
+        total = sum((v.to_decimal() if isinstance(v, Decimal128) else Decimal(v) for v in (current, value)), Decimal(0))
+        doc[field] = Decimal128(total)
+    else:
+        doc[field] = current + value
+
+
+mongomock.collection.BulkOperationBuilder.execute = _execute
+mongomock.collection._updaters["$inc"] = _inc
+mongomock.aggregate._PIPELINE_HANDLERS["$unionWith"] = _union_with
+mongomock.filtering._NOT_IMPLEMENTED_OPERATORS.discard("$bitsAllSet")
+mongomock.filtering._filterer_inst._operator_map["$bitsAllSet"] = lambda value, bits: isinstance(value, int) and value & bits == bits
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+async def _mongomock(monkeypatch):
+    db = AsyncMongoMockClient()["homeright_test"]
+    monkeypatch.setattr(mongo, "_client", object())
+    monkeypatch.setattr(mongo, "_db", db)
+    await ensure_indexes(db)
+    return db
+
+
+@pytest.fixture
+async def mongo_db(monkeypatch):
+    yield await _mongomock(monkeypatch)
+    catalog.invalidate()
+
+
+@pytest.fixture(params=["mongo", "sqlite"])
+async def store(request, monkeypatch, tmp_path):
+    if request.param == "mongo":
+        await _mongomock(monkeypatch)
+        yield MongoStorage()
+        catalog.invalidate()
+    else:
+        backend = SQLiteStorage(str(tmp_path / "homeright.db"), read_threads=2)
+        await backend.connect()
+        yield backend
+        await backend.close()
+
+
+@pytest.fixture
+async def client(mongo_db):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
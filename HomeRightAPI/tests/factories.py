@@ -0,0 +1,41 @@
+"""
+Test data: helpers that create records through the routes, as a client would, and documents shaped
+like the ones the routes hand to the storage repositories.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+from app.utils.bson import utcnow
+from app.utils.schedule import due_mask
+
+
+OWNER = "o"
+
+
+async def add_task(client, task_id: str, schedule: str, month: int | None = None) -> None:
+    body = {"owner_id": OWNER, "task_id": task_id, "title": task_id.title(), "schedule": schedule, "month": month}
+    assert (await client.post("/tasks", json=body)).status_code == 201
+
+
+async def add_progress(client, task_id: str, month: int, status: str = "complete", cost: str | None = None, year: int = 2025) -> None:
+    body = {"owner_id": OWNER, "task_id": task_id, "year": year, "month": month, "status": status, "cost": cost}
+    assert (await client.put("/progress/by-key", json=body)).status_code == 200
+
+
+def task_fields(title: str, schedule: str = "monthly", month: int | None = None) -> dict:
+    return {"title": title, "detail": "Check it.", "schedule": schedule, "month": month, "due_mask": due_mask(schedule, month), "is_builtin": False}
+
+
+def task_doc(task_id: str, title: str, schedule: str = "monthly", month: int | None = None, owner_id: str = OWNER) -> dict:
+    now = utcnow()
+    return {"owner_id": owner_id, "task_id": task_id, **task_fields(title, schedule, month), "created_at": now, "updated_at": now}
+
+
+def progress_key(task_id: str, year: int = 2025, month: int = 1, owner_id: str = OWNER) -> dict:
+    return {"owner_id": owner_id, "task_id": task_id, "year": year, "month": month}
+
+
+def progress_fields(status: str = "complete", cost: str | None = None) -> dict:
+    return {"status": status, "cost": None if cost is None else Decimal(cost), "note": "", "date": None}
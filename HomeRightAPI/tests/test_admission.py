@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionController, FairSlots, Rejected, TokenBuckets
+from app.core.config import RouteLimit
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_token_bucket_allows_burst_then_waits():
+    buckets = TokenBuckets(max_keys=10)
+    assert [buckets.take(("a", "GET /tasks"), rate=2, burst=3) for _ in range(3)] == [0, 0, 0]
+    wait = buckets.take(("a", "GET /tasks"), rate=2, burst=3)
+    assert 0 < wait <= 0.5
+    # Other owners have their own buckets.
+    assert buckets.take(("b", "GET /tasks"), rate=2, burst=3) == 0
+
+
+async def test_token_buckets_keep_most_recent_keys():
+    buckets = TokenBuckets(max_keys=2)
+    buckets.take(("a",), rate=1, burst=1)
+    buckets.take(("b",), rate=1, burst=1)
+    buckets.take(("c",), rate=1, burst=1)
+    # "a" was dropped and starts full again; "c" is still empty.
+    assert buckets.take(("a",), rate=1, burst=1) == 0
+    assert buckets.take(("c",), rate=1, burst=1) > 0
+
+
+async def _queue(slots: FairSlots, owner: str, order: list[str], timeout: float = 5) -> None:
+    await slots.acquire(owner, timeout)
+    order.append(owner)
+
+
+async def test_fair_slots_hand_out_round_robin():
+    slots = FairSlots(limit=1, queue_size=10, per_owner=5)
+    await slots.acquire("holder", 1)
+    order: list[str] = []
+    waiters = [asyncio.create_task(_queue(slots, owner, order)) for owner in ("a", "a", "a", "b", "c")]
+    await asyncio.sleep(0)
+    assert slots.waiting == 5
+
+    for _ in range(5):
+        slots.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*waiters)
+
+    assert order == ["a", "b", "c", "a", "a"]
+    assert (slots.active, slots.waiting) == (1, 0)
+    slots.release()
+    assert slots.active == 0
+
+
+async def test_fair_slots_reject_full_queues():
+    slots = FairSlots(limit=1, queue_size=2, per_owner=1)
+    await slots.acquire("holder", 1)
+    waiter = asyncio.create_task(slots.acquire("a", 5))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Rejected) as per_owner:
+        await slots.acquire("a", 5)
+    assert (per_owner.value.status_code, per_owner.value.reason) == (503, "queue_full")
+
+    other = asyncio.create_task(slots.acquire("b", 5))
+    await asyncio.sleep(0)
+    with pytest.raises(Rejected):
+        await slots.acquire("c", 5)
+
+    slots.release()
+    slots.release()
+    await asyncio.gather(waiter, other)
+
+
+async def test_fair_slots_time_out_and_forget_the_waiter():
+    slots = FairSlots(limit=1, queue_size=5, per_owner=5)
+    await slots.acquire("holder", 1)
+
+    with pytest.raises(Rejected) as rejected:
+        await slots.acquire("a", 0.01)
+    assert (rejected.value.reason, rejected.value.retry_after) == ("queue_timeout", 1)
+    assert slots.waiting == 0
+
+    slots.release()
+    assert slots.active == 0
+
+
+async def test_controller_rate_limits_per_owner_and_route():
+    controller = AdmissionController(
+        enabled=True,
+        routes={"GET /tasks": RouteLimit(rate=1, burst=1, heavy=True)},
+        default=RouteLimit(rate=0, burst=0),
+        slots=FairSlots(limit=4, queue_size=4, per_owner=2),
+        queue_timeout=1,
+        max_owners=100,
+    )
+    scope = {"path_params": {}, "query_string": b"owner_id=a&limit=5"}
+
+    assert await controller.enter("GET", "/tasks", scope) is True
+    controller.leave()
+    with pytest.raises(Rejected) as rejected:
+        await controller.enter("GET", "/tasks", scope)
+    assert rejected.value.status_code == 429
+    assert rejected.value.response().headers["Retry-After"] == "1"
+
+    # Unlimited and light routes take neither a token nor a slot.
+    assert await controller.enter("GET", "/settings/{owner_id}", {"path_params": {"owner_id": "a"}}) is False
+    assert await controller.enter("GET", "/tasks", {"path_params": {}, "query_string": b"owner_id=b"}) is True
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+
+from tests.factories import OWNER, add_progress, add_task
+
+
+pytestmark = pytest.mark.anyio
+
+READS = [
+    ("/tasks", {"owner_id": OWNER}),
+    ("/progress", {"owner_id": OWNER}),
+    (f"/summary/month/{OWNER}/2025/3", {}),
+    (f"/summary/year/{OWNER}/2025", {}),
+]
+
+
+@pytest.mark.parametrize("path,params", READS)
+async def test_matching_etag_is_a_304(client, path, params):
+    await add_task(client, "filters", "monthly")
+    first = await client.get(path, params=params)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+
+    again = await client.get(path, params=params, headers={"If-None-Match": etag})
+    assert (again.status_code, again.headers["ETag"], again.content) == (304, etag, b"")
+    assert (await client.get(path, params=params, headers={"If-None-Match": '"other", ' + etag.removeprefix("W/")})).status_code == 304
+    assert (await client.get(path, params=params, headers={"If-None-Match": '"other"'})).status_code == 200
+
+
+@pytest.mark.parametrize("path,params", READS)
+async def test_any_owner_write_changes_the_etag(client, path, params):
+    await add_task(client, "filters", "monthly")
+    etag = (await client.get(path, params=params)).headers["ETag"]
+
+    await add_progress(client, "filters", 3)
+    changed = await client.get(path, params=params, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+    # Other owners' writes leave it alone.
+    await client.post("/tasks", json={"owner_id": "someone-else", "title": "Gutters", "schedule": "annual"})
+    assert (await client.get(path, params=params, headers={"If-None-Match": changed.headers["ETag"]})).status_code == 304
+
+
+async def test_stale_if_match_is_a_412(client):
+    await add_task(client, "filters", "monthly")
+    url, params = "/tasks/filters", {"owner_id": OWNER}
+
+    assert (await client.patch(url, params=params, json={"title": "Furnace filters"}, headers={"If-Match": '"1"'})).json()["version"] == 2
+    assert (await client.patch(url, params=params, json={"title": "Stale"}, headers={"If-Match": '"1"'})).status_code == 412
+    assert (await client.delete(url, params=params, headers={"If-Match": "nope"})).status_code == 400
+    assert (await client.get(url, params=params)).json()["title"] == "Furnace filters"
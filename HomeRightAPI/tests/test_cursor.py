@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.utils.cursor import decode_cursor, encode_cursor
+from tests.factories import OWNER, add_progress, add_task
+
+
+def test_round_trip():
+    oid = ObjectId()
+    when = datetime(2025, 3, 1, 12, 30, 15, 123000)
+    token = encode_cursor([when, oid])
+
+    assert "=" not in token
+    assert decode_cursor(token, (datetime, (ObjectId, str))) == [when, oid]
+    assert decode_cursor(encode_cursor([True, "Attic", "t1"]), (bool, str, str)) == [True, "Attic", "t1"]
+
+
+def test_alternative_types():
+    assert decode_cursor(encode_cursor([datetime(2025, 1, 1), "abc"]), (datetime, (ObjectId, str))) == [datetime(2025, 1, 1), "abc"]
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "not a cursor",
+        encode_cursor({"a": 1}),
+        encode_cursor([1, "x"]),
+        encode_cursor([1, "x", "y", "z"]),
+        encode_cursor([1, 2, "x"]),
+        encode_cursor([True, "x", "y"]),
+        encode_cursor([1, "x", None]),
+    ],
+)
+def test_rejects_malformed_or_mistyped(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token, (int, str, str))
+
+
+def test_bool_only_where_named():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor([1, "x", "y"]), (bool, str, str))
+    assert decode_cursor(encode_cursor([7, "x", datetime(2025, 1, 1)]), (int, str, datetime))[0] == 7
+
+
+async def pages(client, path: str, params: dict) -> list[list[str]]:
+    out, cursor = [], None
+    while True:
+        r = await client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200
+        out.append([d["task_id"] if path == "/tasks" else f"{d['task_id']}-{d['month']}" for d in r.json()])
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return out
+
+
+@pytest.mark.anyio
+async def test_task_pages_follow_the_cursor(client):
+    for task_id in ("gutters", "attic", "filters", "attic-2", "smoke"):
+        await add_task(client, task_id, "monthly")
+
+    assert await pages(client, "/tasks", {"owner_id": OWNER, "limit": 2}) == [["attic", "attic-2"], ["filters", "gutters"], ["smoke"]]
+
+
+@pytest.mark.anyio
+async def test_progress_pages_follow_the_cursor(client):
+    for month in range(1, 6):
+        await add_progress(client, "filters", month)
+
+    assert await pages(client, "/progress", {"owner_id": OWNER, "limit": 2}) == [
+        ["filters-5", "filters-4"],
+        ["filters-3", "filters-2"],
+        ["filters-1"],
+    ]
+
+
+@pytest.mark.anyio
+async def test_bad_cursor_is_a_400(client):
+    assert (await client.get("/tasks", params={"owner_id": OWNER, "cursor": "garbage"})).status_code == 400
+    assert (await client.get("/progress", params={"owner_id": OWNER, "cursor": encode_cursor([1])})).status_code == 400
+    # Right shape, wrong types.
+    assert (await client.get("/tasks", params={"owner_id": OWNER, "cursor": encode_cursor([1, "x", "y"])})).status_code == 400
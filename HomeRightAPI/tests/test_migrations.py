@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import pytest
+
+from app.db.checklist import CHECKLIST, checklist_doc
+from app.db.migrations import backfill_catalog_owners, promote_builtin_catalog
+from app.utils.bson import utcnow
+from tests.factories import OWNER, add_progress, add_task
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def builtin_ids(client, owner_id: str) -> set[str]:
+    tasks = (await client.get("/tasks", params={"owner_id": owner_id, "is_builtin": "true"})).json()
+    return {t["task_id"] for t in tasks}
+
+
+async def test_promote_keeps_owners_without_copies_at_zero_builtins(client, mongo_db):
+    now = utcnow()
+    await mongo_db["tasks"].insert_many([{**checklist_doc(e, now), "owner_id": OWNER} for e in CHECKLIST[:-1]])
+    await add_task(client, "filters", "monthly")
+
+    counts = await promote_builtin_catalog(mongo_db)
+    assert (counts["owners"], counts["removed"]) == (1, len(CHECKLIST) - 1)
+    assert await builtin_ids(client, OWNER) == {e["task_id"] for e in CHECKLIST[:-1]}
+    assert await builtin_ids(client, "other") == set()
+    assert await backfill_catalog_owners(mongo_db) == 0
+
+    # Catalogs promoted before `catalog_owners` existed: owners are found from their catalog-task progress.
+    await add_progress(client, CHECKLIST[0]["task_id"], 3)
+    await mongo_db["catalog_owners"].delete_many({})
+    assert await backfill_catalog_owners(mongo_db) == 1
+    assert await builtin_ids(client, OWNER) == {e["task_id"] for e in CHECKLIST[:-1]}
+    assert await builtin_ids(client, "other") == set()
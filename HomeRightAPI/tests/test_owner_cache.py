@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import pytest
+
+from app.db.storage.cached import CachedStorage
+from app.utils.bson import utcnow
+from tests.factories import OWNER, task_doc
+
+
+pytestmark = pytest.mark.anyio
+
+
+def count_loads(monkeypatch, store) -> list[str]:
+    loads: list[str] = []
+    load = store.tasks.for_owner
+
+    async def counting(owner_id):
+        loads.append(owner_id)
+        return await load(owner_id)
+
+    monkeypatch.setattr(store.tasks, "for_owner", counting)
+    return loads
+
+
+async def test_hits_and_invalidation(store, monkeypatch):
+    await store.tasks.create(task_doc("t1", "Filters"))
+    await store.tasks.create(task_doc("t2", "Attic", schedule="custom", month=3))
+    cached = CachedStorage(store, max_records=100, ttl_seconds=60)
+    loads = count_loads(monkeypatch, store)
+
+    assert [t["task_id"] for t in await cached.tasks.for_owner(OWNER)] == ["t2", "t1"]
+    assert (await cached.tasks.get(OWNER, "t1"))["title"] == "Filters"
+    assert [t["task_id"] for t in await cached.tasks.due_in_month(OWNER, 4)] == ["t1"]
+    page = await cached.tasks.list(OWNER, schedule=None, month=None, is_builtin=False, after=(False, "Attic", "t2"), skip=0, limit=5)
+    assert [t["task_id"] for t in page] == ["t1"]
+    assert len(loads) == 1
+
+    # A write through the wrapper drops the entry on this worker.
+    await cached.tasks.update(OWNER, "t1", {"title": "HVAC filters"}, utcnow())
+    assert (await cached.tasks.get(OWNER, "t1"))["title"] == "HVAC filters"
+    assert len(loads) == 2
+
+    # A write made elsewhere moves the stamp.
+    await store.tasks.delete(OWNER, "t2")
+    assert [t["task_id"] for t in await cached.tasks.for_owner(OWNER)] == ["t1"]
+    assert len(loads) == 3
+
+
+async def test_settings_are_not_cached(store):
+    cached = CachedStorage(store, max_records=100, ttl_seconds=60)
+    assert cached.settings is store.settings
+
+
+async def test_evicts_least_recently_used_owner(store, monkeypatch):
+    for owner in ("a", "b"):
+        await store.tasks.create(task_doc("t1", "Filters", owner_id=owner))
+        await store.tasks.create(task_doc("t2", "Attic", owner_id=owner))
+    cached = CachedStorage(store, max_records=3, ttl_seconds=60)
+    loads = count_loads(monkeypatch, store)
+
+    await cached.tasks.for_owner("a")
+    await cached.tasks.for_owner("b")
+    await cached.tasks.for_owner("b")
+    await cached.tasks.for_owner("a")
+    assert loads == ["a", "b", "a"]
+
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.admission import TokenBuckets, admission
+from app.core.config import RouteLimit, settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+def item(task_id: str, month: int = 1, status: str = "complete", **extra) -> dict:
+    return {"owner_id": "o", "task_id": task_id, "year": 2025, "month": month, "status": status, **extra}
+
+
+async def test_batch_reports_each_item(client):
+    existing = (await client.put("/progress/by-key", json=item("t1", status="in_progress"))).json()
+
+    r = await client.put(
+        "/progress/batch",
+        params={"owner_id": "o"},
+        json={"items": [item("t1", cost="10.50"), item("t2"), item("t3", month=13), item("t2", status="in_progress")]},
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["created"], body["updated"], body["failed"]) == (1, 1, 1)
+    results = body["results"]
+    assert results[0]["status"] == "updated"
+    assert results[1]["status"] == "superseded"
+    assert results[2]["status"] == "error" and "month" in results[2]["error"]
+    assert results[3]["status"] == "created"
+
+    stored = {p["task_id"]: p for p in (await client.get("/progress", params={"owner_id": "o"})).json()}
+    assert (stored["t1"]["id"], stored["t1"]["status"], float(stored["t1"]["cost"])) == (existing["id"], "complete", 10.5)
+    assert (stored["t2"]["id"], stored["t2"]["status"]) == (results[3]["id"], "in_progress")
+    assert "t3" not in stored
+
+
+async def test_batch_size_is_capped(client, monkeypatch):
+    monkeypatch.setattr(settings, "progress_batch_max_items", 2)
+    r = await client.put("/progress/batch", params={"owner_id": "o"}, json={"items": [item(f"t{i}") for i in range(3)]})
+    assert r.status_code == 413
+
+
+async def test_batch_items_must_belong_to_the_named_owner(client):
+    assert (await client.put("/progress/batch", json={"items": [item("t1")]})).status_code == 422
+
+    r = await client.put("/progress/batch", params={"owner_id": "o"}, json={"items": [item("t1"), {**item("t2"), "owner_id": "x"}]})
+    assert [res["status"] for res in r.json()["results"]] == ["created", "error"]
+    assert (await client.get("/progress", params={"owner_id": "x"})).json() == []
+
+
+async def test_batch_is_rate_limited_per_owner(client, monkeypatch):
+    monkeypatch.setattr(admission, "enabled", True)
+    monkeypatch.setitem(admission.routes, "PUT /progress/batch", RouteLimit(rate=0.001, burst=1))
+    monkeypatch.setattr(admission, "buckets", TokenBuckets(100))
+
+    assert (await client.put("/progress/batch", params={"owner_id": "o"}, json={"items": [item("t1")]})).status_code == 200
+    assert (await client.put("/progress/batch", params={"owner_id": "o"}, json={"items": [item("t1")]})).status_code == 429
+    assert (await client.put("/progress/batch", params={"owner_id": "x"}, json={"items": [{**item("t1"), "owner_id": "x"}]})).status_code == 200
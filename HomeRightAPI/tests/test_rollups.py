@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+
+from app.db.rollups import DUE_YEAR, rebuild_rollups
+from tests.factories import OWNER, add_progress, add_task
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_writes_keep_rollups_in_step(client, mongo_db):
+    await add_task(client, "filters", "monthly")
+    await add_task(client, "gutters", "custom", month=3)
+    await add_progress(client, "filters", 3, cost="2.50")
+    await add_progress(client, "gutters", 3, cost="1.25")
+    await add_progress(client, "filters", 4, status="in_progress")
+    await add_progress(client, "filters", 3, status="in_progress")
+    await add_progress(client, "filters", 3, cost="2.50")
+    assert (await client.patch("/tasks/gutters", params={"owner_id": OWNER}, json={"schedule": "custom", "month": 4})).status_code == 200
+    assert (await client.patch("/tasks/gutters", params={"owner_id": OWNER}, json={"schedule": "custom", "month": 3})).status_code == 200
+
+    assert await rebuild_rollups(mongo_db) == []
+    rollup = (await client.get(f"/summary/month/{OWNER}/2025/3", params={"include_tasks": "false"})).json()
+    full = (await client.get(f"/summary/month/{OWNER}/2025/3")).json()
+    for field in ("total_tasks", "completed_tasks", "is_month_complete"):
+        assert rollup[field] == full[field]
+    assert Decimal(str(rollup["completed_cost_total"])) == Decimal(str(full["completed_cost_total"])) == Decimal("3.75")
+
+
+async def summaries_agree(client) -> tuple:
+    rollup = (await client.get(f"/summary/month/{OWNER}/2025/3", params={"include_tasks": "false"})).json()
+    full = (await client.get(f"/summary/month/{OWNER}/2025/3")).json()
+    fields = ("total_tasks", "completed_tasks", "is_month_complete", "completed_cost_total")
+    assert [rollup[f] for f in fields] == [full[f] for f in fields]
+    return tuple(full[f] for f in fields)
+
+
+async def test_progress_on_tasks_not_due_is_not_counted(client, mongo_db):
+    await add_task(client, "a", "custom", month=3)
+    await add_task(client, "b", "custom", month=5)
+    await add_progress(client, "a", 3, cost="3.00")
+    await add_progress(client, "b", 3, cost="7.00")
+    assert await summaries_agree(client) == (1, 1, True, 3.0)
+
+    # b moves into March and back out again, taking its completed record with it.
+    assert (await client.patch("/tasks/b", params={"owner_id": OWNER}, json={"schedule": "custom", "month": 3})).status_code == 200
+    assert await summaries_agree(client) == (2, 2, True, 10.0)
+    assert (await client.patch("/tasks/b", params={"owner_id": OWNER}, json={"schedule": "custom", "month": 5})).status_code == 200
+    assert await summaries_agree(client) == (1, 1, True, 3.0)
+
+    assert (await client.delete("/tasks/a", params={"owner_id": OWNER})).status_code == 204
+    assert await summaries_agree(client) == (0, 0, False, 0)
+    assert await rebuild_rollups(mongo_db) == []
+
+
+async def test_rebuild_reports_and_fixes_drift(client, mongo_db):
+    await add_task(client, "filters", "monthly")
+    await add_task(client, "gutters", "custom", month=3)
+    await add_progress(client, "filters", 3, cost="2.50")
+    await add_progress(client, "gutters", 3, cost="1.25")
+
+    await mongo_db["rollups"].update_one({"owner_id": OWNER, "year": 2025, "month": 3}, {"$set": {"completed_tasks": 7}})
+    await mongo_db["rollups"].delete_one({"owner_id": OWNER, "year": DUE_YEAR, "month": 3})
+    await mongo_db["rollups"].insert_one({"owner_id": OWNER, "year": 2025, "month": 9, "completed_tasks": 1})
+
+    drift = await rebuild_rollups(mongo_db, owner_id=OWNER)
+    assert {(d["year"], d["month"]): (d["expected"], d["actual"]) for d in drift} == {
+        (2025, 3): (
+            {"completed_tasks": 2, "completed_cost_total": Decimal("3.75")},
+            {"completed_tasks": 7, "completed_cost_total": Decimal("3.75")},
+        ),
+        (DUE_YEAR, 3): ({"due_tasks": 2}, {}),
+        (2025, 9): ({}, {"completed_tasks": 1}),
+    }
+    # Verifying does not write.
+    assert len(await rebuild_rollups(mongo_db)) == 3
+
+    assert len(await rebuild_rollups(mongo_db, fix=True)) == 3
+    assert await rebuild_rollups(mongo_db) == []
+    body = (await client.get(f"/summary/month/{OWNER}/2025/3", params={"include_tasks": "false"})).json()
+    assert (body["total_tasks"], body["completed_tasks"], body["is_month_complete"]) == (2, 2, True)
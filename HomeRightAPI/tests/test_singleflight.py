@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.metrics import SUMMARY_COALESCED
+from app.utils.singleflight import SingleFlight
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_callers_share_one_call():
+    flights = SingleFlight(SUMMARY_COALESCED, "test")
+    calls = []
+    release = asyncio.Event()
+
+    async def compute(key):
+        calls.append(key)
+        await release.wait()
+        return {"key": key}
+
+    waiters = [asyncio.create_task(flights.do(key, lambda key=key: compute(key))) for key in ("a", "a", "a", "b")]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert sorted(calls) == ["a", "b"]
+    assert results[0] is results[1] is results[2]
+    assert results[3] == {"key": "b"}
+
+
+async def test_key_is_released_after_completion():
+    flights = SingleFlight(SUMMARY_COALESCED, "test")
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await flights.do("a", compute) == 1
+    assert await flights.do("a", compute) == 2
+
+
+async def test_errors_reach_every_caller():
+    flights = SingleFlight(SUMMARY_COALESCED, "test")
+    release = asyncio.Event()
+
+    async def fail():
+        await release.wait()
+        raise RuntimeError("boom")
+
+    waiters = [asyncio.create_task(flights.do("a", fail)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_cancelled_caller_does_not_cancel_the_others():
+    flights = SingleFlight(SUMMARY_COALESCED, "test")
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flights.do("a", compute))
+    second = asyncio.create_task(flights.do("a", compute))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
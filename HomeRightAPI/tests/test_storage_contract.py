@@ -0,0 +1,273 @@
+"""The Storage contract (`app.db.storage.base`), run against every backend through the `store` fixture."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.db.checklist import CHECKLIST
+from app.db.storage.base import Conflict, CostTotals, PreconditionFailed
+from app.db.storage.mongo import MongoStorage
+from app.db.versions import next_owner_seq, owner_write
+from app.utils.bson import utcnow
+from tests.factories import OWNER, progress_fields, progress_key, task_doc, task_fields
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_task_create_get_conflict(store):
+    await store.tasks.create(task_doc("t1", "Filters"))
+
+    assert (await store.tasks.get(OWNER, "t1"))["title"] == "Filters"
+    assert await store.tasks.get(OWNER, "missing") is None
+    assert await store.tasks.get("someone-else", "t1") is None
+
+    with pytest.raises(Conflict):
+        await store.tasks.create(task_doc("t1", "Again"))
+
+
+async def test_task_list_pages_by_title(store):
+    for i, title in enumerate(["Gutters", "Attic", "Filters", "Attic", "Smoke alarms"]):
+        await store.tasks.create(task_doc(f"t{i}", title))
+
+    pages, after = [], None
+    while True:
+        page = await store.tasks.list(OWNER, schedule=None, month=None, is_builtin=None, after=after, skip=0, limit=2)
+        if not page:
+            break
+        pages.append([d["task_id"] for d in page])
+        last = page[-1]
+        after = (bool(last.get("is_builtin", False)), last["title"], last["task_id"])
+    assert pages == [["t1", "t3"], ["t2", "t0"], ["t4"]]
+
+    skipped = await store.tasks.list(OWNER, schedule="monthly", month=None, is_builtin=False, after=None, skip=1, limit=10)
+    assert [d["task_id"] for d in skipped] == ["t3", "t2", "t0", "t4"]
+
+
+async def test_task_replace_update_delete(store):
+    await store.tasks.create(task_doc("t1", "Filters"))
+    now = utcnow()
+
+    assert (await store.tasks.replace(OWNER, "t1", task_fields("Furnace filters"), now))["title"] == "Furnace filters"
+    assert (await store.tasks.replace(OWNER, "t2", task_fields("Gutters", "custom", 5), now))["month"] == 5
+    assert (await store.tasks.update(OWNER, "t1", {"title": "HVAC filters"}, now))["title"] == "HVAC filters"
+    assert await store.tasks.update(OWNER, "missing", {"title": "x"}, now) is None
+    assert {d["task_id"] for d in await store.tasks.due_in_month(OWNER, 5)} == {"t1", "t2"}
+    assert {d["task_id"] for d in await store.tasks.due_in_month(OWNER, 6)} == {"t1"}
+
+    assert await store.tasks.delete(OWNER, "t1")
+    assert await store.tasks.get(OWNER, "t1") is None
+    assert not await store.tasks.delete(OWNER, "t1")
+
+
+async def test_task_writes_check_expected_version(store):
+    created = await store.tasks.create(task_doc("t1", "Filters"))
+    assert created["version"] == 1
+    now = utcnow()
+
+    replaced = await store.tasks.replace(OWNER, "t1", task_fields("Furnace filters"), now, expected_version=1)
+    assert (replaced["title"], replaced["version"]) == ("Furnace filters", 2)
+    with pytest.raises(PreconditionFailed):
+        await store.tasks.replace(OWNER, "t1", task_fields("Stale"), now, expected_version=1)
+    with pytest.raises(PreconditionFailed):
+        await store.tasks.replace(OWNER, "new", task_fields("Conditional create"), now, expected_version=1)
+
+    updated = await store.tasks.update(OWNER, "t1", {"title": "HVAC filters"}, now, expected_version=2)
+    assert (updated["title"], updated["version"]) == ("HVAC filters", 3)
+    with pytest.raises(PreconditionFailed):
+        await store.tasks.update(OWNER, "t1", {"title": "Stale"}, now, expected_version=2)
+    assert (await store.tasks.get(OWNER, "t1"))["title"] == "HVAC filters"
+
+    with pytest.raises(PreconditionFailed):
+        await store.tasks.delete(OWNER, "t1", expected_version=2)
+    assert await store.tasks.delete(OWNER, "t1", expected_version=3)
+    assert await store.tasks.get(OWNER, "t1") is None
+
+
+async def test_builtin_task_writes_check_expected_version(store):
+    await store.tasks.seed_builtins(OWNER, utcnow())
+    task_id = CHECKLIST[0]["task_id"]
+    version = (await store.tasks.get(OWNER, task_id))["version"]
+    now = utcnow()
+
+    # On mongo the task has no overlay yet; a stale version must not create one.
+    with pytest.raises(PreconditionFailed):
+        await store.tasks.update(OWNER, task_id, {"title": "Stale"}, now, expected_version=version + 1)
+    updated = await store.tasks.update(OWNER, task_id, {"title": "Mine"}, now, expected_version=version)
+    assert (updated["title"], updated["version"]) == ("Mine", version + 1)
+    with pytest.raises(PreconditionFailed):
+        await store.tasks.update(OWNER, task_id, {"title": "Stale"}, now, expected_version=version)
+    assert (await store.tasks.get(OWNER, task_id))["title"] == "Mine"
+
+
+async def test_builtins_are_listed_only_for_owners_who_seeded(store):
+    ids = {e["task_id"] for e in CHECKLIST}
+    assert not ids & {t["task_id"] for t in await store.tasks.for_owner(OWNER)}
+
+    assert await store.tasks.seed_builtins(OWNER, utcnow()) == (len(ids), len(ids))
+    assert ids <= {t["task_id"] for t in await store.tasks.for_owner(OWNER)}
+    assert await store.tasks.seed_builtins(OWNER, utcnow()) == (0, len(ids))
+    assert not ids & {t["task_id"] for t in await store.tasks.for_owner("other")}
+    assert await store.tasks.get("other", CHECKLIST[0]["task_id"]) is None
+
+
+async def test_progress_and_settings_writes_check_expected_version(store):
+    now = utcnow()
+    progress_id = str((await store.progress.create({**progress_key("t1"), **progress_fields(), "created_at": now, "updated_at": now}))["_id"])
+
+    updated = await store.progress.update(OWNER, progress_id, {"status": "in_progress"}, now, expected_version=1)
+    assert (updated["status"], updated["version"]) == ("in_progress", 2)
+    with pytest.raises(PreconditionFailed):
+        await store.progress.update(OWNER, progress_id, {"status": "complete"}, now, expected_version=1)
+    with pytest.raises(PreconditionFailed):
+        await store.progress.delete(OWNER, progress_id, expected_version=1)
+    assert await store.progress.delete(OWNER, progress_id, expected_version=2)
+
+    assert (await store.settings.upsert(OWNER, 2025, now))["version"] == 1
+    with pytest.raises(PreconditionFailed):
+        await store.settings.upsert(OWNER, 2026, now, expected_version=2)
+    assert (await store.settings.upsert(OWNER, 2026, now, expected_version=1))["version"] == 2
+
+
+async def test_progress_create_list_update_delete(store):
+    start = utcnow()
+    ids = []
+    for month in range(1, 6):
+        now = start + timedelta(seconds=month)
+        doc = await store.progress.create({**progress_key("t1", month=month), **progress_fields(), "created_at": now, "updated_at": now})
+        ids.append(str(doc["_id"]))
+    with pytest.raises(Conflict):
+        await store.progress.create({**progress_key("t1", month=1), **progress_fields(), "created_at": start, "updated_at": start})
+
+    seen, after = [], None
+    while True:
+        page = await store.progress.list(OWNER, year=2025, month=None, task_id=None, status=None, after=after, skip=0, limit=2)
+        if not page:
+            break
+        seen += [str(d["_id"]) for d in page]
+        after = (page[-1]["updated_at"], page[-1]["_id"])
+    assert seen == ids[::-1]
+
+    progress_id = ids[0]
+    assert (await store.progress.update(OWNER, progress_id, {"status": "in_progress"}, utcnow()))["status"] == "in_progress"
+    assert [(d["task_id"], d["status"]) for d in await store.progress.for_month(OWNER, 2025, 1)] == [("t1", "in_progress")]
+    with pytest.raises(Conflict):
+        await store.progress.replace(OWNER, progress_id, {**progress_key("t1", month=2), **progress_fields()}, utcnow())
+    assert await store.progress.delete(OWNER, progress_id)
+    assert await store.progress.get(OWNER, progress_id) is None
+    assert not await store.progress.delete(OWNER, progress_id)
+
+
+async def test_upsert_many_reports_each_write(store):
+    existing = await store.progress.upsert_by_key(progress_key("t1"), progress_fields("in_progress"), utcnow())
+
+    results = await store.progress.upsert_many(
+        [(progress_key("t1"), progress_fields("complete", "12.50")), (progress_key("t2"), progress_fields("complete", "3.25"))],
+        utcnow(),
+    )
+
+    assert [r.status for r in results] == ["updated", "created"]
+    assert results[0].id == str(existing["_id"])
+    first = await store.progress.get(OWNER, results[0].id)
+    assert (first["status"], Decimal(str(first["cost"]))) == ("complete", Decimal("12.50"))
+    assert (await store.progress.get(OWNER, results[1].id))["task_id"] == "t2"
+    assert await store.progress.upsert_many([], utcnow()) == []
+
+
+async def test_upsert_many_uses_given_insert_ids(store):
+    existing = await store.progress.upsert_by_key(progress_key("t1"), progress_fields("in_progress"), utcnow())
+    insert_id = "65f000000000000000000001"
+
+    results = await store.progress.upsert_many(
+        [(progress_key("t2"), progress_fields()), (progress_key("t1"), progress_fields())],
+        utcnow(),
+        insert_ids=[insert_id, "65f000000000000000000002"],
+    )
+
+    assert [(r.status, r.id) for r in results] == [("created", insert_id), ("updated", str(existing["_id"]))]
+    assert str((await store.progress.get_by_key(progress_key("t2")))["_id"]) == insert_id
+    assert (await store.progress.get_by_key(progress_key("t1")))["status"] == "complete"
+    assert await store.progress.get_by_key(progress_key("t3")) is None
+
+
+async def test_month_and_cost_totals(store):
+    await store.tasks.create(task_doc("monthly", "Filters"))
+    await store.tasks.create(task_doc("march", "Gutters", schedule="custom", month=3))
+    for task_id, month, cost in [("monthly", 3, "0.10"), ("march", 3, "0.20"), ("monthly", 4, None)]:
+        await store.progress.upsert_by_key(progress_key(task_id, month=month), progress_fields("complete", cost), utcnow())
+    await store.progress.upsert_by_key(progress_key("monthly", month=5), progress_fields("not_started"), utcnow())
+    await store.progress.upsert_by_key(progress_key("monthly", year=2024, month=3), progress_fields("complete", "1"), utcnow())
+
+    totals = await store.summaries.month_totals(OWNER, 2025, [3, 4, 5])
+    assert {m: (r.due_tasks, r.completed_tasks, r.completed_cost_total) for m, r in totals.items()} == {
+        3: (2, 2, Decimal("0.30")),
+        4: (1, 1, Decimal(0)),
+        5: (1, 0, Decimal(0)),
+    }
+
+    costs = await store.summaries.cost_totals(OWNER, None)
+    assert costs["year"] == {2024: CostTotals(Decimal("1"), 1), 2025: CostTotals(Decimal("0.30"), 3)}
+    assert costs["month"][(2025, 3)] == CostTotals(Decimal("0.30"), 2)
+    assert costs["task"]["monthly"] == CostTotals(Decimal("1.10"), 3)
+    only_2025 = await store.summaries.cost_totals(OWNER, 2025)
+    assert only_2025["task"] == {"monthly": CostTotals(Decimal("0.10"), 2), "march": CostTotals(Decimal("0.20"), 1)}
+
+
+async def test_month_totals_only_count_tasks_due_that_month(store):
+    await store.tasks.create(task_doc("march", "Gutters", schedule="custom", month=3))
+    await store.tasks.create(task_doc("may", "Deck", schedule="custom", month=5))
+    await store.progress.upsert_by_key(progress_key("march", month=3), progress_fields("complete", "3"), utcnow())
+    await store.progress.upsert_by_key(progress_key("may", month=3), progress_fields("complete", "7"), utcnow())
+
+    march = (await store.summaries.month_totals(OWNER, 2025, [3]))[3]
+    assert (march.due_tasks, march.completed_tasks, march.completed_cost_total) == (1, 1, Decimal("3"))
+
+    await store.tasks.update(OWNER, "may", {"schedule": "custom", "month": 3}, utcnow())
+    march = (await store.summaries.month_totals(OWNER, 2025, [3]))[3]
+    assert (march.due_tasks, march.completed_tasks, march.completed_cost_total) == (2, 2, Decimal("10"))
+
+    await store.tasks.delete(OWNER, "march")
+    march = (await store.summaries.month_totals(OWNER, 2025, [3]))[3]
+    assert (march.due_tasks, march.completed_tasks, march.completed_cost_total) == (1, 1, Decimal("7"))
+
+
+async def test_owner_version_and_cache_stamps(store):
+    async def state():
+        return await store.owner_version(OWNER), await store.cache_stamp(OWNER, "tasks"), await store.cache_stamp(OWNER, "settings")
+
+    version, tasks, prefs = await state()
+
+    await store.tasks.create(task_doc("t1", "Filters"))
+    after_task = await state()
+    assert after_task[0] != version and after_task[1] != tasks and after_task[2] == prefs
+
+    await store.progress.upsert_by_key(progress_key("t1"), progress_fields(), utcnow())
+    after_progress = await state()
+    assert after_progress[0] != after_task[0] and after_progress[1:] == after_task[1:]
+
+    await store.settings.upsert(OWNER, 2026, utcnow())
+    after_settings = await state()
+    assert after_settings[0] != after_progress[0] and after_settings[1] == after_progress[1] and after_settings[2] != prefs
+
+    assert await store.owner_version("someone-else") == version
+
+
+async def test_mongo_versions_move_once_the_write_lands(mongo_db):
+    store = MongoStorage()
+    await store.tasks.create(task_doc("t1", "Filters"))
+    before = (await store.owner_version(OWNER), await store.cache_stamp(OWNER, "tasks"))
+
+    @owner_write
+    async def write():
+        await next_owner_seq(mongo_db, OWNER, "tasks")
+        # Allocated but not landed: a tag or stamp read now must not cover the write yet.
+        assert (await store.owner_version(OWNER), await store.cache_stamp(OWNER, "tasks")) == before
+
+    await write()
+    after = (await store.owner_version(OWNER), await store.cache_stamp(OWNER, "tasks"))
+    assert after[0] != before[0] and after[1] != before[1]
+    assert (await mongo_db["owner_versions"].find_one({"_id": OWNER}))["pending"] == 0
+
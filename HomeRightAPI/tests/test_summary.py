@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pytest
+
+from tests.factories import OWNER, add_progress, add_task
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_month_summary_lists_tasks_due_that_month(client):
+    await add_task(client, "filters", "monthly")
+    await add_task(client, "gutters", "quarterly")
+    await add_task(client, "attic", "custom", month=3)
+    await add_progress(client, "filters", 4, cost="12.50")
+    await add_progress(client, "gutters", 4, status="in_progress")
+    await add_progress(client, "attic", 4, cost="99")
+
+    body = (await client.get(f"/summary/month/{OWNER}/2025/4")).json()
+    assert sorted(t["task_id"] for t in body["tasks"]) == ["filters", "gutters"]
+    assert (body["total_tasks"], body["completed_tasks"], body["is_month_complete"]) == (2, 1, False)
+    assert float(body["completed_cost_total"]) == 12.5
+
+    march = (await client.get(f"/summary/month/{OWNER}/2025/3")).json()
+    assert sorted(t["task_id"] for t in march["tasks"]) == ["attic", "filters"]
+    assert (march["completed_tasks"], march["is_month_complete"]) == (0, False)
+
+
+async def test_month_summary_follows_schedule_changes(client):
+    await add_task(client, "attic", "custom", month=3)
+    r = await client.patch("/tasks/attic", params={"owner_id": OWNER}, json={"schedule": "custom", "month": 5})
+    assert r.status_code == 200
+    await add_progress(client, "attic", 5)
+
+    assert (await client.get(f"/summary/month/{OWNER}/2025/3")).json()["total_tasks"] == 0
+    may = (await client.get(f"/summary/month/{OWNER}/2025/5")).json()
+    assert (may["total_tasks"], may["completed_tasks"], may["is_month_complete"]) == (1, 1, True)
+
+
+async def test_year_summary_totals_by_month(client):
+    await add_task(client, "filters", "monthly")
+    await add_task(client, "attic", "custom", month=3)
+    await add_progress(client, "filters", 1, cost="0.10")
+    await add_progress(client, "filters", 3, cost="0.20")
+    await add_progress(client, "attic", 3)
+    await add_progress(client, "filters", 4, status="in_progress", cost="5")
+    await add_progress(client, "filters", 6, cost="7")
+    await add_progress(client, "filters", 2, cost="100", year=2024)
+
+    body = (await client.get(f"/summary/year/{OWNER}/2025", params={"months": 4})).json()
+    assert (body["months"], body["completed_count"]) == (4, 3)
+    assert body["completed_cost_total"] == 0.3 and "notes" in body
+    by_month = {m["month"]: (m["due_tasks"], m["completed_tasks"]) for m in body["by_month"]}
+    assert by_month == {1: (1, 1), 2: (1, 0), 3: (2, 2), 4: (1, 0)}
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db.checklist import CHECKLIST
+from app.utils.bson import utcnow
+from app.utils.cursor import decode_cursor
+from tests.factories import OWNER, add_progress, add_task
+
+
+pytestmark = pytest.mark.anyio
+
+
+def token_seq(token: str) -> int:
+    return decode_cursor(token, (int, str, datetime))[0]
+
+
+async def sync(client, since=None):
+    params = {"since": since} if since is not None else {}
+    response = await client.get(f"/sync/{OWNER}", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_since_returns_only_later_changes(client):
+    await add_task(client, "filters", "monthly")
+    await add_progress(client, "filters", 3)
+    first = await sync(client)
+    assert first["full"] is True
+    assert [t["task_id"] for t in first["tasks"]] == ["filters"]
+    assert [(p["task_id"], p["month"]) for p in first["progress"]] == [("filters", 3)]
+
+    assert (await sync(client, first["token"]))["tasks"] == []
+    await add_task(client, "gutters", "custom", month=5)
+    delta = await sync(client, first["token"])
+    assert delta["full"] is False
+    assert [t["task_id"] for t in delta["tasks"]] == ["gutters"]
+    assert delta["progress"] == [] and delta["tombstones"] == []
+
+
+async def test_deletes_come_back_as_tombstones(client):
+    await add_task(client, "filters", "monthly")
+    token = (await sync(client))["token"]
+    assert (await client.delete("/tasks/filters", params={"owner_id": OWNER})).status_code == 204
+
+    delta = await sync(client, token)
+    assert delta["tasks"] == []
+    assert [(t["kind"], t["key"]) for t in delta["tombstones"]] == [("task", {"task_id": "filters"})]
+
+
+async def test_seeding_sends_the_builtins_once(client):
+    await add_task(client, "filters", "monthly")
+    token = (await sync(client))["token"]
+    assert (await client.post(f"/tasks/seed/{OWNER}")).status_code == 200
+
+    delta = await sync(client, token)
+    assert {t["task_id"] for t in delta["tasks"]} == {e["task_id"] for e in CHECKLIST}
+    assert (await sync(client, delta["token"]))["tasks"] == []
+
+
+async def test_token_waits_for_pending_writes(client, mongo_db):
+    await add_task(client, "filters", "monthly")
+    token = (await sync(client))["token"]
+    seq = token_seq(token)
+
+    # A write has allocated its seq but not landed yet: the token must not move past it.
+    await mongo_db["owner_versions"].update_one({"_id": OWNER}, {"$inc": {"version": 1, "pending": 1}})
+    assert token_seq((await sync(client, token))["token"]) == seq
+
+    # A worker that died mid-write never lands it; the token moves on once the write is old.
+    await mongo_db["owner_versions"].update_one({"_id": OWNER}, {"$set": {"changed_at": utcnow() - timedelta(minutes=5)}})
+    assert token_seq((await sync(client, token))["token"]) == seq + 1
+
+
+async def test_bad_token_is_a_400(client):
+    assert (await client.get(f"/sync/{OWNER}", params={"since": "nope"})).status_code == 400
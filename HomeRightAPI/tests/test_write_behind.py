@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.db import write_behind
+from app.db.write_behind import BufferFull, ProgressWriteBuffer
+from app.utils.bson import utcnow
+from tests.factories import OWNER, progress_fields, progress_key
+
+
+pytestmark = pytest.mark.anyio
+
+
+def count_batches(monkeypatch, store) -> list[int]:
+    batches: list[int] = []
+    upsert_many = store.progress.upsert_many
+
+    async def counting(writes, now, insert_ids=None):
+        batches.append(len(writes))
+        return await upsert_many(writes, now, insert_ids)
+
+    monkeypatch.setattr(store.progress, "upsert_many", counting)
+    return batches
+
+
+async def test_coalesces_writes_to_one_key(store, monkeypatch):
+    buffer = ProgressWriteBuffer(store, window=60, max_pending=100)
+    batches = count_batches(monkeypatch, store)
+
+    first = await buffer.put(progress_key("t1"), progress_fields("in_progress"), utcnow())
+    last = await buffer.put(progress_key("t1"), progress_fields("complete", "4.00"), utcnow())
+    assert first["_id"] == last["_id"]
+    assert await store.progress.get_by_key(progress_key("t1")) is None
+
+    await buffer.close()
+    stored = await store.progress.get_by_key(progress_key("t1"))
+    assert batches == [1]
+    assert (str(stored["_id"]), stored["status"]) == (last["_id"], "complete")
+
+    # The next write builds on the stored record.
+    again = await buffer.put(progress_key("t1"), progress_fields("in_progress"), utcnow())
+    assert (again["_id"], again["status"]) == (stored["_id"], "in_progress")
+    await buffer.close()
+
+
+async def test_flush_owner_only_writes_that_owner(store):
+    buffer = ProgressWriteBuffer(store, window=60, max_pending=100)
+    await buffer.put(progress_key("t1"), progress_fields(), utcnow())
+    await buffer.put(progress_key("t1", owner_id="other"), progress_fields(), utcnow())
+
+    await buffer.flush_owner(OWNER)
+    assert await store.progress.get_by_key(progress_key("t1")) is not None
+    assert await store.progress.get_by_key(progress_key("t1", owner_id="other")) is None
+    await buffer.close()
+    assert await store.progress.get_by_key(progress_key("t1", owner_id="other")) is not None
+
+
+async def test_full_buffer_flushes_before_accepting(store, monkeypatch):
+    buffer = ProgressWriteBuffer(store, window=60, max_pending=2)
+    batches = count_batches(monkeypatch, store)
+    for month in (1, 2, 3):
+        await buffer.put(progress_key("t1", month=month), progress_fields(), utcnow())
+
+    assert batches == [2]
+    await buffer.close()
+    assert batches == [2, 1]
+
+
+async def test_window_elapses_into_a_flush(store):
+    buffer = ProgressWriteBuffer(store, window=0.01, max_pending=100)
+    await buffer.put(progress_key("t1"), progress_fields(), utcnow())
+    for _ in range(100):
+        if await store.progress.get_by_key(progress_key("t1")) is not None:
+            break
+        await asyncio.sleep(0.01)
+    assert await store.progress.get_by_key(progress_key("t1")) is not None
+    await buffer.close()
+
+
+async def test_failed_flush_keeps_writes_buffered(store, monkeypatch):
+    buffer = ProgressWriteBuffer(store, window=60, max_pending=100)
+    upsert_many = store.progress.upsert_many
+
+    async def failing(writes, now, insert_ids=None):
+        raise RuntimeError("database unavailable")
+
+    await buffer.put(progress_key("t1"), progress_fields("in_progress"), utcnow())
+    monkeypatch.setattr(store.progress, "upsert_many", failing)
+    await buffer.flush()
+    # The kept entry still absorbs later writes to its key.
+    await buffer.put(progress_key("t1"), progress_fields("complete"), utcnow())
+
+    monkeypatch.setattr(store.progress, "upsert_many", upsert_many)
+    await buffer.close()
+    assert (await store.progress.get_by_key(progress_key("t1")))["status"] == "complete"
+
+
+async def test_full_buffer_with_a_failing_store_rejects_new_keys(store, monkeypatch):
+    buffer = ProgressWriteBuffer(store, window=60, max_pending=1)
+    upsert_many = store.progress.upsert_many
+
+    async def failing(writes, now, insert_ids=None):
+        await asyncio.sleep(0)  # lets wait_for time out if put() retries forever
+        raise RuntimeError("database unavailable")
+
+    await buffer.put(progress_key("t1"), progress_fields(), utcnow())
+    monkeypatch.setattr(store.progress, "upsert_many", failing)
+    with pytest.raises(BufferFull):
+        await asyncio.wait_for(buffer.put(progress_key("t2"), progress_fields(), utcnow()), timeout=1)
+    # Writes to a key already buffered still coalesce.
+    await buffer.put(progress_key("t1"), progress_fields("in_progress"), utcnow())
+
+    monkeypatch.setattr(store.progress, "upsert_many", upsert_many)
+    await buffer.close()
+    assert (await store.progress.get_by_key(progress_key("t1")))["status"] == "in_progress"
+    assert await store.progress.get_by_key(progress_key("t2")) is None
+
+
+async def test_by_key_route_answers_503_when_the_buffer_cannot_flush(client, monkeypatch):
+    buffer = ProgressWriteBuffer(write_behind.storage, window=60, max_pending=1)
+    upsert_many = buffer.store.progress.upsert_many
+    monkeypatch.setattr(settings, "progress_write_behind", True)
+    monkeypatch.setattr("app.api.routes.progress.progress_buffer", buffer)
+
+    async def failing(writes, now, insert_ids=None):
+        await asyncio.sleep(0)  # lets wait_for time out if put() retries forever
+        raise RuntimeError("database unavailable")
+
+    body = {"owner_id": OWNER, "task_id": "t1", "year": 2025, "month": 1, "status": "complete"}
+    assert (await client.put("/progress/by-key", json=body)).status_code == 200
+    monkeypatch.setattr(buffer.store.progress, "upsert_many", failing)
+    response = await asyncio.wait_for(client.put("/progress/by-key", json={**body, "task_id": "t2"}), timeout=1)
+    assert (response.status_code, response.headers["Retry-After"]) == (503, "1")
+
+    monkeypatch.setattr(buffer.store.progress, "upsert_many", upsert_many)
+    await buffer.close()